@@ -1,11 +1,42 @@
-import time
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import streamlit.components.v1 as components
 
+from src import config
+
+from src.game.change_feed import get_change_feed
 from src.game.game_state import GameState
+from src.game.message_store import sync_messages
+from src.metrics.metrics import metrics
 
+# how often an idle session checks the game's change counter; the check itself is a
+# fragment run, the full script only reruns when the version moved
 CHAT_REFRESH_SECONDS = 2.5
 
+# markdown text per message, keyed by (game, seq, role, speaker, content hash) and shared by
+# every session in the process. It only saves re-formatting: Streamlit still draws each
+# shown message, which is why the log is windowed (chat_render_window).
+_BLOCKS: OrderedDict = OrderedDict()
+_BLOCKS_LOCK = threading.Lock()
+_BLOCK_CACHE_SIZE = 1024
+
+
+def _block(game_key: str, msg):
+    # str hashes are cached on the string, so the key costs nothing after the first run
+    key = (game_key, msg.seq, msg.role, msg.speaker, hash(msg.content))
+    with _BLOCKS_LOCK:
+        text = _BLOCKS.get(key)
+        if text is None:
+            text = f"**{msg.speaker}:** {msg.content}" if msg.role == "user" else msg.content
+            _BLOCKS[key] = text
+            if len(_BLOCKS) > _BLOCK_CACHE_SIZE:
+                _BLOCKS.popitem(last=False)
+        else:
+            _BLOCKS.move_to_end(key)
+    return text
+
 
 def render_chat_log(game: GameState):
     
@@ -36,20 +67,28 @@ def render_chat_log(game: GameState):
             height=0,
         )
 
-    # Render chat history
+    # Render chat history from the message journal (game.messages is only the capped DM context)
     game_key = st.session_state.get("game_id", "default")
+    journal = sync_messages(game, game_key)
+    # version this run rendered; read before drawing so any later change triggers a rerun
+    st.session_state[f"chat_version_{game_key}"] = get_change_feed(game_key).version
     last_seen_key = f"chat_last_seen_{game_key}"
     last_seen = st.session_state.get(last_seen_key, 0)
-    new_message = len(game.messages) > last_seen
-    st.session_state[last_seen_key] = len(game.messages)
+    new_message = len(journal) > last_seen
+    st.session_state[last_seen_key] = len(journal)
+
+    # Only a window of the newest player/DM messages is drawn; older ones are paged in on request
+    window_key = f"chat_window_{game_key}"
+    window = st.session_state.get(window_key, config.chat_render_window)
+    shown = journal.visible(window)
+    if journal.visible_count > len(shown):
+        if st.button(f"Load earlier messages ({journal.visible_count - len(shown)} hidden)"):
+            st.session_state[window_key] = window + config.chat_render_window
+            st.rerun()
 
-    for msg in game.messages:
-        if msg.role == "user":
-            with st.chat_message("user"):
-                st.markdown(f"**{msg.speaker}:** {msg.content}")
-        elif msg.role == "assistant":
-            with st.chat_message("assistant"):
-                st.markdown(msg.content)
+    for msg in shown:
+        with st.chat_message(msg.role):
+            st.markdown(_block(game_key, msg))
 
     # Auto-scroll when a new message arrives (useful with auto-refresh on).
     if new_message:
@@ -88,5 +127,28 @@ def render_chat_log(game: GameState):
         st.info("Add players in sidebar.")
 
     if auto_refresh:
-        time.sleep(CHAT_REFRESH_SECONDS)
-        st.rerun()
+        _watch_for_changes(game_key)
+    elif getattr(game, "busy", False):
+        # even with auto-refresh off, the "Model busy" banner must clear when the work ends
+        _watch_busy(game)
+
+
+@st.fragment(run_every=CHAT_REFRESH_SECONDS)
+def _watch_for_changes(game_key: str):
+    
+    # Cheap timer check; rerun the whole page only when another session changed the game.
+    
+    seen = st.session_state.get(f"chat_version_{game_key}", 0)
+    if get_change_feed(game_key).changed_since(seen):
+        metrics.increment("ui.sync_reruns")
+        st.rerun(scope="app")
+
+
+@st.fragment(run_every=CHAT_REFRESH_SECONDS)
+def _watch_busy(game: GameState):
+
+    # Rerun once the busy flag drops; nothing else is refreshed while auto-refresh is off.
+
+    if not getattr(game, "busy", False):
+        metrics.increment("ui.busy_reruns")
+        st.rerun(scope="app")
@@ -1,12 +1,21 @@
 from typing import Dict
 from src.game.game_state import get_global_games, GameState
+from src.game.change_feed import notify_change
+from src.game.entity_index import drop_entity_index
+from src.game.message_store import get_message_journal
+from src.service.pool_filler import start_pool_filler
 
 
 def get_games():
     
     #  the shared games dict from the core game_state module.
+    # Each script run also lets it spill idle games (rate-limited inside) and makes
+    # sure the idle-time content pool filler is running.
     
-    return get_global_games()
+    games = get_global_games()
+    games.maintain()
+    start_pool_filler()
+    return games
 
 
 def get_or_create_game(games: Dict[str, GameState], game_id: str):
@@ -18,10 +27,16 @@ def get_or_create_game(games: Dict[str, GameState], game_id: str):
     return games[game_id]
 
 
-def reset_game(game: GameState):
+def reset_game(game: GameState, game_id: str | None = None):
     
     #Reset a GameState to a clean slate for this Game ID.
     
+    if game_id is not None:
+        # archive the old transcript so the new game starts an empty journal
+        get_message_journal(game_id).rotate()
+        drop_entity_index(game_id)
+    if game.world is not None:
+        drop_entity_index(game.world.world_id)
     game.world = None
     game.messages.clear()
     game.player_characters.clear()
@@ -34,3 +49,5 @@ def reset_game(game: GameState):
     game.busy = False
     game.busy_by = None
     game.busy_task = None
+    if game_id is not None:
+        notify_change(game_id)
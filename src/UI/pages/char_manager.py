@@ -1,9 +1,14 @@
+import time
+
 import streamlit as st
 from streamlit.errors import StreamlitAPIException
 
 from src.game.game_state import get_global_games
-from src.game.player_store import save_player_characters
-from src.agent.char_gen import generate_character_sheet
+from src.game.probability import success_table_rows
+from src.service.char_jobs import get_char_gen_pool
+
+# how often the job list refreshes its statuses and ETAs
+JOB_REFRESH_SECONDS = 2.0
 
 # Page config must be set before any other Streamlit calls.
 try:
@@ -81,6 +86,10 @@ def render_character_card(pc):
             for note in notes:
                 st.markdown(f"- {note}")
 
+        # Exact odds from the dice distributions, same modifier/DC rules as a live roll.
+        st.markdown("**Check odds**")
+        st.table(success_table_rows(pc))
+
 # layout
 
 st.title("Character Manager")
@@ -140,13 +149,10 @@ if not local_player_names:
     st.info("Add at least one player name above to start creating characters.")
     st.stop()
 
-# Character generation queue (FIFO) per game_id
-queue_key = f"char_gen_queue_{game_id}"
-busy_key = f"char_gen_busy_{game_id}"
-if queue_key not in st.session_state:
-    st.session_state[queue_key] = []
-if busy_key not in st.session_state:
-    st.session_state[busy_key] = False
+# Character generation runs on the server's worker pool; every browser sees the same jobs
+pool = get_char_gen_pool()
+rendered_key = f"char_jobs_rendered_{game_id}"
+st.session_state[rendered_key] = time.time()
 
 st.markdown("---")
 st.subheader("Create / Re-roll Characters for Local Players")
@@ -205,15 +211,14 @@ for player_name in local_player_names:
             if not concept.strip():
                 st.warning(f"Please describe the character idea for {player_name} first.")
             else:
-                st.session_state[queue_key].append(
-                    {
-                        "player_name": player_name,
-                        "pc_id": pc_id,
-                        "char_name": char_name,
-                        "gender": gender,
-                        "ancestry": ancestry,
-                        "concept": concept,
-                    }
+                pool.submit(
+                    game_id,
+                    pc_id,
+                    player_name,
+                    concept,
+                    char_name=char_name,
+                    gender=gender,
+                    ancestry=ancestry,
                 )
                 st.success(f"Queued generation for {player_name}.")
 
@@ -237,47 +242,40 @@ else:
         render_character_card(pc)
 
 st.markdown("---")
-st.subheader("Queued Character Generations (FIFO)")
-
-queue = st.session_state[queue_key]
-if not queue:
-    st.caption("Queue is empty.")
-else:
-    for idx, item in enumerate(queue, start=1):
-        st.caption(f"{idx}. {item['player_name']} \u2192 {item['char_name']} ({item['ancestry']})")
-
-global_busy = getattr(game, "busy", False)
-if global_busy:
-    st.warning(
-        f"Character generation locked: {game.busy_task or 'In progress'} "
-        f"(started by {game.busy_by or 'another player'})."
-    )
-process_disabled = (not queue) or st.session_state[busy_key] or global_busy
-if st.button("Process next queued generation", disabled=process_disabled):
-    st.session_state[busy_key] = True
-    job = queue.pop(0)
-    game.busy = True
-    game.busy_by = job["player_name"]
-    game.busy_task = "Generating character"
-    try:
-        with st.spinner(f"Generating character for {job['player_name']}..."):
-            pc = generate_character_sheet(
-                world_summary=world.world_summary,
-                world_skills=world.skills,
-                player_name=job["player_name"],
-                character_prompt=job["concept"],
-                pc_id=job["pc_id"],
-                char_name=job["char_name"],
-                gender=job["gender"],
-                ancestry=job["ancestry"],
-            )
-            game.player_characters[job["pc_id"]] = pc
-            save_player_characters(world.world_id, game.player_characters)
-            st.success(f"Character generated for {job['player_name']}: {pc.name}")
-    except Exception as e:
-        st.error(f"Character generation failed: {e}")
-    finally:
-        game.busy = False
-        game.busy_by = None
-        game.busy_task = None
-        st.session_state[busy_key] = False
+st.subheader("Character Generation Jobs")
+
+
+def _eta(seconds):
+    if seconds is None:
+        return ""
+    return f"~{seconds:.0f}s" if seconds < 90 else f"~{seconds / 60:.0f} min"
+
+
+@st.fragment(run_every=JOB_REFRESH_SECONDS)
+def render_job_status(game_id: str):
+
+    # Job list with live status; reruns the page when a job finished since the last full run,
+    # so new sheets show up in every browser.
+
+    jobs = pool.jobs(game_id)
+    rendered = st.session_state.get(rendered_key, 0)
+    if any(j.status in ("done", "failed") and j.finished_at > rendered for j in jobs):
+        st.rerun(scope="app")
+    if not jobs:
+        st.caption("No character generations queued.")
+        return
+    for job in jobs:
+        label = f"{job.player_name} \u2192 {job.pc_name or job.char_name or job.pc_id}"
+        if job.status == "running":
+            st.info(f"Generating: {label} (done in {_eta(job.eta_s)})")
+        elif job.status == "queued":
+            st.caption(f"Queued: {label} (ready in {_eta(job.eta_s)})")
+        elif job.status == "done":
+            st.caption(f"Done: {label}")
+        elif job.status == "failed":
+            st.error(f"Failed: {label}: {job.error}")
+        else:
+            st.caption(f"Replaced by a newer re-roll: {label}")
+
+
+render_job_status(game_id)
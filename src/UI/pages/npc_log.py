@@ -16,8 +16,7 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from src.game.game_state import get_global_games
-from src.game.npc_store import save_npcs
-from src.agent.item_gen import generate_items_for_character
+from src.service.game_service import get_global_service
 
 # Hide Streamlit's built-in page navigation links (use sidebar buttons instead).
 st.markdown(
@@ -104,14 +103,8 @@ for location in sorted(npcs_by_location.keys()):
             if "merchant" in role_lower or "vendor" in role_lower or "shop" in role_lower:
                 if st.button(f"Refresh stock for {name}", key=f"refresh_{npc.npc_id}"):
                     try:
-                        items = generate_items_for_character(
-                            world_summary=world.world_summary if world else "",
-                            archetype="merchant_stock",
-                            count=4,
-                        )
-                        npc.inventory = [f"{it.item_name} ({it.item_category or 'gear'})" for it in items]
-                        game.npcs[npc.npc_id] = npc
-                        save_npcs(game.world.world_id, game.npcs)
+                        # through the service: waits for the table and a model slot like any other call
+                        get_global_service().restock_merchant(game_id, npc.npc_id)
                         st.success(f"Updated stock for {name}.")
                     except Exception as e:
                         st.error(f"Could not refresh stock: {e}")
@@ -5,7 +5,11 @@ from src.agent.types import Message
 from src.agent.party_summary import build_party_summary
 from src.game.player_store import load_player_characters
 from src.game.party_store import save_party_summary
-from src.game.save_load import save_game, load_game
+from src.game.repository import get_repository
+from src.game.change_feed import notify_change
+from src.game.message_store import restore_context
+from src.game.persistence import flush_persistence
+from src.game.rng import GameRNG, get_game_rng, set_game_rng
 from src.game.turn_store import load_turn_log
 from src.game.game_state import GameState
 
@@ -17,7 +21,7 @@ def render_save_controls(game: GameState, game_id):
     save_click = st.button(
         "Save",
         disabled=game.world is None,
-        help="Writes to saves/games/<game_id>/world.json, npcs.json, quests.json, players.json, initiative.json",
+        help="Writes to saves/games/<game_id>/ (world, players, npcs, quests, initiative, meta); only changed sections are rewritten",
     )
     load_click = st.button(
         "Load",
@@ -26,20 +30,31 @@ def render_save_controls(game: GameState, game_id):
 
     if save_click:
         try:
-            dir_path = save_game(game, game_id=game_id)
-            st.success(f"Game state saved to {dir_path}")
+            report = get_repository().save_game(game, game_id, rng=get_game_rng(game_id).to_dict())
+            if report.written:
+                st.success(
+                    f"Game state saved to {report.path} "
+                    f"({', '.join(report.written)}: {report.bytes_written} bytes)"
+                )
+            else:
+                st.success(f"Nothing changed since the last save ({report.path}).")
         except Exception as e:
             st.error(f"Could not save game state: {e}")
 
     if load_click:
         try:
-            world, players, npcs, quests, init_order, active_idx = load_game(game_id)
+            flush_persistence(timeout=10)
+            repo = get_repository()
+            world, players, npcs, quests, init_order, active_idx = repo.load_game(game_id)
             game.world = world
             game.player_characters = players
             game.npcs = npcs
             game.quests = quests
             game.initiative_order = init_order
             game.active_turn_index = active_idx
+            game.save_hashes.clear()
+            # Same seed and stream positions as when saved, so the session replays deterministically.
+            set_game_rng(game_id, GameRNG.from_dict(repo.load_rng_state(game_id)))
             if world:
                 game.turn_log = load_turn_log(game_id)
 
@@ -51,7 +66,9 @@ def render_save_controls(game: GameState, game_id):
                     players=players_str,
                 )
 
+                # recent history comes back from the message journal; older lines stay on disk
                 game.messages = [Message(role="system", content=system_prompt)]
+                game.messages.extend(restore_context(game_id))
 
                 intro = (
                     f"World loaded: **{world.title}**.\n\n"
@@ -72,6 +89,7 @@ def render_save_controls(game: GameState, game_id):
                     if summary_text:
                         game.messages.append(Message(role="system", content=summary_text))
 
+            notify_change(game_id)
             st.success("Game loaded successfully.")
         except Exception as e:
             st.error(f"Could not load game: {e}")
@@ -81,6 +99,7 @@ def render_save_controls(game: GameState, game_id):
         if game.world is None:
             st.warning("Create or load a world before refreshing the party summary.")
         else:
+            flush_persistence(timeout=10)
             pcs = load_player_characters(game.world.world_id)
             game.player_characters = pcs
             if not pcs:
@@ -1,5 +1,4 @@
 import sys
-import time
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[2]
@@ -14,6 +13,8 @@ from src.UI.sidebar import render_sidebar
 from src.UI.actions import handle_world_creation, handle_gameplay_input
 from src.UI.initiative import render_initiative_controls
 from src.UI.chat_log import render_chat_log
+from src import config
+from src.game.message_store import get_message_journal
 from src.agent.types import Message
 
 from src.agent.party_summary import build_party_summary
@@ -56,7 +57,7 @@ st.session_state.player_names = player_names
 
 # Reset game if requested
 if startbutton:
-    reset_game(game)
+    reset_game(game, game_id)
 
 # ---------------------------------------
 # INPUT HANDLING
@@ -70,11 +71,12 @@ if not world_exists:
 elif world_exists and not pcs_exist:
     chat_prompt = "World created. Make characters first."
 else:
+    # game.messages is capped, so look in the journal too
     started = any(
         m.role == "user"
         and m.content.strip().lower() in {"start", "begin", "let's begin", "lets begin", "i am ready"}
         for m in game.messages
-    )
+    ) or len(get_message_journal(game_id)) > config.message_context_cap
     if not started:
         chat_prompt = "Lets begin our adventure. Type <Start> to begin."
     else:
@@ -91,14 +93,14 @@ default_speaker = (
 )
 speaker = speaker_label or default_speaker
 
-# Shared busy indicator so all sessions know someone is using the model
+# Shared busy indicator so all sessions know someone is using the model.
+# Clearing the flag bumps the game's change counter, so the chat log watcher reruns
+# this page when the work finishes.
 if getattr(game, "busy", False):
     st.warning(
         f"Model busy: {game.busy_task or 'In progress'} "
         f"(started by {game.busy_by or 'another player'})."
     )
-    time.sleep(0.8)
-    st.rerun()
 
 
 # World creation
@@ -164,9 +166,9 @@ if game.world is not None and hasattr(game, "turn_log") and getattr(game.turn_lo
             encounter_summary=getattr(game, "active_encounter_summary", None),
             encounter_history=getattr(game, "encounter_history", None),
         )
-        json_path, summary_path = export_turn_log_snapshot(game.turn_log, summary_text)
+        manifest_path, summary_path = export_turn_log_snapshot(game.turn_log, summary_text)
         st.success(
-            f"Action recap saved to `{json_path}` and `{summary_path}`"
+            f"Action recap saved to `{summary_path}` (turn log snapshot `{manifest_path.name}`)"
         )
 
 
@@ -7,6 +7,9 @@ from typing import List, Tuple
 
 import numpy as np
 
+from src.game.save_load import read_section
+from src.game.turn_store import iter_turn_texts
+
 Save_dir = Path("saves/games")
 default_model = "all-MiniLM-L6-v2"
 model_dir = Path("model")
@@ -15,9 +18,7 @@ model_dir = Path("model")
 def _slug(text: str) -> str:
     return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_") or "game"
 
-# collect corpus from split saves
-def _read_json(path: Path):
-    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+# collect corpus from split saves (compact or JSON sections, via save_load.read_section)
 
 
 @lru_cache(maxsize=1)
@@ -36,7 +37,7 @@ def collect_snippets(game_id, root):
 
     # collect world info
 
-    world = _read_json(x / "world.json") or {}
+    world = read_section(x, "world") or {}
     if world:
         snippets.append(("world:summary", world.get("world_summary", "")))
         snippets.append(("world:lore", world.get("lore", "")))
@@ -47,7 +48,7 @@ def collect_snippets(game_id, root):
 
     # collect player char info
 
-    pcs = _read_json(x / "players.json") or {}
+    pcs = read_section(x, "players") or {}
     for pc_id, pc in pcs.items():
         name = pc.get("name", pc_id)
         p_summary = (
@@ -59,7 +60,7 @@ def collect_snippets(game_id, root):
 
     # collect NPC
 
-    npcs = _read_json(x / "npcs.json") or {}
+    npcs = read_section(x, "npcs") or {}
     for npc_id, npc in npcs.items():
         snippets.append(
             (
@@ -71,7 +72,7 @@ def collect_snippets(game_id, root):
 
     # collect quests
 
-    quests = _read_json(x / "quests.json") or {}
+    quests = read_section(x, "quests") or {}
     for q_id, q in quests.items():
         snippets.append(
             (
@@ -81,10 +82,8 @@ def collect_snippets(game_id, root):
             )
         )
 
-    # collect turn info
-    turns = _read_json(x / "turns.json") or {}
-    for entry in turns.get("entries", []):
-        txt = entry.get("description") or entry.get("content") or ""
+    # collect turn info (checkpoint + streamed journal)
+    for txt in iter_turn_texts(game_id, root):
         if txt:
             snippets.append(("turn", txt))
 
@@ -160,6 +159,35 @@ def search(game_id, query, embedder: Embedder, top_k=5, saves_root=Save_dir):
     store = VectorStore(Path(saves_root) / _slug(game_id) / "index")
     return store.search(query, embedder, top_k=top_k)
 
+_META_CACHE = {}
+
+
+def snippet_map(game_id, saves_root=Save_dir):
+    # {snippet_id: text} from the built index, cached until meta.jsonl changes.
+    meta_path = Path(saves_root) / _slug(game_id) / "index" / "meta.jsonl"
+    if not meta_path.exists():
+        return {}
+    mtime = meta_path.stat().st_mtime
+    cached = _META_CACHE.get(meta_path)
+    if cached is None or cached[0] != mtime:
+        by_id = {}
+        with meta_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    by_id.setdefault(row["id"], row["text"])
+        cached = (mtime, by_id)
+        _META_CACHE[meta_path] = cached
+    return cached[1]
+
+
+def lookup_snippets(game_id, snippet_ids, saves_root=Save_dir):
+    # Direct id -> text lookup against the built index (no embedding call).
+    if not snippet_ids:
+        return []
+    by_id = snippet_map(game_id, saves_root)
+    return [(sid, by_id[sid], 1.0) for sid in snippet_ids if sid in by_id]
+
 def context_block_format(hits):
     lines = []
     for i, (s_id, text, _) in enumerate(hits, 1):
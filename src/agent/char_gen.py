@@ -1,7 +1,7 @@
 import re
 from datetime import datetime
 from textwrap import dedent
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from src.llm_client import get_llm
 from src.game.models import PlayerCharacter
@@ -93,7 +93,9 @@ def generate_character_sheet(
     pc_id: str,
     char_name: str,
     gender: str,
-    ancestry: str,):
+    ancestry: str,
+    rng=None,
+    world_id: Optional[str] = None,):
     
     
     llm = get_llm()
@@ -135,6 +137,7 @@ def generate_character_sheet(
         fixed_gender=gender,
         fixed_ancestry=ancestry,
         world_summary=world_summary,
+        world_id=world_id,
     )
 
 def _parse_stat_block(block: str):
@@ -250,7 +253,8 @@ def _parse_character_text(
     fixed_name: str,
     fixed_gender: str,
     fixed_ancestry: str,
-    world_summary: str,):
+    world_summary: str,
+    world_id: Optional[str] = None,):
     
     #Parse the LLM's character text into a PlayerCharacter. Keeps name, gender etc user choices.
     
@@ -306,7 +310,7 @@ def _parse_character_text(
 
     try:
         
-        init_result = roll_dice("1d20")
+        init_result = roll_dice("1d20", rng=rng)
         pc.initiative = init_result.total
     except Exception:
         
@@ -314,7 +318,7 @@ def _parse_character_text(
 
     # Generate starter gear separately and attach simple labels to inventory
     try:
-        items = generate_items_for_character(world_summary=world_summary, archetype=archetype, count=4)
+        items = generate_items_for_character(world_summary=world_summary, archetype=archetype, count=4, world_id=world_id)
         inv_labels: List[str] = []
         for it in items:
             cat = it.item_category or "gear"
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 
 class CommandKind(str, Enum):
@@ -20,6 +21,7 @@ class ParsedCommand:
     description: str
     needs_dice: bool      # if it needs dice throw or not.
     kind: CommandKind
+    confidence: float = 1.0   # how sure we are about action_type (0 when unknown)
 
 ACTION_TYPES = {
     "attack",
@@ -114,6 +116,17 @@ ACTION_SYNONYMS: Dict[str, str] = {
     "leap": "acrobatics",
     "balance": "acrobatics",
     "flip": "acrobatics",
+
+    # MULTI-WORD PHRASES (beat the single words inside them)
+    "power attack": "damage_heavy",
+    "sneak attack": "damage_light",
+    "sneak past": "stealth_check",
+    "pick the lock": "lockpick",
+    "pick a lock": "lockpick",
+    "pick lock": "lockpick",
+    "look around": "perception_check",
+    "keep watch": "perception_check",
+    "talk down": "persuasion",
 }
 
 # Meta / system commands.
@@ -128,7 +141,7 @@ META_COMMANDS = {
 
 
 def register_action_synonym(trigger: str, action_type: str):
-    
+    global _CLASSIFIER
     trigger = trigger.strip().lower()
     action_type = action_type.strip().lower()
     if not trigger:
@@ -137,6 +150,154 @@ def register_action_synonym(trigger: str, action_type: str):
         # flag if messes up later.
         return
     ACTION_SYNONYMS[trigger] = action_type
+    _CLASSIFIER = None
+
+
+# ----------------------------------------------------------------------
+# Action classifier: token trie over ACTION_SYNONYMS (multi-word phrases included)
+# plus a deletion index so one-letter typos ("snaek", "clmb") still match.
+# ----------------------------------------------------------------------
+
+_WORD_RE = re.compile(r"[a-z]+")
+
+EXACT_WEIGHT = 1.0
+FUZZY_WEIGHT = 0.6
+FUZZY_MIN_LEN = 4          # shorter words are too easy to confuse ("run" ~ "gun")
+POSITION_DECAY = 0.15      # later words count a little less than the leading verb
+
+
+@dataclass
+class ActionMatch:
+    action_type: str
+    confidence: float
+    matched: List[str] = field(default_factory=list)   # triggers that fired, in order
+
+
+class _TrieNode:
+    __slots__ = ("children", "action", "phrase")
+
+    def __init__(self):
+        self.children: Dict[str, _TrieNode] = {}
+        self.action: Optional[str] = None
+        self.phrase: Optional[str] = None
+
+
+def _deletes(word: str):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def _one_edit(a: str, b: str):
+    # Levenshtein distance 1, or one swap of adjacent letters.
+    if a == b:
+        return False
+    la, lb = len(a), len(b)
+    if la == lb:
+        diff = [i for i in range(la) if a[i] != b[i]]
+        if len(diff) == 1:
+            return True
+        return len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+    if abs(la - lb) != 1:
+        return False
+    if la > lb:
+        a, b = b, a
+    return any(b[:i] + b[i + 1:] == a for i in range(len(b)))
+
+
+class _ActionClassifier:
+    def __init__(self, synonyms: Dict[str, str]):
+        self.root = _TrieNode()
+        self.fuzzy: Dict[str, Set[str]] = {}   # delete-variant -> single-word triggers
+        self.words: Dict[str, str] = {}
+        for trigger, action in synonyms.items():
+            tokens = _WORD_RE.findall(trigger.lower())
+            if not tokens:
+                continue
+            node = self.root
+            for tok in tokens:
+                node = node.children.setdefault(tok, _TrieNode())
+            node.action = action
+            node.phrase = " ".join(tokens)
+            if len(tokens) == 1 and len(tokens[0]) >= FUZZY_MIN_LEN:
+                word = tokens[0]
+                self.words[word] = action
+                for key in _deletes(word) | {word}:
+                    self.fuzzy.setdefault(key, set()).add(word)
+
+    def _fuzzy_word(self, tok: str):
+        if len(tok) < FUZZY_MIN_LEN - 1:
+            return None
+        hits = set()
+        for key in _deletes(tok) | {tok}:
+            hits.update(self.fuzzy.get(key, ()))
+        hits = {w for w in hits if _one_edit(tok, w)}
+        actions = {self.words[w] for w in hits}
+        if len(actions) != 1:
+            return None   # nothing, or a typo that could be two different actions
+        return sorted(hits)[0]
+
+    def classify(self, text: str):
+        tokens = _WORD_RE.findall((text or "").lower())
+        scores: Dict[str, float] = {}
+        quality: Dict[str, float] = {}
+        matched: List[Tuple[str, str]] = []
+        first_action = None
+
+        i = 0
+        while i < len(tokens):
+            # longest exact phrase starting here
+            node, j, best = self.root, i, None
+            while j < len(tokens) and tokens[j] in node.children:
+                node = node.children[tokens[j]]
+                j += 1
+                if node.action is not None:
+                    best = (node.action, node.phrase, j)
+            if best is not None:
+                action, phrase, end = best
+                weight = EXACT_WEIGHT * (end - i)
+            else:
+                word = self._fuzzy_word(tokens[i])
+                if word is None:
+                    i += 1
+                    continue
+                action, phrase, end = self.words[word], word, i + 1
+                weight = FUZZY_WEIGHT
+
+            decay = 1.0 / (1.0 + POSITION_DECAY * i)
+            scores[action] = scores.get(action, 0.0) + weight * decay
+            quality[action] = max(quality.get(action, 0.0), min(1.0, weight))
+            matched.append((action, phrase))
+            if i == 0 and weight >= EXACT_WEIGHT:
+                first_action = action
+            i = end
+
+        if not scores:
+            return None
+        # A synonym as the very first word still decides, like the old first-word rule.
+        action = first_action or max(scores, key=scores.get)
+        confidence = quality[action] * scores[action] / sum(scores.values())
+        return ActionMatch(
+            action_type=action,
+            confidence=round(confidence, 3),
+            matched=[p for a, p in matched if a == action],
+        )
+
+
+_CLASSIFIER: Optional[_ActionClassifier] = None
+_CLASSIFIER_SIZE = -1
+
+
+def _classifier():
+    global _CLASSIFIER, _CLASSIFIER_SIZE
+    # Rebuilt after register_action_synonym (or a direct edit that changes the size).
+    if _CLASSIFIER is None or _CLASSIFIER_SIZE != len(ACTION_SYNONYMS):
+        _CLASSIFIER = _ActionClassifier(ACTION_SYNONYMS)
+        _CLASSIFIER_SIZE = len(ACTION_SYNONYMS)
+    return _CLASSIFIER
+
+
+def classify_action(text: str):
+    """Best action type for free text, with a 0-1 confidence; None if nothing matches."""
+    return _classifier().classify(text)
 
 
 def _normalize_action_from_rest(rest: str):
@@ -145,8 +306,7 @@ def _normalize_action_from_rest(rest: str):
     if not rest:
         return None
 
-    first_word = rest.split(" ", 1)[0].lower()
-    return ACTION_SYNONYMS.get(first_word)
+    return classify_action(rest)
 
 
 def parse_command(text: str):
@@ -180,15 +340,16 @@ def parse_command(text: str):
 
     # DICE throw case
     if cmd_word == "action":
-        action_type = _normalize_action_from_rest(rest)
+        match = _normalize_action_from_rest(rest)
         
         return ParsedCommand(
             raw=raw,
             base=base,
-            action_type=action_type,
+            action_type=match.action_type if match else None,
             description=rest.strip(),
             needs_dice=True,
             kind=CommandKind.MECHANICAL,
+            confidence=match.confidence if match else 0.0,
         )
 
     # Other verbs still try map : like /attack, /sneak, /perception, /lockpick, etc.
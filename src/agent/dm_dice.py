@@ -2,26 +2,29 @@ from __future__ import annotations
 
 import re
 from functools import lru_cache
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
-from src.agent.RAG_dense import build_idx, search, context_block_format, Embedder
+from src.agent.context_parser import classify_action, parse_command
+from src.agent.RAG_dense import build_idx, search, lookup_snippets, context_block_format, Embedder
+from src.agent.reply_validator import check_dm_reply, continuity_note
 from src.agent.types import Message
 from src.game.dice import roll_dice
+from src.game.entity_index import EntityIndex, get_entity_index
 from src.game.models import PlayerCharacter
-from src.game.action_modifiers import compute_action_modifier, evaluate_check
+from src.game.persistence import flush_persistence
+from src.game.rng import get_game_rng
+from src.game.action_modifiers import (
+    ALLOWED_ACTION_TYPES,
+    base_dice_for,
+    compute_action_modifier,
+    evaluate_check,
+)
 from src.llm_client import chat_completion
+from src.metrics.metrics import metrics
 
 
-ALLOWED_ACTION_TYPES = {
-    "attack",
-    "stealth_check",
-    "perception_check",
-    "lockpick",
-    "persuasion",
-    "athletics",
-    "acrobatics",
-    "damage_light",
-    "damage_heavy",}
+# /action text classified at least this confidently is rolled without asking the DM first
+FAST_PATH_CONFIDENCE = 0.75
 
 # [ROLL_REQUEST: 1d20+3 | stealth_check: sneak past the guard]
 
@@ -63,6 +66,8 @@ def _ensure_index(game_id: str):
     if game_id in _INDEX_READY:
         return
     embedder = _get_embedder()
+    # the index reads the save files; make sure queued writes have landed
+    flush_persistence(timeout=10)
     build_idx(game_id, embedder)
     _INDEX_READY.add(game_id)
 
@@ -116,8 +121,24 @@ def _maybe_summarize_history(messages: List[Message], limit: int = 60, keep_rece
 def _build_context_prefix(game_id: str, messages: List[Message], top_k: int = 5):
     last_user = next((m for m in reversed(messages) if m.role == "user"), None)
     query = last_user.content if last_user else ""
+
+    # Entities named in the message are pulled by id first; dense search fills the rest.
+    direct = []
+    mentions = get_entity_index(game_id).find_mentions(query) if query else []
+    if mentions:
+        wanted = []
+        for m in mentions:
+            sid = m.entity.snippet_id
+            if sid and sid not in wanted:
+                wanted.append(sid)
+        direct = lookup_snippets(game_id, wanted)
+
     embedder = _get_embedder()
     hits = search(game_id, query, embedder, top_k=top_k)
+    if direct:
+        seen = {sid for sid, _, _ in direct}
+        hits = direct + [h for h in hits if h[0] not in seen]
+        hits = hits[:max(top_k, len(direct))]
     if not hits:
         return NO_CONTEXT_GUARD
     
@@ -156,69 +177,46 @@ def ensure_action_label_in_reason(reason: str, fallback_action: str):
     return f"{fallback}: {reason}"
 
 
-def _find_pc_for_speaker(speaker: Optional[str], player_characters: Dict[str, PlayerCharacter]):
+def _find_pc_for_speaker(
+    speaker: Optional[str],
+    player_characters: Dict[str, PlayerCharacter],
+    index: Optional[EntityIndex] = None):
     
     if not speaker:
         return None
-    s = speaker.lower()
-    for pc in player_characters.values():
-        if pc.player_name.lower() == s:
+    if index is None:
+        index = EntityIndex().sync_pcs(player_characters)
+    for entity in index.lookup(speaker, kinds=("player",)):
+        pc = player_characters.get(entity.key)
+        if pc:
             return pc
     return None
 
 
-def dm_turn_with_dice(game_id: str, messages: List[Message], player_characters: Dict[str, PlayerCharacter]):
-    
-    # Collapse long histories to a summary to save context
-    messages[:] = _maybe_summarize_history(messages)
+def _validated_reply(game_id: str, reply: str, messages: List[Message], index: EntityIndex):
+    # Repair near-miss names in place; unknown names get a hidden system note for the next turn.
+    report = check_dm_reply(game_id, reply, messages, index)
+    notes = []
+    if report.unknown:
+        notes.append(Message(role="system", content=continuity_note(report.unknown)))
+    return report.text, notes
 
-    # Ask the DM to respond to the current messages with retrieved context
-    _ensure_index(game_id)
-    prefix = _build_context_prefix(game_id, messages)
-    dm_reply = chat_completion(messages, temperature=0.6, prefix=prefix)
-    dm_message = Message(role="assistant", content=dm_reply, speaker="Dungeon Master")
-    messages.append(dm_message)
 
-    # Look for a [ROLL_REQUEST: ...] line in the DM reply
-    
-    rr = parse_roll_request(dm_reply)
-    if not rr:
-        # No dice requested; just return with the DM's response added.
-        return messages
-
-    dice_expr, reason = rr
+def _roll_action(
+    game_id: str,
+    action_type: str,
+    reason: str,
+    actor_pc: Optional[PlayerCharacter],
+    check_reason: Optional[str] = None):
+    # Roll base dice + modifier for an action and return the [ROLL_RESULT ...] system message.
+    # Difficulty words are read from check_reason (default: reason, the DM's ROLL_REQUEST text).
+    check_reason = reason if check_reason is None else check_reason
 
-    # Determine which player character is acting
-    
-    last_user = next(
-        (m for m in reversed(messages) if m.role == "user"),
-        None)
-    actor_pc = _find_pc_for_speaker(
-        getattr(last_user, "speaker", None) if last_user else None,
-        player_characters)
-
-    # Determine action_type and normalize the reason label
-    
-    action_type = parse_action_type(reason)
-    if action_type is None:
-        # If DM forgot, fall back based on context; for now just assume "attack"
-        action_type = "attack"
-    reason = ensure_action_label_in_reason(reason, action_type)
-
-    
-    
     # For non-damage actions, always treat as a d20 check.
-    if action_type in {"damage_light", "damage_heavy"}:
-        # Simple defaults; tweak to taste
-        if action_type == "damage_light":
-            base_expr = "1d6"
-        else:
-            base_expr = "1d10"
-    else:
-        base_expr = "1d20"
+    base_expr = base_dice_for(action_type)
 
     # Stat + skill + difficulty-based modifier (may be negative)
-    modifier = compute_action_modifier(actor_pc, action_type, reason)
+    modifier = compute_action_modifier(actor_pc, action_type, check_reason)
 
     if modifier == 0:
         final_expr = base_expr
@@ -229,12 +227,12 @@ def dm_turn_with_dice(game_id: str, messages: List[Message], player_characters:
 
     # Roll the dice and evaluate success/failure (for checks)
     
-    result = roll_dice(final_expr, reason=reason)
+    result = roll_dice(final_expr, reason=reason, rng=get_game_rng(game_id).stream("dice"))
 
     dc, outcome = evaluate_check(
         total=result.total,
         action_type=action_type,
-        reason=reason)
+        reason=check_reason)
 
     # Add a [ROLL_RESULT: ...] 
     
@@ -254,18 +252,103 @@ def dm_turn_with_dice(game_id: str, messages: List[Message], player_characters:
 
     roll_result_line = (f"[ROLL_RESULT: {result.expression} = {result.total} " f"({extra_str}) | {result.reason}]")
 
-    roll_message = Message(role="system", content=roll_result_line, speaker=None)
-    messages.append(roll_message)
+    return Message(role="system", content=roll_result_line, speaker=None)
+
+
+def _local_action(last_user: Optional[Message]):
+    # A confidently classified "/action ..." from the player can be rolled locally,
+    # so the DM only has to narrate it (one model call instead of two).
+    if last_user is None:
+        return None
+    cmd = parse_command(last_user.content or "")
+    if cmd is None or not cmd.needs_dice or cmd.action_type not in ALLOWED_ACTION_TYPES:
+        return None
+    if cmd.confidence < FAST_PATH_CONFIDENCE:
+        return None
+    return cmd
+
+
+def _fallback_action_type(reason: str, last_user: Optional[Message]):
+    # DM forgot the label: classify its reason text, then the player's own words.
+    for text in (reason, getattr(last_user, "content", "") or ""):
+        match = classify_action(text)
+        if match is not None and match.action_type in ALLOWED_ACTION_TYPES:
+            return match.action_type
+    return "attack"
+
+
+def dm_turn_with_dice(
+    game_id: str,
+    messages: List[Message],
+    player_characters: Dict[str, PlayerCharacter],
+    on_token: Optional[Callable[[str], None]] = None):
+    
+    # on_token streams the DM's text as it is generated (both the reply and any roll outcome)
+    # Collapse long histories to a summary to save context
+    messages[:] = _maybe_summarize_history(messages)
+    index = get_entity_index(game_id).sync_pcs(player_characters)
+
+    # Determine which player character is acting
+    
+    last_user = next(
+        (m for m in reversed(messages) if m.role == "user"),
+        None)
+    actor_pc = _find_pc_for_speaker(
+        getattr(last_user, "speaker", None) if last_user else None,
+        player_characters,
+        index)
+
+    # Fast path: roll a clear /action locally, then let the DM narrate the result.
+    cmd = _local_action(last_user)
+    if cmd is not None:
+        reason = f"{cmd.action_type}: {cmd.description}".strip()
+        # The player's own words must not pick the difficulty: local rolls use the normal tier.
+        messages.append(_roll_action(game_id, cmd.action_type, reason, actor_pc, check_reason=cmd.action_type))
+        metrics.increment(f"dice.fast_path.{game_id}")
+
+    # Ask the DM to respond to the current messages with retrieved context
+    _ensure_index(game_id)
+    prefix = _build_context_prefix(game_id, messages)
+    dm_reply = chat_completion(messages, temperature=0.6, prefix=prefix, on_token=on_token)
+    dm_reply, notes = _validated_reply(game_id, dm_reply, messages, index)
+    dm_message = Message(role="assistant", content=dm_reply, speaker="Dungeon Master")
+    messages.append(dm_message)
+    messages.extend(notes)
+
+    if cmd is not None:
+        # Already rolled; a stray ROLL_REQUEST in the narration is ignored.
+        return messages
+
+    # Look for a [ROLL_REQUEST: ...] line in the DM reply
+    
+    rr = parse_roll_request(dm_reply)
+    if not rr:
+        # No dice requested; just return with the DM's response added.
+        return messages
+
+    dice_expr, reason = rr
+
+    # Determine action_type and normalize the reason label
+    
+    action_type = parse_action_type(reason)
+    if action_type is None:
+        # If DM forgot, fall back based on context
+        action_type = _fallback_action_type(reason, last_user)
+    reason = ensure_action_label_in_reason(reason, action_type)
+
+    messages.append(_roll_action(game_id, action_type, reason, actor_pc))
 
     # Ask DM again to narrate the outcome based on the roll result
     
     outcome_prefix = _build_context_prefix(game_id, messages)
-    outcome_text = chat_completion(messages, temperature=0.6, prefix=outcome_prefix)
+    outcome_text = chat_completion(messages, temperature=0.6, prefix=outcome_prefix, on_token=on_token)
+    outcome_text, notes = _validated_reply(game_id, outcome_text, messages, index)
     outcome_message = Message(
         role="assistant",
         content=outcome_text,
         speaker="Dungeon Master")
     messages.append(outcome_message)
+    messages.extend(notes)
 
     return messages
 
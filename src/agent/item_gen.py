@@ -1,10 +1,13 @@
 import re
 import uuid
 from textwrap import dedent
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
+from src import config
 from src.llm_client import get_llm
+from src.game.content_pool import get_content_pool
 from src.game.models import Item
+from src.metrics.metrics import metrics
 
 
 ITEM_GEN_PROMPT_TEMPLATE = dedent("""
@@ -29,6 +32,30 @@ ITEM 2:
 ...
 """)
 
+ITEM_BATCH_PROMPT_TEMPLATE = dedent("""
+You are an RPG gear quartermaster. Generate items for several owners in one list.
+
+World summary:
+{world_summary}
+
+Owners (id: what the items are for, how many):
+{owners}
+
+For every owner output exactly that many items, and tag each item with its owner id. Follow this format (one after another, no extra commentary):
+
+ITEM 1:
+Owner: <owner id, e.g. O1>
+Name: <short name>
+Category: <weapon|armor|gear|consumable|trinket>
+Subcategory: <e.g., sword, bow, potion, kit>
+Damage: <dice expression or "-" if not a weapon>
+Damage Type: <slashing|piercing|bludgeoning|fire|cold|poison|psychic|force|radiant|necrotic|acid|thunder|lightning|healing|none>
+Properties: <comma-separated tags like finesse, light, two_handed, ranged, thrown, shield, heavy, ammo, consumable, utility>
+
+ITEM 2:
+...
+""")
+
 ITEM_HEADER_RE = re.compile(r"^ITEM\s+(\d+):\s*$", re.MULTILINE)
 
 
@@ -63,10 +90,31 @@ def _parse_properties(raw: str):
     return parts
 
 
-def generate_items_for_character(world_summary: str, archetype: str, count: int = 4):
+def _parse_item(chunk: str, i: int):
+    name = _parse_field("Name", chunk)
+    if not name:
+        return None
+    return Item(
+        item_id=f"item_{uuid.uuid4().hex[:8]}_{i}",
+        item_name=name,
+        item_category=_parse_field("Category", chunk) or "gear",
+        item_subcategory=_parse_field("Subcategory", chunk),
+        item_dice_damage=_parse_field("Damage", chunk),
+        item_damage_type=_parse_field("Damage Type", chunk),
+        item_properties=_parse_properties(_parse_field("Properties", chunk)),
+    )
+
+
+def generate_items_for_character(world_summary: str, archetype: str, count: int = 4, world_id: Optional[str] = None):
     
     # Ask the LLM for a small set of starter items and parse them into Item objects.
-    
+    # With a world_id, items pre-generated for this archetype (content pool) are used first.
+
+    pooled = get_content_pool().take_items(world_id, archetype, count)
+    if len(pooled) >= count:
+        return pooled
+    count -= len(pooled)
+
     llm = get_llm()
 
     prompt = ITEM_GEN_PROMPT_TEMPLATE.format(
@@ -87,29 +135,101 @@ def generate_items_for_character(world_summary: str, archetype: str, count: int
 
     items: List[Item] = []
     for i, chunk in enumerate(chunks, start=1):
-        name = _parse_field("Name", chunk)
-        category = _parse_field("Category", chunk) or "gear"
-        subcategory = _parse_field("Subcategory", chunk)
-        damage = _parse_field("Damage", chunk)
-        damage_type = _parse_field("Damage Type", chunk)
-        properties = _parse_properties(_parse_field("Properties", chunk))
-
-        if not name:
+        item = _parse_item(chunk, i)
+        if item is None:
             continue
-
-        items.append(
-            Item(
-                item_id=f"item_{uuid.uuid4().hex[:8]}_{i}",
-                item_name=name,
-                item_category=category,
-                item_subcategory=subcategory,
-                item_dice_damage=damage,
-                item_damage_type=damage_type,
-                item_properties=properties,
-            )
-        )
+        items.append(item)
 
         if len(items) >= count:
             break
 
-    return items
+    return pooled + items
+
+
+def _chunk_requests(requests: List[Tuple[str, str, int]], max_items: int):
+    chunk: List[Tuple[str, str, int]] = []
+    size = 0
+    for req in requests:
+        if chunk and size + req[2] > max_items:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(req)
+        size += req[2]
+    if chunk:
+        yield chunk
+
+
+def _batch_call(world_summary: str, requests: List[Tuple[str, str, int]], by_owner: Dict[str, List[Item]]):
+    # one model call; appends parsed items to by_owner until each owner has what it asked for
+    aliases = {f"O{n}": owner for n, (owner, _, _) in enumerate(requests, start=1)}
+    wanted = {owner: len(by_owner[owner]) + count for owner, _, count in requests}
+    owners = "\n".join(
+        f"O{n}: {archetype or 'unspecified'}, {count} item{'s' if count != 1 else ''}"
+        for n, (_, archetype, count) in enumerate(requests, start=1)
+    )
+    total = sum(count for _, _, count in requests)
+
+    prompt = ITEM_BATCH_PROMPT_TEMPLATE.format(
+        world_summary=world_summary or "No summary provided.",
+        owners=owners,
+    )
+    result = get_llm()(
+        prompt,
+        max_tokens=min(4000, 70 * total + 100),
+        temperature=0.75,
+        top_p=0.9,
+        top_k=40,
+        repeat_penalty=1.1,
+        metric_name="item_batch",
+    )
+
+    raw = result["choices"][0]["text"].strip()
+    stray: List[Item] = []
+    for i, chunk in enumerate(_split_item_chunks(raw), start=1):
+        item = _parse_item(chunk, i)
+        if item is None:
+            continue
+        tag = _parse_field("Owner", chunk).split()
+        owner = aliases.get(tag[0].strip(".,:").upper()) if tag else None
+        if owner is not None and len(by_owner[owner]) < wanted[owner]:
+            by_owner[owner].append(item)
+        else:
+            stray.append(item)
+
+    # blocks with a missing or unknown owner go to whoever is still short, in request order
+    for item in stray:
+        short = next((o for o in wanted if len(by_owner[o]) < wanted[o]), None)
+        if short is None:
+            break
+        by_owner[short].append(item)
+
+
+def generate_items_batch(
+    world_summary: str,
+    requests: Sequence[Tuple[str, str, int]],
+    max_items: Optional[int] = None,
+    retry_missing: bool = True,
+):
+
+    # Items for many owners with one generation: requests are (owner_id, archetype, count).
+    # Owners get short ids (O1, O2...) in the prompt and every ITEM block carries an Owner:
+    # line, so the world summary is evaluated once per batch instead of once per merchant,
+    # quest or character. Batches hold at most `max_items` items (config.item_batch_max_items);
+    # owners the model shorted get one follow-up batch. Returns {owner_id: [Item, ...]}.
+
+    requests = [(owner, archetype, max(1, int(count))) for owner, archetype, count in requests]
+    by_owner: Dict[str, List[Item]] = {owner: [] for owner, _, _ in requests}
+    max_items = max_items or config.item_batch_max_items
+
+    for chunk in _chunk_requests(requests, max_items):
+        _batch_call(world_summary, chunk, by_owner)
+        metrics.increment("items.batches")
+
+    if retry_missing:
+        missing = [(o, a, c - len(by_owner[o])) for o, a, c in requests if len(by_owner[o]) < c]
+        for chunk in _chunk_requests(missing, max_items):
+            _batch_call(world_summary, chunk, by_owner)
+            metrics.increment("items.batch_retries")
+
+    metrics.increment("items.generated", sum(len(v) for v in by_owner.values()))
+    return by_owner
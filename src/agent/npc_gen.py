@@ -9,7 +9,8 @@ from typing import Dict, List, Optional
 
 from src.llm_client import get_llm
 from src.game.models import World_State, NPC
-from src.agent.item_gen import generate_items_for_character
+from src.game.entity_index import get_entity_index
+from src.agent.item_gen import generate_items_batch
 
 
 NPC_GEN_PROMPT_TEMPLATE = dedent("""
@@ -136,37 +137,29 @@ def _parse_list_block(label: str, text: str):
     return items
 
 
-def _pick_location_name(world: World_State, preferred: Optional[str]):
+def _pick_location_name(world: World_State, preferred: Optional[str], rng=None):
     
     # Try to map a free-text location name back to one of the world's major/minor location names. If it can't, just return the preferred text or a fallback.
     
-    all_names: List[str] = []
-    for loc in (world.major_locations or []):
-        name = loc.get("name")
-        if name:
-            all_names.append(name)
-    for loc in (world.minor_locations or []):
-        name = loc.get("name")
-        if name:
-            all_names.append(name)
+    index = get_entity_index(world.world_id).sync_world(world)
+    locations = index.entities(kinds=("loc", "loc_minor"))
 
-    if not all_names and preferred:
+    if not locations and preferred:
         return preferred
 
     if preferred:
-        # simple fuzzy-ish match by lowercase containment
-        p = preferred.lower()
-        for name in all_names:
-            if p == name.lower() or p in name.lower() or name.lower() in p:
-                return name
+        # exact name, a name mentioned in the text, or the text inside a name
+        match = index.resolve(preferred, kinds=("loc", "loc_minor"))
+        if match is not None:
+            return match.name
 
-    if all_names:
-        return random.choice(all_names)
+    if locations:
+        return (rng or random).choice([loc.name for loc in locations])
 
     return preferred or "Unknown location"
 
 
-def _label_item(item):
+def label_item(item):
     # Build a readable label for an Item without depending on full Item type.
     
     name = getattr(item, "item_name", "Item")
@@ -186,10 +179,43 @@ def _label_item(item):
     return " ".join(parts)
 
 
+MERCHANT_WORDS = ("merchant", "trader", "vendor", "shopkeeper")
+
+
+def is_merchant(npc: NPC):
+    role_text = f"{npc.role} {' '.join(npc.tags or [])}".lower()
+    return any(word in role_text for word in MERCHANT_WORDS)
+
+
+def stock_requests(npcs: Dict[str, NPC], count: int = 4):
+    return [(npc_id, "merchant_stock", count) for npc_id, npc in npcs.items() if is_merchant(npc)]
+
+
+def stock_merchants(world: World_State, npcs: Dict[str, NPC]):
+    requests = stock_requests(npcs)
+    if not requests:
+        return
+    try:
+        items = generate_items_batch(world.world_summary, requests)
+    except Exception:
+        return
+    for npc_id, owned in items.items():
+        npcs[npc_id].inventory = [label_item(it) for it in owned]
+
+
+def _auto_npc_id(rng=None):
+    # Filler NPC ids come from the game's worldgen stream when there is one, so replays match.
+    if rng is None:
+        return f"auto_{uuid.uuid4().hex[:8]}"
+    return f"auto_{rng.getrandbits(32):08x}"
+
+
 def _ensure_minimum_npcs(
     world: World_State,
     npcs: Dict[str, NPC],
-    min_npcs: int):
+    min_npcs: int,
+    rng=None,
+    id_rng=None):
     
     if len(npcs) >= min_npcs:
         return
@@ -201,8 +227,8 @@ def _ensure_minimum_npcs(
         base_locations = [loc.get("name", "Unknown location") for loc in all_locations]
 
     while len(npcs) < min_npcs:
-        npc_id = f"auto_{uuid.uuid4().hex[:8]}"
-        loc = random.choice(base_locations)
+        npc_id = _auto_npc_id(id_rng)
+        loc = (rng or random).choice(base_locations)
         now = datetime.utcnow()
         npcs[npc_id] = NPC(
             npc_id=npc_id,
@@ -219,7 +245,7 @@ def _ensure_minimum_npcs(
         )
 
 
-def _ensure_roles_per_minor_location(world: World_State, npcs: Dict[str, NPC]):
+def _ensure_roles_per_minor_location(world: World_State, npcs: Dict[str, NPC], id_rng=None):
     
     # Ensure that each minor location has at least one merchant / leader / quest giver.
     role_keywords = {
@@ -259,7 +285,7 @@ def _ensure_roles_per_minor_location(world: World_State, npcs: Dict[str, NPC]):
             needed.append("quest giver")
 
         for kind in needed:
-            npc_id = f"auto_{uuid.uuid4().hex[:8]}"
+            npc_id = _auto_npc_id(id_rng)
             now = datetime.utcnow()
             role_label = kind
             tags = [kind.replace(" ", "_"), "auto_generated"]
@@ -282,8 +308,13 @@ def _ensure_roles_per_minor_location(world: World_State, npcs: Dict[str, NPC]):
             )
 
 
-def generate_npcs_for_world(world: World_State, max_npcs: int = 10):
+def generate_npcs_for_world(
+    world: World_State, max_npcs: int = 10, rng=None, with_items: bool = True, min_npcs: int = 3):
     # Ask the LLM to suggest a roster of NPCs for the given world, then enforce minimum counts and per-location role.
+    # `rng` is the game's GameRNG: NPC placement uses its "npc" stream, filler ids its "worldgen" stream.
+    # with_items=False leaves merchant stock empty for the caller to fill in one batch.
+    placement_rng = rng.stream("npc") if rng is not None else None
+    id_rng = rng.stream("worldgen") if rng is not None else None
 
     llm = get_llm()
 
@@ -291,16 +322,13 @@ def generate_npcs_for_world(world: World_State, max_npcs: int = 10):
     minor_locations_str = _format_locations(world.minor_locations)
     players_str = ", ".join(world.players) if world.players else "Unknown players"
 
-    
-    min_npcs_base = 0  
-
     prompt = NPC_GEN_PROMPT_TEMPLATE.format(
         world_summary=world.world_summary,
         lore=world.lore,
         major_locations=major_locations_str,
         minor_locations=minor_locations_str,
         players=players_str,
-        min_npcs=min_npcs_base,
+        min_npcs=min_npcs,
         max_npcs_hint=max_npcs + 5,
     )
 
@@ -328,7 +356,7 @@ def generate_npcs_for_world(world: World_State, max_npcs: int = 10):
         tags = _parse_list_block("Tags", chunk)
         attitude = _parse_field(r"^Attitude:\s*(.+)$", chunk) or "neutral"
 
-        location = _pick_location_name(world, loc_raw or "")
+        location = _pick_location_name(world, loc_raw or "", rng=placement_rng)
 
         if not name:
             # Skip obviously malformed entries
@@ -350,22 +378,14 @@ def generate_npcs_for_world(world: World_State, max_npcs: int = 10):
             created_on=now,
             last_updated=now,
         )
-        # If looks like a merchant, generate a small inventory
-        role_text = f"{role} {' '.join(tags)}".lower()
-        if any(word in role_text for word in ["merchant", "trader", "vendor", "shopkeeper"]):
-            try:
-                items = generate_items_for_character(
-                    world_summary=world.world_summary,
-                    archetype="merchant_stock",
-                    count=4,
-                )
-                npc_obj.inventory = [_label_item(it) for it in items]
-            except Exception:
-                npc_obj.inventory = []
-
         npcs[npc_id] = npc_obj
 
-    # Enforce per-minor-location role coverage
-    _ensure_roles_per_minor_location(world, npcs)
+    # Merchants get a small inventory, all of them from one batched item call
+    if with_items:
+        stock_merchants(world, npcs)
+
+    # Top up a short roster, then enforce per-minor-location role coverage
+    _ensure_minimum_npcs(world, npcs, min_npcs, rng=placement_rng, id_rng=id_rng)
+    _ensure_roles_per_minor_location(world, npcs, id_rng=id_rng)
 
     return npcs
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Optional
 
 from src.agent.types import Message
+from src.game.entity_index import EntityIndex, get_entity_index
 from src.game.quest_store import save_quests
+from src.game.persistence import persist
 
 
-def handle_quest_command(raw: str, game: Any):
+def handle_quest_command(raw: str, game: Any, index: Optional[EntityIndex] = None):
     
     # Handle quest-related slash commands.
     
@@ -57,12 +59,13 @@ def handle_quest_command(raw: str, game: Any):
             )
             return True
 
-        target = arg.lower()
+        if index is None:
+            index = get_entity_index(world.world_id)
+        index.sync_quests(quests)
         found = None
-        for qid, q in quests.items():
-            if target in q.title.lower():
-                found = (qid, q)
-                break
+        match = index.resolve(arg, kinds=("quest",))
+        if match is not None and match.key in quests:
+            found = (match.key, quests[match.key])
 
         if not found:
             add_system_message(
@@ -82,7 +85,7 @@ def handle_quest_command(raw: str, game: Any):
         quest.last_updated = datetime.utcnow()
         quests[qid] = quest
         game.quests = quests
-        save_quests(world.world_id, quests)
+        persist(("quests", world.world_id), save_quests, world.world_id, quests.copy())
 
         add_system_message(f"Quest '{quest.title}' marked as {quest.status.upper()}.")
         return True
@@ -8,7 +8,8 @@ from typing import Dict, List, Optional
 
 from src.llm_client import get_llm
 from src.game.models import World_State, NPC, Quest
-from src.agent.item_gen import generate_items_for_character
+from src.game.entity_index import EntityIndex, get_entity_index
+from src.agent.item_gen import generate_items_batch
 
 QUEST_GEN_PROMPT_TEMPLATE = dedent("""
 You are an expert tabletop RPG quest designer.
@@ -146,48 +147,83 @@ def _parse_list_block(label: str, text: str):
     return items
 
 
-def _resolve_location_name(world: World_State, raw_location: str):
+def _resolve_location_name(world: World_State, raw_location: str, index: Optional[EntityIndex] = None):
     
     # Try to map a free-text location to one of the world location names
     
-    candidates: List[str] = []
-    for loc in (world.major_locations or []):
-        name = loc.get("name")
-        if name:
-            candidates.append(name)
-    for loc in (world.minor_locations or []):
-        name = loc.get("name")
-        if name:
-            candidates.append(name)
+    if index is None:
+        index = get_entity_index(world.world_id).sync_world(world)
+    candidates = index.entities(kinds=("loc", "loc_minor"))
 
     if not candidates:
         return raw_location or None
 
     if raw_location:
-        rl = raw_location.lower()
-        for c in candidates:
-            cl = c.lower()
-            if rl == cl or rl in cl or cl in rl:
-                return c
+        match = index.resolve(raw_location, kinds=("loc", "loc_minor"))
+        if match is not None:
+            return match.name
 
-    return raw_location or candidates[0]
+    return raw_location or candidates[0].name
 
 
-def _find_npc_id_by_name(npcs: Dict[str, NPC], name: str):
-    target = name.strip().lower()
-    if not target:
+def _find_npc_id_by_name(npcs: Dict[str, NPC], name: str, index: Optional[EntityIndex] = None):
+    if not name or not name.strip():
         return None
-    for npc_id, npc in npcs.items():
-        if npc.name.strip().lower() == target:
-            return npc_id
+    if index is None:
+        index = EntityIndex().sync_npcs(npcs)
+    for entity in index.lookup(name, kinds=("npc",)):
+        if entity.key in npcs:
+            return entity.key
     return None
 
 
+def reward_item_count(rewards: List[str]):
+    desired = len(rewards) if rewards else 2
+    return max(1, min(desired, 4))
+
+
+def reward_label(it):
+    label_parts = [it.item_name or "Item"]
+    cat = it.item_category or ""
+    sub = it.item_subcategory or ""
+    if cat:
+        cat_text = cat
+        if sub:
+            cat_text += f"/{sub}"
+        label_parts.append(f"({cat_text})")
+    dmg = it.item_dice_damage or ""
+    if dmg and dmg != "-":
+        dt = it.item_damage_type or ""
+        dmg_text = f"dmg {dmg}"
+        if dt:
+            dmg_text += f" ({dt})"
+        label_parts.append(dmg_text)
+    return " ".join(label_parts)
+
+
+def reward_requests(quests: Dict[str, Quest]):
+    return [(quest_id, "quest_reward", reward_item_count(q.rewards)) for quest_id, q in quests.items()]
+
+
+def add_reward_items(world: World_State, quests: Dict[str, Quest]):
+    requests = reward_requests(quests)
+    if not requests:
+        return
+    try:
+        items = generate_items_batch(world.world_summary, requests)
+    except Exception:
+        return
+    for quest_id, owned in items.items():
+        quests[quest_id].reward_items = [reward_label(it) for it in owned]
+
+
 def generate_quests_for_world(
     world: World_State,
     npcs: Dict[str, NPC],
-    max_quests: int = 5,):
-    
+    max_quests: int = 5,
+    with_items: bool = True,):
+    # with_items=False leaves reward_items empty for the caller to fill in one batch.
+
     llm = get_llm()
 
     major_locations_str = _format_locations(getattr(world, "major_locations", []))
@@ -220,6 +256,8 @@ def generate_quests_for_world(
     raw = result["choices"][0]["text"].strip()
     chunks = _split_quest_chunks(raw)
 
+    index = get_entity_index(world.world_id).sync_world(world).sync_npcs(npcs)
+
     quests: Dict[str, Quest] = {}
 
     for i, chunk in enumerate(chunks, start=1):
@@ -230,36 +268,6 @@ def generate_quests_for_world(
 
         steps = _parse_list_block("Steps", chunk)
         rewards = _parse_list_block("Rewards", chunk)
-        reward_items: List[str] = []
-
-        # Try to generate item rewards 
-        try:
-            desired = len(rewards) if rewards else 2
-            desired = max(1, min(desired, 4))
-            items = generate_items_for_character(
-                world_summary=world.world_summary,
-                archetype="quest_reward",
-                count=desired,
-            )
-            for it in items:
-                label_parts = [it.item_name or "Item"]
-                cat = it.item_category or ""
-                sub = it.item_subcategory or ""
-                if cat:
-                    cat_text = cat
-                    if sub:
-                        cat_text += f"/{sub}"
-                    label_parts.append(f"({cat_text})")
-                dmg = it.item_dice_damage or ""
-                if dmg and dmg != "-":
-                    dt = it.item_damage_type or ""
-                    dmg_text = f"dmg {dmg}"
-                    if dt:
-                        dmg_text += f" ({dt})"
-                    label_parts.append(dmg_text)
-                reward_items.append(" ".join(label_parts))
-        except Exception:
-            reward_items = []
 
         if not title:
             continue  # skip malformed
@@ -267,8 +275,8 @@ def generate_quests_for_world(
         quest_id = f"{world.world_id}_quest_{i}"
         now = datetime.utcnow()
 
-        resolved_location = _resolve_location_name(world, location_raw)
-        giver_id = _find_npc_id_by_name(npcs, giver_name)
+        resolved_location = _resolve_location_name(world, location_raw, index)
+        giver_id = _find_npc_id_by_name(npcs, giver_name, index)
 
         quests[quest_id] = Quest(
             quest_id=quest_id,
@@ -280,10 +288,14 @@ def generate_quests_for_world(
             target_location=resolved_location,
             steps=steps,
             rewards=rewards,
-            reward_items=reward_items,
+            reward_items=[],
             status="available",
             created_on=now,
             last_updated=now,
         )
 
+    # Item rewards for every quest come from one batched item call
+    if with_items:
+        add_reward_items(world, quests)
+
     return quests
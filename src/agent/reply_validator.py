@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Set
+
+from src.agent.RAG_dense import snippet_map
+from src.agent.types import Message
+from src.game.entity_index import EntityIndex, normalize_name
+from src.metrics.metrics import metrics
+
+
+# Post-generation check for DM replies: pull out capitalized names, compare them to
+# what the game actually knows about, fix near-misses and flag the rest. No LLM call.
+
+# Capitalized words that start sentences or show up in DM prose without being names.
+COMMON_CAPITALIZED = {
+    "a", "an", "the", "and", "but", "or", "so", "yet", "if", "then", "as", "at", "in", "on",
+    "of", "to", "by", "for", "from", "with", "without", "into", "onto", "upon", "after", "before",
+    "while", "when", "where", "what", "who", "why", "how", "which", "there", "here", "this", "that",
+    "these", "those", "it", "its", "i", "you", "your", "he", "she", "they", "them", "their", "we",
+    "our", "his", "her", "my", "me", "us", "one", "two", "three", "suddenly", "meanwhile", "finally",
+    "however", "still", "now", "yes", "no", "not", "perhaps", "maybe", "roll", "result", "success",
+    "failure", "turn", "next", "dungeon", "master", "dm", "gm", "player", "players", "party",
+    "please", "ok", "okay", "well", "oh", "ah", "good", "great", "welcome", "tell", "describe",
+    "make", "let", "lets", "what's", "you're", "it's", "i'm", "sir", "lady", "lord", "mister",
+    "north", "south", "east", "west", "monday", "god", "gods",
+}
+
+# Joiners allowed inside a multi-word name ("Order of the Rose").
+_NAME_JOINERS = {"of", "the", "de", "von", "van", "du", "la"}
+
+_TAG_RE = re.compile(r"\[[^\]]*\]")
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z'\-]*|[.!?:;\n]")
+_CAP_TERM_RE = re.compile(r"\b[A-Z][a-zA-Z'\-]+")
+
+# Kinds a DM reply can legitimately name.
+_NAMED_KINDS = ("npc", "pc", "player", "loc", "loc_minor", "item", "quest")
+
+
+@dataclass
+class ValidationReport:
+    text: str
+    candidates: List[str] = field(default_factory=list)
+    unknown: List[str] = field(default_factory=list)
+    repaired: Dict[str, str] = field(default_factory=dict)   # wrong -> canonical
+
+    @property
+    def ok(self):
+        return not self.unknown
+
+
+def extract_name_candidates(text: str):
+    """
+    Runs of capitalized words, with tags like [ROLL_REQUEST ...] removed.
+    A lone capitalized word at the start of a sentence is skipped: it is usually just grammar.
+    """
+    cleaned = _TAG_RE.sub(" ", text or "")
+    tokens = _TOKEN_RE.findall(cleaned)
+
+    candidates: List[str] = []
+    run: List[str] = []
+    run_at_start = False
+    sentence_start = True
+
+    def flush():
+        nonlocal run
+        words, run = run, []
+        trimmed = 0
+        # drop sentence-starter words and dangling joiners on either end
+        while words and words[0].lower() in COMMON_CAPITALIZED:
+            words = words[1:]
+            trimmed += 1
+        while words and words[-1].lower() in _NAME_JOINERS:
+            words = words[:-1]
+        if not words:
+            return
+        if run_at_start and not trimmed and len(words) == 1:
+            return
+        name = " ".join(words)
+        if name not in candidates:
+            candidates.append(name)
+
+    for tok in tokens:
+        if tok in ".!?:;\n":
+            flush()
+            sentence_start = True
+            continue
+        is_cap = tok[0].isupper() and not tok.isupper()
+        if is_cap or (run and tok.lower() in _NAME_JOINERS):
+            if not run:
+                run_at_start = sentence_start
+            run.append(tok)
+        else:
+            flush()
+        sentence_start = False
+    flush()
+    return candidates
+
+
+def capitalized_terms(texts: Iterable[str]):
+    # Normalized capitalized words found anywhere in `texts`.
+    terms: Set[str] = set()
+    for text in texts:
+        for word in _CAP_TERM_RE.findall(_TAG_RE.sub(" ", text or "")):
+            terms.add(normalize_name(word))
+    return terms
+
+
+def _within_one_edit(a: str, b: str):
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    i = j = 0
+    edits = 0
+    while i < la and j < lb:
+        if a[i] == b[j]:
+            i += 1
+            j += 1
+            continue
+        edits += 1
+        if edits > 1:
+            return False
+        if la == lb:
+            i += 1
+        j += 1
+    return edits + (lb - j) + (la - i) <= 1
+
+
+def _closest_entity_name(candidate: str, index: EntityIndex):
+    cand_tokens = normalize_name(candidate).split()
+    if not cand_tokens or min(len(t) for t in cand_tokens) < 4:
+        return None
+    best = None
+    for entity in index.entities(kinds=_NAMED_KINDS):
+        name_tokens = normalize_name(entity.name).split()
+        if len(name_tokens) != len(cand_tokens):
+            continue
+        if all(_within_one_edit(a, b) for a, b in zip(cand_tokens, name_tokens)):
+            if best is not None and best != entity.name:
+                return None  # ambiguous, leave it to the flag
+            best = entity.name
+    return best
+
+
+def validate_reply(text: str, index: EntityIndex, known_terms: Set[str]):
+    """
+    Check one DM reply against the entity index plus `known_terms` (normalized
+    words from the corpus and the conversation so far).
+    """
+    report = ValidationReport(text=text)
+    report.candidates = extract_name_candidates(text)
+
+    entity_tokens: Set[str] = set()
+    for entity in index.entities(kinds=_NAMED_KINDS):
+        entity_tokens.update(normalize_name(entity.name).split())
+
+    repaired_text = text
+    for cand in report.candidates:
+        norm = normalize_name(cand)
+        if not norm or index.lookup(norm, kinds=_NAMED_KINDS):
+            continue
+        tokens = norm.split()
+        if all(t in entity_tokens or t in known_terms or t in COMMON_CAPITALIZED for t in tokens):
+            continue
+        canonical = _closest_entity_name(cand, index)
+        if canonical:
+            report.repaired[cand] = canonical
+            repaired_text = re.sub(rf"\b{re.escape(cand)}\b", lambda _m: canonical, repaired_text)
+            continue
+        report.unknown.append(cand)
+
+    report.text = repaired_text
+    return report
+
+
+def continuity_note(unknown: List[str]):
+    names = ", ".join(unknown)
+    return (
+        "[CONTINUITY] The last DM reply named people/places/items that are not in the world records: "
+        f"{names}. Treat them as unconfirmed; do not build on them unless a player introduces them."
+    )
+
+
+_CORPUS_TERMS: Dict[str, tuple] = {}
+
+
+def _corpus_terms(game_id: str):
+    # snippet_map returns the same dict until the index is rebuilt, so key the cache on it.
+    corpus = snippet_map(game_id)
+    cached = _CORPUS_TERMS.get(game_id)
+    if cached is None or cached[0] is not corpus:
+        cached = (corpus, capitalized_terms(corpus.values()))
+        _CORPUS_TERMS[game_id] = cached
+    return cached[1]
+
+
+def check_dm_reply(game_id: str, text: str, messages: List[Message], index: EntityIndex):
+    """
+    Validate a DM reply for this game. Known terms come from the retrieval corpus
+    (world, lore, NPC/quest text) and from what players/system already said.
+    """
+    said = [m.content for m in messages if m.role in {"user", "system"}]
+    known = _corpus_terms(game_id) | capitalized_terms(said)
+
+    report = validate_reply(text, index, known)
+
+    metrics.increment(f"validator.checked.{game_id}")
+    if report.repaired:
+        metrics.increment(f"validator.repairs.{game_id}", len(report.repaired))
+    if report.unknown:
+        metrics.increment(f"validator.violations.{game_id}", len(report.unknown))
+        metrics.increment("validator.violations_total", len(report.unknown))
+    return report
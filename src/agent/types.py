@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Literal
 
 Role = Literal['system','user','assistant']
@@ -8,5 +8,7 @@ class Message:
     role: Role
     content: str
     speaker: Optional[str] = None
+    # position in the game's message journal; None until journaled
+    seq: Optional[int] = field(default=None, compare=False)
 
     
\ No newline at end of file
@@ -9,6 +9,35 @@ model_path = model_dir / "Meta-Llama-3.1-8B-Instruct-Q6_K_L.gguf"
 SAVES_DIR = project_root / "saves"
 SAVES_DIR.mkdir(exist_ok=True)
 
+storage_backend = "json"  ## "json" (split files under saves/) or "sqlite" (one WAL database)
+sqlite_path = SAVES_DIR / "game.db"
+save_format = "compact"  ## "compact" (versioned .dms section files, see src/game/codec.py) or "json" (pretty-printed, the old layout); both load
+save_codec_body = "auto"  ## compact body: "auto" (msgpack if installed, else compact JSON), "msgpack" or "json"
+autosave_enabled = True  ## save in the background after turns; only changed sections are written
+autosave_delay_s = 2.0   ## requests within this window collapse into one save
+persist_async = True  ## UI handlers queue file writes for a background worker instead of writing inline
+persist_queue_size = 256
+persist_flush_timeout_s = 10.0  ## how long shutdown waits for queued writes
+message_hot_window = 200  ## journaled chat messages kept in memory per game; older ones are paged from messages.jsonl
+games_max_resident = 8  ## games kept in memory by the games registry; least recently used ones are saved and dropped
+games_memory_budget_mb = 512  ## estimated memory budget for resident games
+games_idle_spill_s = 1800  ## games untouched this long are saved and dropped from memory (reloaded on next access)
+games_maintain_interval_s = 30  ## how often the registry re-checks sizes and idle games
+chat_render_window = 40  ## game log shows this many player/DM messages; "Load earlier messages" adds another window
+message_context_cap = 120  ## max messages kept in game.messages (DM context); pinned prompts plus the most recent
+service_host = "127.0.0.1"  ## headless game API (python -m src.service.server)
+service_port = 8765
+service_model_slots = 1  ## concurrent model calls across all tables; llama.cpp runs one at a time
+char_gen_workers = 1  ## background workers generating queued character sheets (they still share the model slots)
+item_batch_max_items = 20  ## most items asked for in one batched item call (merchant stock, quest rewards); bigger requests are split
+char_gen_eta_s = 60  ## starting guess for one character sheet; ETAs follow measured times after the first job
+content_pool_enabled = True  ## pre-generate items for resident worlds while the model is idle
+content_pool_ttl_s = 7 * 24 * 3600  ## pooled entries older than this are dropped
+content_pool_max_items = 24  ## cap per world and archetype (saves/pools/<world_id>.json)
+content_pool_target_items = 8  ## idle filling tops each item archetype up to this many
+content_pool_batch_items = 8  ## most items per idle generation, so a waiting player is held up by one short call at most
+content_pool_idle_check_s = 5.0  ## how often the filler looks for idle model time
+
 
 
 max_CTX = 4096  ## max memory -> ~3000 words.
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 
 from src.game.models import PlayerCharacter
@@ -38,6 +40,31 @@ SKILL_KEYWORDS: Dict[str, List[str]] = {
 # Simple static proficiency bonus for "has the right skill"
 DEFAULT_PROF_BONUS = 2
 
+# Action labels the DM may put in a ROLL_REQUEST reason.
+ALLOWED_ACTION_TYPES = {
+    "attack",
+    "stealth_check",
+    "perception_check",
+    "lockpick",
+    "persuasion",
+    "athletics",
+    "acrobatics",
+    "damage_light",
+    "damage_heavy",}
+
+DAMAGE_ACTION_TYPES = {"damage_light", "damage_heavy"}
+
+# Base dice before modifiers: checks are d20s, damage uses simple defaults; tweak to taste
+CHECK_DICE = "1d20"
+DAMAGE_DICE: Dict[str, str] = {
+    "damage_light": "1d6",
+    "damage_heavy": "1d10",
+}
+
+
+def base_dice_for(action_type: str):
+    return DAMAGE_DICE.get(action_type, CHECK_DICE)
+
 
 def ability_mod(stat_value: int):
     """
@@ -47,48 +74,39 @@ def ability_mod(stat_value: int):
     return (stat_value - 10) // 2
 
 
-def _get_primary_ability_mod(pc: PlayerCharacter, action_type: str):
-    stats = pc.stats or {}
-    # Default to 10 if missing
-    str_mod = ability_mod(stats.get("STR", 10))
-    dex_mod = ability_mod(stats.get("DEX", 10))
-    int_mod = ability_mod(stats.get("INT", 10))
-    wis_mod = ability_mod(stats.get("WIS", 10))
-    cha_mod = ability_mod(stats.get("CHA", 10))
-
-    key = PRIMARY_STAT.get(action_type)
-
-    if key == "STR":
-        return str_mod
-    if key == "DEX":
-        return dex_mod
-    if key == "INT":
-        return int_mod
-    if key == "WIS":
-        return wis_mod
-    if key == "CHA":
-        return cha_mod
-
-    # Fallback for unknown types: use best mental or physical stat
-    return max(str_mod, dex_mod, int_mod, wis_mod, cha_mod)
-
+ABILITIES = ("STR", "DEX", "CON", "INT", "WIS", "CHA")
 
-def _skill_bonus(pc: PlayerCharacter, action_type: str):
+# One bit per action type that has proficiency keywords
+PROF_BITS: Dict[str, int] = {action: 1 << i for i, action in enumerate(sorted(SKILL_KEYWORDS))}
 
-    # +DEFAULT_PROF_BONUS PC's skills match SKILL_KEYWORDS[action_type].
-    
-    keywords = SKILL_KEYWORDS.get(action_type)
-    if not keywords:
-        return 0
-
-    skills = pc.skills or []
-    lower_skills = [s.lower() for s in skills]
-
-    for kw in keywords:
-        for s in lower_skills:
-            if kw in s:
-                return DEFAULT_PROF_BONUS
-    return 0
+# Difficulty tiers: (modifier adjustment, DC). Keywords are plain substrings, checked
+# in priority order so "very hard" wins over the "hard" inside it.
+DIFFICULTY_TIERS: Dict[str, Tuple[int, int]] = {
+    "very_hard": (-4, 20),
+    "hard": (-2, 17),
+    "easy": (+2, 10),
+    "normal": (0, 13),
+}
+_TIER_KEYWORDS: List[Tuple[str, List[str]]] = [
+    ("very_hard", ["very hard", "extremely", "impossible"]),
+    ("hard", ["hard", "difficult", "risky"]),
+    ("easy", ["easy", "simple"]),
+]
+_TIER_PRIORITY = {tier: i for i, (tier, _) in enumerate(_TIER_KEYWORDS)}
+_KEYWORD_TIER = {kw: tier for tier, kws in _TIER_KEYWORDS for kw in kws}
+# Lookahead so overlapping keywords are all seen in a single scan
+_DIFFICULTY_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in sorted(_KEYWORD_TIER, key=len, reverse=True)) + "))"
+)
+
+
+@lru_cache(maxsize=1024)
+def difficulty_tier(reason: str):
+    """Tier name for a ROLL_REQUEST reason; shared by the modifier and the DC."""
+    found = {_KEYWORD_TIER[m] for m in _DIFFICULTY_RE.findall((reason or "").lower())}
+    if not found:
+        return "normal"
+    return min(found, key=_TIER_PRIORITY.__getitem__)
 
 
 def _difficulty_adjustment(reason: str):
@@ -98,14 +116,76 @@ def _difficulty_adjustment(reason: str):
     - "hard" / "difficult"      -> -2
     - "easy" / "simple"         -> +2
     """
-    r = reason.lower()
-    if "very hard" in r or "extremely" in r or "impossible" in r:
-        return -4
-    if "hard" in r or "difficult" in r or "risky" in r:
-        return -2
-    if "easy" in r or "simple" in r:
-        return +2
-    return 0
+    return DIFFICULTY_TIERS[difficulty_tier(reason)][0]
+
+
+@dataclass(frozen=True)
+class ModifierTable:
+    """
+    Everything compute_action_modifier needs for one PC, precomputed.
+    `stamp` identifies the PC edit it was built from (see _pc_stamp).
+    """
+    stamp: Tuple
+    ability_mods: Dict[str, int]
+    prof_mask: int
+    action_base: Dict[str, int]   # ability mod + proficiency per action type
+    fallback: int                 # best ability mod, for unknown action types
+
+    def has_proficiency(self, action_type: str):
+        return bool(self.prof_mask & PROF_BITS.get(action_type, 0))
+
+    def base_for(self, action_type: str):
+        return self.action_base.get(action_type, self.fallback)
+
+
+def _pc_skills(pc: PlayerCharacter):
+    skills = pc.skills or []
+    if isinstance(skills, (str, bytes)):
+        skills = [skills]
+    return skills
+
+
+def _pc_stamp(pc: PlayerCharacter):
+    # PlayerCharacter bumps `version` on every stats/skills edit, so this is O(1);
+    # duck-typed PCs without one fall back to their content
+    version = getattr(pc, "version", None)
+    if version is not None:
+        return (id(pc), version)
+    return (tuple(sorted((pc.stats or {}).items())), tuple(_pc_skills(pc)))
+
+
+def compile_modifier_table(pc: PlayerCharacter, stamp: Optional[Tuple] = None):
+    stamp = stamp if stamp is not None else _pc_stamp(pc)
+    stats = pc.stats or {}
+    # Default to 10 if missing
+    mods = {key: ability_mod(stats.get(key, 10)) for key in ABILITIES}
+    # Fallback for unknown types: use best mental or physical stat (CON never was one)
+    fallback = max(mods[k] for k in ("STR", "DEX", "INT", "WIS", "CHA"))
+
+    lower_skills = [s.lower() for s in _pc_skills(pc)]
+    mask = 0
+    for action, keywords in SKILL_KEYWORDS.items():
+        if any(kw in s for kw in keywords for s in lower_skills):
+            mask |= PROF_BITS[action]
+
+    action_base = {}
+    for action, key in PRIMARY_STAT.items():
+        prof = DEFAULT_PROF_BONUS if mask & PROF_BITS.get(action, 0) else 0
+        action_base[action] = mods.get(key, fallback) + prof
+    return ModifierTable(stamp=stamp, ability_mods=mods, prof_mask=mask, action_base=action_base, fallback=fallback)
+
+
+_TABLES: Dict[str, ModifierTable] = {}
+
+
+def modifier_table(pc: PlayerCharacter):
+    # Cached per pc_id; rebuilt only when the PC's edit stamp moved.
+    stamp = _pc_stamp(pc)
+    table = _TABLES.get(pc.pc_id)
+    if table is None or table.stamp != stamp:
+        table = compile_modifier_table(pc, stamp)
+        _TABLES[pc.pc_id] = table
+    return table
 
 
 def compute_action_modifier(
@@ -118,11 +198,7 @@ def compute_action_modifier(
     if pc is None:
         return 0
 
-    base = _get_primary_ability_mod(pc, action_type)
-    skill = _skill_bonus(pc, action_type)
-    diff = _difficulty_adjustment(reason)
-
-    return base + skill + diff
+    return modifier_table(pc).base_for(action_type) + _difficulty_adjustment(reason)
 
 
 def evaluate_check(
@@ -130,20 +206,10 @@ def evaluate_check(
     action_type: str,
     reason: str,):
    
-    if action_type in {"damage_light", "damage_heavy"}:
+    if action_type in DAMAGE_ACTION_TYPES:
         return None, None
 
-    r = reason.lower()
-
-    if "very hard" in r or "extremely" in r or "impossible" in r:
-        dc = 20
-    elif "hard" in r or "difficult" in r or "risky" in r:
-        dc = 17
-    elif "easy" in r or "simple" in r:
-        dc = 10
-    else:
-        # "Normal" difficulty
-        dc = 13
+    dc = DIFFICULTY_TIERS[difficulty_tier(reason)][1]
 
     outcome = "success" if total >= dc else "fail"
     return dc, outcome
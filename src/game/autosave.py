@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+from src import config
+from src.game.game_state import GameState
+from src.game.persistence import flush_persistence, persist
+from src.game.repository import get_repository
+from src.game.rng import get_game_rng
+from src.metrics.metrics import metrics
+
+
+# Debounced background saves. request_autosave() (re)arms one timer per game; a burst
+# of requests inside config.autosave_delay_s becomes a single save. When the timer
+# fires the save is handed to the persistence worker under one key per game (so it
+# also merges with a save that is still queued), and since saves skip clean sections
+# that save usually only touches a file or two.
+
+_TIMERS: Dict[str, threading.Timer] = {}
+_LOCK = threading.Lock()
+
+
+def _save(game: GameState, game_id: str):
+    try:
+        report = get_repository().save_game(game, game_id, rng=get_game_rng(game_id).to_dict())
+    except RuntimeError:
+        # state changed under us mid-serialization; try again after the next quiet period
+        metrics.increment("autosave.retries")
+        request_autosave(game, game_id)
+        return None
+    metrics.increment("autosave.saves")
+    return report
+
+
+def _fire(game: GameState, game_id: str):
+    with _LOCK:
+        _TIMERS.pop(game_id, None)
+    persist(("game", game_id), _save, game, game_id)
+
+
+def request_autosave(game: GameState, game_id: str, delay: Optional[float] = None):
+    """Schedule a save of `game`; returns False when autosave is off or there is nothing to save."""
+    if not config.autosave_enabled or game.world is None:
+        return False
+    delay = config.autosave_delay_s if delay is None else delay
+    with _LOCK:
+        pending = _TIMERS.pop(game_id, None)
+        if pending is not None:
+            pending.cancel()
+            metrics.increment("autosave.coalesced")
+        timer = threading.Timer(delay, _fire, args=(game, game_id))
+        timer.daemon = True
+        _TIMERS[game_id] = timer
+        timer.start()
+    return True
+
+
+def flush_autosave(game_id: Optional[str] = None, timeout: Optional[float] = None):
+    # Run pending saves now (all games, or one) and wait for the writes. Used on shutdown and by tests.
+    with _LOCK:
+        ids = [game_id] if game_id is not None else list(_TIMERS)
+        timers = [_TIMERS.pop(gid) for gid in ids if gid in _TIMERS]
+    for timer in timers:
+        timer.cancel()
+        _fire(*timer.args)
+    return flush_persistence(timeout)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from src.metrics.metrics import metrics
+
+
+# Per-game change counter shared by every session in the process. Code that changes
+# what other browsers would show (new chat messages, the busy flag, a reset or load)
+# calls notify_change(game_id); sessions remember the version they last rendered and
+# only rerun when it moved, instead of rerunning on a timer. Listeners get the new
+# version on every bump (the API server uses one per WebSocket to push "changed"); a
+# listener that raises (e.g. its event loop closed) is dropped, never the caller's turn.
+
+
+class ChangeFeed:
+    def __init__(self):
+        self.version = 0
+        self._cond = threading.Condition()
+        self._listeners: List[Callable[[int], None]] = []
+
+    def bump(self):
+        with self._cond:
+            self.version += 1
+            self._cond.notify_all()
+            version = self.version
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(version)
+            except Exception:
+                self.remove_listener(listener)
+                metrics.increment("changes.listener_errors")
+        return version
+
+    def add_listener(self, fn: Callable[[int], None]):
+        with self._cond:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn: Callable[[int], None]):
+        with self._cond:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def changed_since(self, version: int):
+        return self.version != version
+
+    def wait(self, since: int, timeout: Optional[float] = None):
+        """Block until the version differs from `since` (or timeout); returns the current version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != since, timeout)
+            return self.version
+
+
+_FEEDS: Dict[str, ChangeFeed] = {}
+_FEEDS_LOCK = threading.Lock()
+
+
+def get_change_feed(game_id: str):
+    with _FEEDS_LOCK:
+        feed = _FEEDS.get(game_id)
+        if feed is None:
+            feed = ChangeFeed()
+            _FEEDS[game_id] = feed
+        return feed
+
+
+def notify_change(game_id: str):
+    return get_change_feed(game_id).bump()
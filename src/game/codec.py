@@ -0,0 +1,227 @@
+"""
+Versioned compact save codec for the model dataclasses.
+
+A section file (players.dms, npcs.dms, ...) is a 5-byte header, MAGIC + version +
+body format, followed by one body object:
+
+    {"kind": "npcs", "fields": ["npc_id", "world_id", ...], "keys": [...], "rows": [[...], ...]}
+
+Each row is a model's fields in `fields` order; datetimes are int microseconds since
+the Unix epoch (naive UTC, as the models use). The body is msgpack when the package is
+installed and compact JSON otherwise (orjson if available). Because the field list
+travels with the file, a file written before a field was added still decodes (the
+field gets its default) and unknown fields are ignored.
+
+Rows are turned into objects by small constructors generated per (class, field list)
+that fill the instance __dict__ directly, instead of going through from_dict.
+"""
+from __future__ import annotations
+
+import gc
+import json
+from dataclasses import MISSING, fields
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional
+    msgpack = None
+
+from src.game.lazy_map import LazyEntityMap
+from src.game.models import NPC, Item, PlayerCharacter, Quest, World_State
+
+
+MAGIC = b"DMS"
+CODEC_VERSION = 1
+BODY_JSON = 0
+BODY_MSGPACK = 1
+
+SECTION_EXT = ".dms"
+
+# section kind -> model class; "world" holds a single object, the rest are {id: obj}
+KINDS = {
+    "world": World_State,
+    "players": PlayerCharacter,
+    "npcs": NPC,
+    "quests": Quest,
+    "items": Item,
+}
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+
+class CodecError(ValueError):
+    pass
+
+
+def to_epoch(dt):
+    if dt is None:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _US
+
+
+def from_epoch(value):
+    if value is None:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _is_datetime(f):
+    return "datetime" in str(f.type)
+
+
+def field_names(cls):
+    return tuple(f.name for f in fields(cls))
+
+
+@lru_cache(maxsize=None)
+def _dumper(cls):
+    # def dump(o): d = o.__dict__; return [d["a"], _ep(d["created_on"]), ...]
+    parts = []
+    for f in fields(cls):
+        get = f"d[{f.name!r}]"
+        parts.append(f"_ep({get})" if _is_datetime(f) else get)
+    src = "def dump(o):\n    d = o.__dict__\n    return [" + ", ".join(parts) + "]\n"
+    env = {"_ep": to_epoch}
+    exec(src, env)
+    return env["dump"]
+
+
+@lru_cache(maxsize=None)
+def _builder(cls, file_fields: Tuple[str, ...]):
+    # def build(row): o = _new(_cls); d = o.__dict__; d["a"] = row[0]; ...; return o
+    known = {f.name: f for f in fields(cls)}
+    env: Dict[str, Any] = {"_new": object.__new__, "_cls": cls, "_E": _EPOCH, "_td": timedelta}
+    lines = ["def build(row):", "    o = _new(_cls)", "    d = o.__dict__"]
+    for i, name in enumerate(file_fields):
+        f = known.get(name)
+        if f is None:
+            continue
+        value = f"row[{i}]"
+        if _is_datetime(f):
+            # from_epoch inlined; this runs once per datetime per row
+            value = f"(None if {value} is None else _E + _td(0, 0, {value}))"
+        lines.append(f"    d[{name!r}] = {value}")
+    for name, f in known.items():
+        if name in file_fields:
+            continue
+        if f.default is not MISSING:
+            env[f"_default_{name}"] = f.default
+            lines.append(f"    d[{name!r}] = _default_{name}")
+        elif f.default_factory is not MISSING:
+            env[f"_factory_{name}"] = f.default_factory
+            lines.append(f"    d[{name!r}] = _factory_{name}()")
+        else:
+            raise CodecError(f"{cls.__name__}.{name} is required but missing from the saved fields")
+    for name in getattr(cls, "_TRACKED_FIELDS", ()):
+        # route through __setattr__ so the model wraps the value and gets a version
+        lines.append(f"    o.{name} = d[{name!r}]")
+    lines.append("    return o")
+    exec("\n".join(lines) + "\n", env)
+    return env["build"]
+
+
+def _body_format(body: str):
+    if body == "msgpack" or (body == "auto" and msgpack is not None):
+        if msgpack is None:
+            raise CodecError("msgpack body requested but the msgpack package is not installed")
+        return BODY_MSGPACK
+    return BODY_JSON
+
+
+def _pack(doc, fmt: int):
+    if fmt == BODY_MSGPACK:
+        return msgpack.packb(doc, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(doc)
+    return json.dumps(doc, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _unpack(payload: bytes, fmt: int):
+    if fmt == BODY_MSGPACK:
+        if msgpack is None:
+            raise CodecError("save uses a msgpack body but the msgpack package is not installed")
+        return msgpack.unpackb(payload, raw=False)
+    if fmt == BODY_JSON:
+        return orjson.loads(payload) if orjson is not None else json.loads(payload)
+    raise CodecError(f"unknown body format {fmt}")
+
+
+def encode_section(kind: str, data, body: str = "auto"):
+    """Encode a model (kind "world") or {id: model} dict into section bytes."""
+    cls = KINDS[kind]
+    dump = _dumper(cls)
+    names = field_names(cls)
+    if kind == "world":
+        rows = [dump(data)]
+    elif isinstance(data, LazyEntityMap) and data.fields == names:
+        rows = data.encoded_rows(dump)
+    else:
+        rows = [dump(o) for o in data.values()]
+    doc = {"kind": kind, "fields": list(names), "rows": rows}
+    if kind != "world":
+        doc["keys"] = list(data.keys())
+    fmt = _body_format(body)
+    return MAGIC + bytes((CODEC_VERSION, fmt)) + _pack(doc, fmt)
+
+
+def is_encoded(payload: bytes):
+    return payload[:3] == MAGIC
+
+
+def _read_doc(payload: bytes):
+    if not is_encoded(payload):
+        raise CodecError("not a compact save section")
+    version, fmt = payload[3], payload[4]
+    if version > CODEC_VERSION:
+        raise CodecError(f"save section version {version} is newer than this build supports ({CODEC_VERSION})")
+    return _unpack(payload[5:], fmt)
+
+
+def decode_section(payload: bytes, lazy: bool = False):
+    """
+    Inverse of encode_section: the model for "world", else {id: model}. With lazy=True
+    the mapping is a LazyEntityMap that builds each model on first access.
+    """
+    if lazy:
+        doc = _read_doc(payload)
+        kind = doc["kind"]
+        if kind != "world":
+            cls = KINDS[kind]
+            file_fields = tuple(doc["fields"])
+            return LazyEntityMap(dict(zip(doc["keys"], doc["rows"])), _builder(cls, file_fields), file_fields)
+        return _builder(KINDS[kind], tuple(doc["fields"]))(doc["rows"][0]) if doc["rows"] else None
+    # bulk allocation of thousands of small objects; the cyclic GC would keep rescanning them
+    paused = gc.isenabled()
+    gc.disable()
+    try:
+        doc = _read_doc(payload)
+        kind = doc["kind"]
+        build = _builder(KINDS[kind], tuple(doc["fields"]))
+        objs = [build(row) for row in doc["rows"]]
+    finally:
+        if paused:
+            gc.enable()
+    if kind == "world":
+        return objs[0] if objs else None
+    return dict(zip(doc["keys"], objs))
+
+
+def decode_section_dicts(payload: bytes):
+    """Plain dicts (datetimes left as epoch ints), for readers that only want text fields."""
+    doc = _read_doc(payload)
+    names = doc["fields"]
+    rows: List[Dict[str, Any]] = [dict(zip(names, row)) for row in doc["rows"]]
+    if doc["kind"] == "world":
+        return rows[0] if rows else None
+    return dict(zip(doc["keys"], rows))
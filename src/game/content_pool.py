@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src import config
+from src.game.models import Item
+from src.game.persistence import persist
+from src.metrics.metrics import metrics
+
+
+# Pre-generated content per world, filled while the model is idle (src/service/pool_filler.py)
+# and drawn from when players would otherwise wait for a generation:
+#   items: Item dicts keyed by archetype ("merchant_stock", "rogue", ...)
+# One JSON file per world under saves/pools/. Entries older than content_pool_ttl_s are
+# dropped, and each key keeps at most content_pool_max_items.
+
+POOL_ROOT = Path("saves") / "pools"
+KINDS = ("items",)
+
+
+def pool_key(text: str):
+    return " ".join((text or "unspecified").lower().replace("_", " ").split()).replace(" ", "_")
+
+
+def _write(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(path)
+
+
+class ContentPool:
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else POOL_ROOT
+        self._worlds: Dict[str, dict] = {}
+        self._lock = threading.RLock()
+
+    def _path(self, world_id: str):
+        return self.root / f"{world_id}.json"
+
+    def _world(self, world_id: str):
+        data = self._worlds.get(world_id)
+        if data is None:
+            path = self._path(world_id)
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            for kind in KINDS:
+                data.setdefault(kind, {})
+            self._worlds[world_id] = data
+        return data
+
+    def _fresh(self, entries: List[dict], now: float):
+        ttl = config.content_pool_ttl_s
+        return [e for e in entries if now - e.get("t", 0) < ttl]
+
+    def _save(self, world_id: str):
+        snapshot = json.loads(json.dumps(self._worlds[world_id]))
+        persist(("pool", world_id), _write, self._path(world_id), snapshot)
+
+    def add(self, world_id: str, kind: str, key: str, entries: List[dict]):
+        """Store generated entries; the oldest go first once the key is over its cap."""
+        if not entries:
+            return 0
+        key = pool_key(key)
+        now = time.time()
+        with self._lock:
+            bucket = self._world(world_id)[kind]
+            kept = self._fresh(bucket.get(key, []), now) + [{"t": now, "data": e} for e in entries]
+            bucket[key] = kept[-config.content_pool_max_items:]
+            self._save(world_id)
+            metrics.increment(f"pool.{kind}_added", len(entries))
+            return len(bucket[key])
+
+    def take(self, world_id: str, kind: str, key: str, n: int):
+        """Remove and return up to n fresh entries (oldest first)."""
+        key = pool_key(key)
+        now = time.time()
+        with self._lock:
+            bucket = self._world(world_id)[kind]
+            stored = bucket.get(key, [])
+            entries = self._fresh(stored, now)
+            taken = entries[:n]
+            if taken or len(entries) != len(stored):
+                bucket[key] = entries[n:]
+                self._save(world_id)
+        metrics.increment(f"pool.{kind}_hits" if taken else f"pool.{kind}_misses")
+        return [e["data"] for e in taken]
+
+    def level(self, world_id: str, kind: str, key: str):
+        with self._lock:
+            return len(self._fresh(self._world(world_id)[kind].get(pool_key(key), []), time.time()))
+
+    def levels(self, world_id: str):
+        now = time.time()
+        with self._lock:
+            data = self._world(world_id)
+            return {kind: {k: len(self._fresh(v, now)) for k, v in data[kind].items()} for kind in KINDS}
+
+    def take_items(self, world_id: Optional[str], archetype: str, count: int):
+        if not world_id or not config.content_pool_enabled:
+            return []
+        return [Item.from_dict(d) for d in self.take(world_id, "items", archetype, count)]
+
+
+_POOL: Optional[ContentPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_content_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ContentPool()
+        return _POOL
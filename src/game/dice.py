@@ -1,44 +1,16 @@
 from __future__ import annotations
 
 import random
-import re
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
 
+from src.game.dice_engine import RollResult, compile_expr, roll_batch
 
-ROLL_RE = re.compile(
-    r"^\s*(?P<num>\d*)d(?P<sides>\d+)(?P<mod>[+-]\d+)?\s*$",
-    re.IGNORECASE,
-)
 
+def roll_dice(expr: str, reason: Optional[str] = None, rng: Optional[random.Random] = None):
+    # Parse dice expression like "1d20+3", "2d6-1" or "d20adv+2" and roll it.
+    # Full grammar lives in dice_engine; compiled expressions are cached there.
 
-@dataclass
-class RollResult:
-    expression: str
-    total: int
-    rolls: List[int]
-    modifier: int
-    reason: Optional[str] = None
+    return compile_expr(expr).roll(reason=reason, rng=rng)
 
 
-def roll_dice(expr: str, reason: Optional[str] = None):
-    # Parse dice expression like "1d20+3" or "2d6-1" and roll it.
-    
-    m = ROLL_RE.match(expr)
-    if not m:
-        raise ValueError(f"Invalid dice expression: {expr!r}")
-
-    num = int(m.group("num") or "1")
-    sides = int(m.group("sides"))
-    mod = int(m.group("mod") or "0")
-
-    rolls = [random.randint(1, sides) for _ in range(num)]
-    total = sum(rolls) + mod
-
-    return RollResult(
-        expression=expr.strip(),
-        total=total,
-        rolls=rolls,
-        modifier=mod,
-        reason=reason,
-    )
+__all__ = ["RollResult", "roll_dice", "roll_batch"]
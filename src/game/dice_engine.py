@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# Dice expression grammar (case-insensitive, spaces allowed between terms):
+#
+#   expr     := ["-"] term (("+" | "-") term)*
+#   term     := dice | integer
+#   dice     := [count] "d" (sides | "%") suffix*
+#   suffix   := "kh" n | "kl" n | "k" n     keep highest / lowest n dice
+#             | "!"                         exploding: a max roll adds another die
+#             | "adv" | "dis"               advantage / disadvantage (single die only)
+#
+# Examples: "1d20+5", "d20adv+3", "4d6kh3", "2d6!+1d4-1", "d%".
+
+MAX_DICE = 1000
+MAX_SIDES = 10000
+MAX_EXPLOSIONS = 20          # per die; stops a run of max rolls from looping forever
+BATCH_CHUNK_ROWS = 1 << 18   # rows per numpy chunk in roll_batch, caps peak memory
+
+_TERM_RE = re.compile(
+    r"""
+    (?:
+        (?P<count>\d*)d(?P<sides>\d+|%)
+        (?P<suffix>(?:\s*(?:kh\d+|kl\d+|k\d+|!|advantage|disadvantage|adv|dis))*)
+      | (?P<const>\d+)
+    )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+_SUFFIX_RE = re.compile(r"kh\d+|kl\d+|k\d+|!|advantage|disadvantage|adv|dis", re.IGNORECASE)
+_SIGN_RE = re.compile(r"\s*([+-])\s*")
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    sign: int                     # +1 / -1
+    count: int
+    sides: int
+    keep: Optional[Tuple[str, int]] = None   # ("h" | "l", n)
+    explode: bool = False
+
+
+@dataclass(frozen=True)
+class ConstTerm:
+    sign: int
+    value: int
+
+
+@dataclass
+class RollResult:
+    expression: str
+    total: int
+    rolls: List[int]
+    modifier: int
+    reason: Optional[str] = None
+    dropped: List[int] = field(default_factory=list)
+
+
+def _parse_dice_term(sign: int, m: re.Match, expr: str):
+    count = int(m.group("count") or "1")
+    sides_raw = m.group("sides")
+    sides = 100 if sides_raw == "%" else int(sides_raw)
+    if count < 1 or count > MAX_DICE:
+        raise ValueError(f"Invalid dice count in {expr!r}")
+    if sides < 1 or sides > MAX_SIDES:
+        raise ValueError(f"Invalid die size in {expr!r}")
+
+    keep = None
+    explode = False
+    for suffix in _SUFFIX_RE.findall(m.group("suffix") or ""):
+        s = suffix.lower()
+        if s == "!":
+            if sides == 1:
+                raise ValueError(f"A d1 cannot explode: {expr!r}")
+            explode = True
+            continue
+        if keep is not None:
+            raise ValueError(f"Only one keep/advantage suffix per term: {expr!r}")
+        if s in {"adv", "advantage", "dis", "disadvantage"}:
+            if count != 1:
+                raise ValueError(f"Advantage/disadvantage applies to a single die: {expr!r}")
+            count = 2
+            keep = ("h" if s.startswith("adv") else "l", 1)
+            continue
+        if s.startswith("kh") or s.startswith("kl"):
+            mode, n = s[1], int(s[2:])
+        else:
+            mode, n = "h", int(s[1:])
+        if n < 1 or n > count:
+            raise ValueError(f"Cannot keep {n} of {count} dice: {expr!r}")
+        keep = (mode, n)
+    return DiceTerm(sign=sign, count=count, sides=sides, keep=keep, explode=explode)
+
+
+@dataclass(frozen=True)
+class DiceExpr:
+    """Compiled dice expression: a flat list of signed dice/constant terms."""
+    source: str
+    terms: Tuple[object, ...]
+
+    @property
+    def modifier(self):
+        return sum(t.sign * t.value for t in self.terms if isinstance(t, ConstTerm))
+
+    @property
+    def dice_terms(self):
+        return [t for t in self.terms if isinstance(t, DiceTerm)]
+
+    # ------------------------------------------------------------------
+    # single roll (python, goes through random.randint or an injected rng)
+    # ------------------------------------------------------------------
+
+    def roll(self, reason: Optional[str] = None, rng: Optional[random.Random] = None):
+        randint = rng.randint if rng is not None else random.randint
+        total = 0
+        kept: List[int] = []
+        dropped: List[int] = []
+        for term in self.terms:
+            if isinstance(term, ConstTerm):
+                total += term.sign * term.value
+                continue
+            dice = []
+            for _ in range(term.count):
+                value = randint(1, term.sides)
+                die_total = value
+                depth = 0
+                while term.explode and value == term.sides and depth < MAX_EXPLOSIONS:
+                    value = randint(1, term.sides)
+                    die_total += value
+                    depth += 1
+                dice.append(die_total)
+            if term.keep is not None:
+                mode, n = term.keep
+                order = sorted(range(len(dice)), key=lambda i: dice[i], reverse=(mode == "h"))
+                keep_idx = set(order[:n])
+                dropped.extend(d for i, d in enumerate(dice) if i not in keep_idx)
+                dice = [d for i, d in enumerate(dice) if i in keep_idx]
+            kept.extend(dice)
+            total += term.sign * sum(dice)
+
+        return RollResult(
+            expression=self.source,
+            total=total,
+            rolls=kept,
+            modifier=self.modifier,
+            reason=reason,
+            dropped=dropped,
+        )
+
+    # ------------------------------------------------------------------
+    # batch roll (numpy)
+    # ------------------------------------------------------------------
+
+    def roll_batch(self, n: int, rng: Optional[np.random.Generator] = None):
+        """Roll the expression `n` times; returns an int64 array of totals."""
+        if n < 0:
+            raise ValueError("n must be >= 0")
+        rng = rng if rng is not None else np.random.default_rng()
+        out = np.empty(n, dtype=np.int64)
+        for start in range(0, n, BATCH_CHUNK_ROWS):
+            stop = min(n, start + BATCH_CHUNK_ROWS)
+            out[start:stop] = self._roll_chunk(stop - start, rng)
+        return out
+
+    def _roll_chunk(self, rows: int, rng: np.random.Generator):
+        totals = np.full(rows, self.modifier, dtype=np.int64)
+        for term in self.dice_terms:
+            dice = rng.integers(1, term.sides + 1, size=(rows, term.count), dtype=np.int64)
+            if term.explode:
+                last = dice
+                for _ in range(MAX_EXPLOSIONS):
+                    live = last == term.sides
+                    if not live.any():
+                        break
+                    last = np.where(live, rng.integers(1, term.sides + 1, size=live.shape, dtype=np.int64), 0)
+                    dice = dice + last
+            if term.keep is not None:
+                mode, k = term.keep
+                dice = np.sort(dice, axis=1)
+                dice = dice[:, -k:] if mode == "h" else dice[:, :k]
+            totals += term.sign * dice.sum(axis=1)
+        return totals
+
+
+@lru_cache(maxsize=1024)
+def compile_expr(expr: str):
+    """Parse a dice expression into a DiceExpr. Cached per expression string."""
+    if not isinstance(expr, str):
+        raise ValueError(f"Invalid dice expression: {expr!r}")
+    text = expr.strip()
+    if not text:
+        raise ValueError(f"Invalid dice expression: {expr!r}")
+
+    terms = []
+    pos = 0
+    sign = 1
+    if text[0] in "+-":
+        sign = -1 if text[0] == "-" else 1
+        pos = 1
+    while True:
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+        m = _TERM_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Invalid dice expression: {expr!r}")
+        if m.group("const") is not None:
+            terms.append(ConstTerm(sign=sign, value=int(m.group("const"))))
+        else:
+            terms.append(_parse_dice_term(sign, m, expr))
+        pos = m.end()
+        if pos >= len(text) or not text[pos:].strip():
+            break
+        s = _SIGN_RE.match(text, pos)
+        if not s:
+            raise ValueError(f"Invalid dice expression: {expr!r}")
+        sign = -1 if s.group(1) == "-" else 1
+        pos = s.end()
+
+    if not any(isinstance(t, DiceTerm) for t in terms):
+        raise ValueError(f"Dice expression has no dice: {expr!r}")
+    return DiceExpr(source=text, terms=tuple(terms))
+
+
+def roll_expr(expr: str, reason: Optional[str] = None, rng: Optional[random.Random] = None):
+    return compile_expr(expr).roll(reason=reason, rng=rng)
+
+
+def roll_batch(expr: str, n: int, rng: Optional[np.random.Generator] = None):
+    return compile_expr(expr).roll_batch(n, rng=rng)
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.game.models import World_State, PlayerCharacter, NPC, Quest
+
+
+_NON_WORD_RE = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(text: str):
+    # lowercase, punctuation -> single spaces. "Gorn's  Forge!" -> "gorn s forge"
+    return _NON_WORD_RE.sub(" ", (text or "").lower()).strip()
+
+
+def item_name_from_label(label: str):
+    # "Longsword (weapon/sword) | dmg 1d8" -> "Longsword"
+    return (label or "").split(" (", 1)[0].split(" |", 1)[0].strip()
+
+
+@dataclass
+class Entity:
+    kind: str                 # "npc", "pc", "quest", "loc", "loc_minor", "player", "item"
+    key: str                  # npc_id / pc_id / quest_id / location name
+    name: str                 # display name, as stored on the model
+    snippet_id: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+
+
+@dataclass
+class Mention:
+    entity: Entity
+    start: int                # offsets into the normalized text
+    end: int
+    matched: str
+
+
+@dataclass
+class _Node:
+    children: Dict[str, int] = field(default_factory=dict)
+    fail: int = 0
+    word: Optional[str] = None                          # pattern ending exactly here
+    outputs: List[str] = field(default_factory=list)  # all patterns ending here (via fail links)
+
+
+class EntityIndex:
+    """
+    Per-game lookup structure for entity names.
+
+    Two parts:
+    - hash maps from normalized name -> entities, for exact lookups
+    - an Aho-Corasick automaton over all normalized names, so one pass over
+      a player message finds every entity it mentions
+
+    Entities are added/removed one at a time; the automaton's failure links are
+    recomputed lazily on the next scan after a change.
+    """
+
+    def __init__(self):
+        self._entities: Dict[Tuple[str, str], Entity] = {}
+        self._keys_by_kind: Dict[str, set] = {}
+        self._by_name: Dict[str, List[Entity]] = {}
+        self._nodes: List[_Node] = [_Node()]
+        self._links_dirty = False
+        self._trie_dirty = False
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # mutation
+    # ------------------------------------------------------------------
+
+    def add(self, entity: Entity):
+        ek = (entity.kind, entity.key)
+        old = self._entities.get(ek)
+        if old is not None:
+            if old.name == entity.name and old.aliases == entity.aliases and old.snippet_id == entity.snippet_id:
+                return
+            self.remove(entity.kind, entity.key)
+
+        self._entities[ek] = entity
+        self._keys_by_kind.setdefault(entity.kind, set()).add(entity.key)
+        for pattern in self._patterns(entity):
+            bucket = self._by_name.setdefault(pattern, [])
+            if not bucket:
+                self._insert(pattern)
+            bucket.append(entity)
+        self.version += 1
+
+    def remove(self, kind: str, key: str):
+        entity = self._entities.pop((kind, key), None)
+        if entity is None:
+            return
+        self._keys_by_kind.get(kind, set()).discard(key)
+        for pattern in self._patterns(entity):
+            bucket = self._by_name.get(pattern, [])
+            bucket[:] = [e for e in bucket if e is not entity]
+            if not bucket:
+                self._by_name.pop(pattern, None)
+                # tries can't cheaply drop a word; rebuild on next scan
+                self._trie_dirty = True
+        self.version += 1
+
+    def sync_kind(self, kind: str, entities: Iterable[Entity]):
+        # Make the index hold exactly `entities` for this kind; unchanged entries are left alone.
+        incoming = {e.key: e for e in entities}
+        for key in list(self._keys_by_kind.get(kind, ())):
+            if key not in incoming:
+                self.remove(kind, key)
+        for entity in incoming.values():
+            self.add(entity)
+        return self
+
+    def sync_world(self, world: Optional[World_State]):
+        major = []
+        minor = []
+        if world is not None:
+            for loc in (world.major_locations or []):
+                name = loc.get("name")
+                if name:
+                    major.append(Entity("loc", name, name, snippet_id=f"loc:{name}"))
+            for loc in (world.minor_locations or []):
+                name = loc.get("name")
+                if name:
+                    minor.append(Entity("loc_minor", name, name, snippet_id=f"loc_minor:{name}"))
+        self.sync_kind("loc", major)
+        self.sync_kind("loc_minor", minor)
+        return self
+
+    def sync_pcs(self, pcs: Dict[str, PlayerCharacter]):
+        chars = []
+        players = []
+        for pc_id, pc in (pcs or {}).items():
+            chars.append(Entity("pc", pc_id, pc.name, snippet_id=f"pc:{pc.name}"))
+            if pc.player_name:
+                players.append(Entity("player", pc_id, pc.player_name, snippet_id=f"pc:{pc.name}"))
+        self.sync_kind("pc", chars)
+        self.sync_kind("player", players)
+        return self
+
+    def sync_npcs(self, npcs: Dict[str, NPC]):
+        return self.sync_kind(
+            "npc",
+            [Entity("npc", npc_id, npc.name, snippet_id=f"npc:{npc.name}") for npc_id, npc in (npcs or {}).items()],
+        )
+
+    def sync_quests(self, quests: Dict[str, Quest]):
+        return self.sync_kind(
+            "quest",
+            [Entity("quest", qid, q.title, snippet_id=f"quest:{q.title}") for qid, q in (quests or {}).items()],
+        )
+
+    def sync_items(self, pcs: Dict[str, PlayerCharacter], npcs: Dict[str, NPC], quests: Dict[str, Quest]):
+        # Items only exist as inventory labels like "Longsword (weapon/sword) dmg 1d8"; key on the name part.
+        names = {}
+        labels = []
+        for pc in (pcs or {}).values():
+            labels.extend(pc.inventory or [])
+        for npc in (npcs or {}).values():
+            labels.extend(npc.inventory or [])
+        for q in (quests or {}).values():
+            labels.extend(q.reward_items or [])
+        for label in labels:
+            name = item_name_from_label(label)
+            if name:
+                names.setdefault(normalize_name(name), name)
+        return self.sync_kind("item", [Entity("item", key, name) for key, name in names.items()])
+
+    def sync_game(self, game):
+        # Accepts a GameState (or anything with the same attributes).
+        pcs = getattr(game, "player_characters", {}) or {}
+        npcs = getattr(game, "npcs", {}) or {}
+        quests = getattr(game, "quests", {}) or {}
+        self.sync_world(getattr(game, "world", None))
+        self.sync_pcs(pcs)
+        self.sync_npcs(npcs)
+        self.sync_quests(quests)
+        self.sync_items(pcs, npcs, quests)
+        return self
+
+    # ------------------------------------------------------------------
+    # lookup
+    # ------------------------------------------------------------------
+
+    def get(self, kind: str, key: str):
+        return self._entities.get((kind, key))
+
+    def entities(self, kinds: Optional[Iterable[str]] = None):
+        wanted = set(kinds) if kinds else None
+        return [e for (k, _), e in self._entities.items() if wanted is None or k in wanted]
+
+    def lookup(self, name: str, kinds: Optional[Iterable[str]] = None):
+        # Exact (normalized) name match.
+        wanted = set(kinds) if kinds else None
+        bucket = self._by_name.get(normalize_name(name), [])
+        return [e for e in bucket if wanted is None or e.kind in wanted]
+
+    def find_mentions(self, text: str, kinds: Optional[Iterable[str]] = None):
+        """
+        Single pass over `text` returning every whole-word entity mention.
+        Overlapping mentions are kept (e.g. "Iron Gate" and "Iron Gate Market").
+        """
+        norm = normalize_name(text)
+        if not norm or not self._by_name:
+            return []
+        self._ensure_automaton()
+        wanted = set(kinds) if kinds else None
+
+        mentions: List[Mention] = []
+        state = 0
+        nodes = self._nodes
+        for i, ch in enumerate(norm):
+            while state and ch not in nodes[state].children:
+                state = nodes[state].fail
+            state = nodes[state].children.get(ch, 0)
+            for pattern in nodes[state].outputs:
+                start = i - len(pattern) + 1
+                end = i + 1
+                # whole words only: normalized text is words joined by single spaces
+                if start > 0 and norm[start - 1] != " ":
+                    continue
+                if end < len(norm) and norm[end] != " ":
+                    continue
+                for entity in self._by_name.get(pattern, []):
+                    if wanted is None or entity.kind in wanted:
+                        mentions.append(Mention(entity, start, end, pattern))
+        return mentions
+
+    def resolve(self, text: str, kinds: Optional[Iterable[str]] = None):
+        """
+        Map free text to one entity, the way the old linear scans did:
+        exact name, then a name mentioned inside the text (longest wins),
+        then the text appearing inside a name.
+        """
+        norm = normalize_name(text)
+        if not norm:
+            return None
+        exact = self.lookup(norm, kinds)
+        if exact:
+            return exact[0]
+        mentions = self.find_mentions(norm, kinds)
+        if mentions:
+            return max(mentions, key=lambda m: m.end - m.start).entity
+        wanted = set(kinds) if kinds else None
+        for pattern, bucket in self._by_name.items():
+            if norm in pattern:
+                for entity in bucket:
+                    if wanted is None or entity.kind in wanted:
+                        return entity
+        return None
+
+    # ------------------------------------------------------------------
+    # automaton internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _patterns(entity: Entity):
+        out = []
+        for raw in (entity.name, *entity.aliases):
+            p = normalize_name(raw)
+            if p and p not in out:
+                out.append(p)
+        return out
+
+    def _insert(self, pattern: str):
+        if self._trie_dirty:
+            # full rebuild pending anyway
+            return
+        nodes = self._nodes
+        state = 0
+        for ch in pattern:
+            nxt = nodes[state].children.get(ch)
+            if nxt is None:
+                nodes.append(_Node())
+                nxt = len(nodes) - 1
+                nodes[state].children[ch] = nxt
+            state = nxt
+        nodes[state].word = pattern
+        self._links_dirty = True
+
+    def _ensure_automaton(self):
+        if self._trie_dirty:
+            self._nodes = [_Node()]
+            self._trie_dirty = False
+            for pattern in self._by_name:
+                self._insert(pattern)
+        if not self._links_dirty:
+            return
+
+        nodes = self._nodes
+        own = [[n.word] if n.word in self._by_name else [] for n in nodes]
+        nodes[0].outputs = []
+
+        queue = deque()
+        for child in nodes[0].children.values():
+            nodes[child].fail = 0
+            nodes[child].outputs = own[child]
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for ch, child in nodes[state].children.items():
+                f = nodes[state].fail
+                while f and ch not in nodes[f].children:
+                    f = nodes[f].fail
+                fallback = nodes[f].children.get(ch, 0)
+                nodes[child].fail = fallback if fallback != child else 0
+                nodes[child].outputs = own[child] + nodes[nodes[child].fail].outputs
+                queue.append(child)
+        self._links_dirty = False
+
+
+_INDEXES: Dict[str, EntityIndex] = {}
+
+
+def get_entity_index(key: str):
+    # One index per game id (or world id for generation-time lookups); both are
+    # dropped when the game is spilled or reset.
+    index = _INDEXES.get(key)
+    if index is None:
+        index = EntityIndex()
+        _INDEXES[key] = index
+    return index
+
+
+def drop_entity_index(key: str):
+    _INDEXES.pop(key, None)
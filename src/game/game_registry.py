@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from src import config
+from src.agent.types import Message
+from src.game.entity_index import drop_entity_index
+from src.game.game_state import GameState
+from src.game.message_store import drop_message_journal, get_message_journal, restore_context, sync_messages
+from src.game.persistence import flush_persistence
+from src.game.repository import get_repository
+from src.game.rng import GameRNG, get_game_rng, set_game_rng
+from src.metrics.metrics import metrics
+
+
+# The process-wide games dict (get_global_games()). It behaves like the old plain dict,
+# but remembers when each game was last used. maintain() spills games that have been
+# idle for games_idle_spill_s, or the least recently used ones once the registry is over
+# games_max_resident / games_memory_budget_mb: the game is saved through the repository
+# and dropped from memory. The next games[game_id] loads it back the way the Load
+# button does. Games without a world have nothing to save and are simply dropped.
+# Busy games and games held by a running request (hold(), taken by GameService) are never
+# spilled, and the save itself runs outside the registry lock; a game looked up while
+# its save is running stays resident as the same object. Loading a spilled game back
+# also runs outside the lock: the first lookup loads it, concurrent lookups of the same
+# id wait for that load, and lookups of other games are not held up.
+
+# run-time fields the save layer does not cover; kept for spilled games (they are tiny)
+_STASHED = ("player_names", "active_encounter", "active_encounter_summary", "encounter_history")
+
+
+def estimate_bytes(obj, _seen=None):
+    """Rough deep size of a game: walks containers and object __dict__s."""
+    seen = set() if _seen is None else _seen
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return total
+
+
+class GameRegistry(MutableMapping):
+    def __init__(self):
+        self._games: "OrderedDict[str, GameState]" = OrderedDict()   # least recently used first
+        self._last_access: Dict[str, float] = {}
+        self._spilled: Dict[str, Dict] = {}                           # game_id -> stashed run-time fields
+        self._sizes: Dict[str, int] = {}
+        self._spilling: Dict[str, GameState] = {}                     # saving right now, still live
+        self._in_use: Dict[str, int] = {}                              # game_id -> running requests
+        self._loading: Dict[str, threading.Event] = {}                # rehydrating right now
+        self._lock = threading.RLock()
+        self._last_maintain = 0.0
+
+    # ------------------------------------------------------------------
+    # mapping
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, game_id: str):
+        while True:
+            with self._lock:
+                game = self._games.get(game_id)
+                if game is None:
+                    game = self._spilling.pop(game_id, None)
+                    if game is not None:
+                        # asked for while its spill is saving: keep the live object, cancel the drop
+                        self._games[game_id] = game
+                if game is not None:
+                    self._touch(game_id)
+                    return game
+                if game_id not in self._spilled:
+                    raise KeyError(game_id)
+                loading = self._loading.get(game_id)
+                if loading is None:
+                    loading = self._loading[game_id] = threading.Event()
+                    break
+            # someone else is loading it; look again once they are done
+            loading.wait()
+        try:
+            return self._rehydrate(game_id)
+        finally:
+            with self._lock:
+                self._loading.pop(game_id, None)
+            loading.set()
+
+    def __setitem__(self, game_id: str, game: GameState):
+        with self._lock:
+            self._spilled.pop(game_id, None)
+            self._spilling.pop(game_id, None)
+            self._games[game_id] = game
+            self._touch(game_id)
+            over = len(self._games) > config.games_max_resident
+        # the size walk stays rate-limited; only a resident-count overflow forces it
+        self.maintain(force=over)
+
+    def __delitem__(self, game_id: str):
+        with self._lock:
+            if game_id in self._games:
+                del self._games[game_id]
+                self._last_access.pop(game_id, None)
+                self._sizes.pop(game_id, None)
+                metrics.drop_gauge(f"games.bytes.{game_id}")
+            elif self._spilling.pop(game_id, None) is None and self._spilled.pop(game_id, None) is None:
+                raise KeyError(game_id)
+
+    def __contains__(self, game_id):
+        return game_id in self._games or game_id in self._spilling or game_id in self._spilled
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._games) + list(self._spilling) + list(self._spilled))
+
+    def __len__(self):
+        return len(self._games) + len(self._spilling) + len(self._spilled)
+
+    # ------------------------------------------------------------------
+    # residency
+    # ------------------------------------------------------------------
+
+    def _touch(self, game_id: str):
+        self._games.move_to_end(game_id)
+        self._last_access[game_id] = time.monotonic()
+
+    def is_resident(self, game_id: str):
+        return game_id in self._games
+
+    def peek(self, game_id: str):
+        # resident game without counting it as an access (background jobs looking around)
+        return self._games.get(game_id)
+
+    @contextmanager
+    def hold(self, game_id: str):
+        """Keep game_id resident while a request works on it."""
+        with self._lock:
+            self._in_use[game_id] = self._in_use.get(game_id, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                left = self._in_use[game_id] - 1
+                if left:
+                    self._in_use[game_id] = left
+                else:
+                    del self._in_use[game_id]
+
+    def _can_spill(self, game_id: str):
+        game = self._games.get(game_id)
+        return game is not None and not game.busy and not self._in_use.get(game_id)
+
+    @property
+    def resident(self):
+        return list(self._games)
+
+    @property
+    def spilled(self):
+        return list(self._spilled)
+
+    def spill(self, game_id: str):
+        """Save a resident game and drop it from memory; returns False if it cannot go yet."""
+        with self._lock:
+            if not self._can_spill(game_id):
+                return False
+            game = self._games.pop(game_id)
+            self._last_access.pop(game_id, None)
+            self._sizes.pop(game_id, None)
+            self._spilling[game_id] = game
+        stash = {name: getattr(game, name) for name in _STASHED}
+        try:
+            if game.world is not None:
+                sync_messages(game, game_id)
+                flush_persistence(timeout=config.persist_flush_timeout_s)
+                get_message_journal(game_id).flush()
+                get_repository().save_game(game, game_id, rng=get_game_rng(game_id).to_dict())
+        except Exception:
+            # keep it in memory and try again on a later pass
+            with self._lock:
+                if self._spilling.pop(game_id, None) is not None:
+                    self._games[game_id] = game
+                    self._touch(game_id)
+            metrics.increment("games.spill_errors")
+            return False
+        with self._lock:
+            if self._spilling.pop(game_id, None) is None:
+                return False    # opened again while saving; it stays resident
+            if game.world is not None:
+                self._spilled[game_id] = stash
+                drop_entity_index(game.world.world_id)   # generation-time index of its world
+            drop_entity_index(game_id)
+            drop_message_journal(game_id)
+        metrics.increment("games.spills")
+        metrics.drop_gauge(f"games.bytes.{game_id}")
+        return True
+
+    def _rehydrate(self, game_id: str):
+        # same steps as the sidebar Load button; runs outside the lock, published under it
+        from src.agent.persona import DM_SYSTEM_PROMPT_TEMPLATE
+        from src.game.turn_store import load_turn_log
+
+        started = time.perf_counter()
+        repo = get_repository()
+        try:
+            world, players, npcs, quests, init_order, active_idx = repo.load_game(game_id)
+        except FileNotFoundError:
+            # save removed behind our back; forget the game
+            with self._lock:
+                self._spilled.pop(game_id, None)
+            raise KeyError(game_id)
+        game = GameState(
+            world=world,
+            player_characters=players,
+            npcs=npcs,
+            quests=quests,
+            initiative_order=init_order,
+            active_turn_index=active_idx,
+        )
+        rng = GameRNG.from_dict(repo.load_rng_state(game_id))
+        if world is not None:
+            game.turn_log = load_turn_log(game_id)
+            system_prompt = DM_SYSTEM_PROMPT_TEMPLATE.format(
+                title=world.title,
+                world_summary=world.world_summary,
+                lore=world.lore,
+                players=", ".join(world.players) if world.players else "Unnamed adventurers",
+            )
+            game.messages = [Message(role="system", content=system_prompt)] + restore_context(game_id)
+        with self._lock:
+            stash = self._spilled.pop(game_id, None)
+            if stash is None:
+                # replaced or deleted while we were reading; the registry's answer wins
+                current = self._games.get(game_id)
+                if current is None:
+                    raise KeyError(game_id)
+                self._touch(game_id)
+                return current
+            for name, value in stash.items():
+                setattr(game, name, value)
+            set_game_rng(game_id, rng)
+            self._games[game_id] = game
+            self._touch(game_id)
+        metrics.increment("games.rehydrations")
+        metrics.gauge("games.rehydrate_s", round(time.perf_counter() - started, 4))
+        return game
+
+    def maintain(self, force: bool = False, now: Optional[float] = None):
+        """Spill idle / over-budget games and publish gauges; rate-limited unless force."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not force and now - self._last_maintain < config.games_maintain_interval_s:
+                return []
+            self._last_maintain = now
+            for game_id, game in self._games.items():
+                self._sizes[game_id] = estimate_bytes(game)
+
+            # pick in LRU order under the lock, save outside it
+            candidates = []
+            resident = len(self._games)
+            total = sum(self._sizes.values())
+            newest = next(reversed(self._games), None)
+            for game_id in list(self._games):
+                if game_id == newest:
+                    break   # never spill the game that was just used
+                idle = now - self._last_access.get(game_id, now)
+                over = resident > config.games_max_resident or total > config.games_memory_budget_mb * 1024 * 1024
+                if (idle >= config.games_idle_spill_s or over) and self._can_spill(game_id):
+                    candidates.append(game_id)
+                    resident -= 1
+                    total -= self._sizes.get(game_id, 0)
+        spilled = [game_id for game_id in candidates if self.spill(game_id)]
+        with self._lock:
+            self._report()
+        return spilled
+
+    def _report(self):
+        metrics.gauge("games.resident", len(self._games))
+        metrics.gauge("games.spilled", len(self._spilled))
+        metrics.gauge("games.resident_bytes", sum(self._sizes.values()))
+        for game_id, size in self._sizes.items():
+            metrics.gauge(f"games.bytes.{game_id}", size)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Dict, List, Optional
+from typing import Dict, List, MutableMapping, Optional
 
 from src.game.models import World_State, PlayerCharacter, NPC, Quest
 from src.agent.types import Message
@@ -11,8 +11,9 @@ class GameState:
     messages: List[Message] = field(default_factory=list)
     player_names: List[str] = field(default_factory=list)
     player_characters: Dict[str, PlayerCharacter] = field(default_factory=dict)
-    npcs: Dict[str, NPC] = field(default_factory=dict)
-    quests: Dict[str, Quest] = field(default_factory=dict)
+    # plain dicts, or LazyEntityMaps (models built on first access) after load_game
+    npcs: MutableMapping[str, NPC] = field(default_factory=dict)
+    quests: MutableMapping[str, Quest] = field(default_factory=dict)
     initiative_order: List[str] = field(default_factory=list)  # ordered list of pc_ids
     active_turn_index: int = 0  # index into initiative_order
     active_encounter: Optional[str] = None
@@ -21,11 +22,15 @@ class GameState:
     busy: bool = False  # shared flag so all sessions know the model is running
     busy_by: Optional[str] = None  # who triggered the work
     busy_task: Optional[str] = None  # what is running
+    # content hash of each section as last written, keyed "<target>|<section>"; lets saves skip clean sections
+    save_hashes: Dict[str, str] = field(default_factory=dict, repr=False, compare=False)
 
 @lru_cache(maxsize=1)
 def get_global_games():
     
     # Global dictionary of all active games, keyed by game_id.Because of @lru_cache, this dict is created once 
     # per Python process and reused across all Streamlit sessions. That makes it shared state.
+    # It is a GameRegistry: idle games are saved and dropped, then reloaded on next access.
     
-    return {}
+    from src.game.game_registry import GameRegistry
+    return GameRegistry()
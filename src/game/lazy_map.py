@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class LazyEntityMap(MutableMapping):
+    """
+    {id: model} that holds raw records (codec rows or JSON dicts) and builds each
+    model the first time it is read. Assigning a model stores it as-is.
+
+    Iteration and `in` only touch keys; .values()/.items() build what they visit.
+    Unbuilt rows can be written back untouched (see codec.encode_section), so loading
+    and re-saving a big world never constructs the NPCs nobody looked at.
+    """
+
+    def __init__(
+        self,
+        raw: Optional[Dict[str, Any]] = None,
+        build: Optional[Callable[[Any], Any]] = None,
+        fields: Optional[Tuple[str, ...]] = None,
+    ):
+        self._data: Dict[str, Any] = dict(raw or {})
+        self._raw = set(self._data)
+        self._build = build
+        self.fields = fields    # column order of the raw rows, when they are codec rows
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if key in self._raw:
+            value = self._build(value)
+            self._data[key] = value
+            self._raw.discard(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+        self._raw.discard(key)
+
+    def __delitem__(self, key):
+        del self._data[key]
+        self._raw.discard(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return f"LazyEntityMap({len(self._data)} entries, {self.loaded_count} built)"
+
+    @property
+    def loaded_count(self):
+        return len(self._data) - len(self._raw)
+
+    def is_loaded(self, key: str):
+        return key in self._data and key not in self._raw
+
+    def copy(self):
+        # shallow: shares raw rows and built models, like dict.copy()
+        other = LazyEntityMap(build=self._build, fields=self.fields)
+        other._data = dict(self._data)
+        other._raw = set(self._raw)
+        return other
+
+    def encoded_rows(self, dump: Callable[[Any], list]):
+        # raw rows pass through; only models that were built (and maybe changed) are dumped
+        return [value if key in self._raw else dump(value) for key, value in self._data.items()]
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src import config
+from src.agent.types import Message
+from src.game.change_feed import notify_change
+from src.game.persistence import persist
+
+
+# Chat transcript per game, saves/games/<game_id>/messages.jsonl: one compact JSON line
+# per message, in order, each with its journal seq. The journal keeps only the last
+# `hot_window` messages in memory plus one byte offset per line, so older messages can
+# be paged back in with a single seek.
+#
+# game.messages stays the DM's working context. sync_messages() journals whatever in it
+# has no seq yet and then trims it to config.message_context_cap (first prompt and the
+# pinned system prompts survive; everything dropped is already on disk).
+
+MESSAGES_ROOT = Path("saves") / "games"
+
+# system messages that stay in the DM context however long the game runs
+PINNED_MARKERS = ("[SUMMARY]", "PARTY SUMMARY", "[MECHANICS]")
+
+# roles shown in the game log; everything else is DM context only
+VISIBLE_ROLES = ("user", "assistant")
+
+
+def _slug(text: str):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", text).strip("_") or "game"
+
+
+def _to_line(msg: Message):
+    data = {"seq": msg.seq, "role": msg.role, "content": msg.content}
+    if msg.speaker is not None:
+        data["speaker"] = msg.speaker
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _from_line(line: bytes | str):
+    data = json.loads(line)
+    return Message(role=data["role"], content=data["content"], speaker=data.get("speaker"), seq=data["seq"])
+
+
+def _read_line(line: bytes, seq: int):
+    # a line that does not parse keeps its seq as a placeholder, so seqs stay consecutive
+    try:
+        return _from_line(line)
+    except (ValueError, KeyError):
+        return Message(role="system", content="[unreadable message]", seq=seq)
+
+
+def _line_role(line: bytes):
+    # _to_line writes role before content, so the first "role" key is the real one
+    start = line.find(b'"role":"') + 8
+    return line[start:line.find(b'"', start)].decode("ascii", "replace")
+
+
+class MessageJournal:
+    def __init__(self, game_id: str, root: Path | str | None = None, hot_window: Optional[int] = None):
+        self.game_id = game_id
+        self.path = Path(root or MESSAGES_ROOT) / _slug(game_id) / "messages.jsonl"
+        self.hot_window = hot_window or config.message_hot_window
+        self._hot: deque = deque(maxlen=self.hot_window)
+        self._offsets = array("Q")        # byte offset of line seq-1, for lines on disk
+        self._visible = array("Q")        # seqs of VISIBLE_ROLES messages, ascending
+        self._pending: List[Message] = []
+        self._lock = threading.RLock()
+        self.seq = 0
+        self._scan()
+
+    def _scan(self):
+        # one pass over the file: offsets for every line, full parse only for the tail
+        if not self.path.exists():
+            return
+        tail: deque = deque(maxlen=self.hot_window)
+        offset = 0
+        torn = False
+        with self.path.open("rb") as fh:
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    torn = True   # crash mid-append
+                    break
+                self._offsets.append(offset)
+                offset += len(line)
+                if _line_role(line) in VISIBLE_ROLES:
+                    self._visible.append(len(self._offsets))
+                tail.append((len(self._offsets), line))
+        if torn:
+            # drop the partial line so the next flush starts on a line of its own
+            with self.path.open("r+b") as fh:
+                fh.truncate(offset)
+        self.seq = len(self._offsets)
+        self._hot.extend(_read_line(line, seq) for seq, line in tail)
+
+    def __len__(self):
+        return self.seq
+
+    def append(self, msg: Message):
+        """Give msg the next seq and queue it for the file; returns msg."""
+        with self._lock:
+            self.seq += 1
+            msg.seq = self.seq
+            self._pending.append(msg)
+            self._hot.append(msg)
+            if msg.role in VISIBLE_ROLES:
+                self._visible.append(msg.seq)
+        return msg
+
+    def flush(self):
+        # write queued lines; called from the persistence worker or before a disk read
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as fh:
+                offset = fh.tell()
+                for msg in pending:
+                    data = _to_line(msg).encode("utf-8")
+                    self._offsets.append(offset)
+                    offset += len(data)
+                    fh.write(data)
+            return len(pending)
+
+    @property
+    def first_hot_seq(self):
+        return self._hot[0].seq if self._hot else self.seq + 1
+
+    def recent(self, n: Optional[int] = None):
+        """The newest n messages (at most the hot window), oldest first."""
+        with self._lock:
+            hot = list(self._hot)
+        return hot if n is None or n >= len(hot) else hot[-n:]
+
+    def page(self, before_seq: Optional[int] = None, limit: int = 50):
+        """Up to `limit` messages with seq < before_seq (default: the newest), oldest first."""
+        end = (self.seq + 1) if before_seq is None else min(before_seq, self.seq + 1)
+        start = max(1, end - limit)
+        if start >= end:
+            return []
+        with self._lock:
+            if start >= self.first_hot_seq:
+                first = self.first_hot_seq
+                hot = list(self._hot)
+                return hot[start - first:end - first]
+            self.flush()
+            with self.path.open("rb") as fh:
+                fh.seek(self._offsets[start - 1])
+                return [_read_line(fh.readline(), seq) for seq in range(start, end)]
+
+    @property
+    def visible_count(self):
+        return len(self._visible)
+
+    def visible(self, limit: int, before_seq: Optional[int] = None):
+        """The last `limit` player/DM messages before before_seq, oldest first (via the role index)."""
+        with self._lock:
+            end = len(self._visible) if before_seq is None else bisect_left(self._visible, before_seq)
+            return self._fetch(self._visible[max(0, end - limit):end])
+
+    def _fetch(self, seqs):
+        # seqs ascending; hot ones come from memory, the rest with one seek each
+        first = self.first_hot_seq
+        cold = [seq for seq in seqs if seq < first]
+        out = []
+        if cold:
+            self.flush()
+            with self.path.open("rb") as fh:
+                for seq in cold:
+                    fh.seek(self._offsets[seq - 1])
+                    out.append(_read_line(fh.readline(), seq))
+        hot = list(self._hot)
+        out.extend(hot[seq - first] for seq in seqs if seq >= first)
+        return out
+
+    def iter_all(self) -> Iterator[Message]:
+        """Every message, oldest first, streamed from disk."""
+        with self._lock:
+            self.flush()
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as fh:
+            for seq, line in enumerate(fh, 1):
+                if line.endswith(b"\n"):
+                    yield _read_line(line, seq)
+
+    def find_recent(self, pred: Callable[[Message], bool]):
+        # newest matching message in the hot window, or None
+        for msg in reversed(self.recent()):
+            if pred(msg):
+                return msg
+        return None
+
+    def rotate(self):
+        """Start an empty journal; the old file is kept as messages.<timestamp>.jsonl."""
+        with self._lock:
+            self.flush()
+            if self.path.exists():
+                stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+                os.replace(self.path, self.path.with_name(f"messages.{stamp}.jsonl"))
+            self._hot.clear()
+            self._offsets = array("Q")
+            self._visible = array("Q")
+            self.seq = 0
+
+
+_JOURNALS: Dict[str, MessageJournal] = {}
+
+
+def get_message_journal(game_id: str, root: Path | str | None = None):
+    key = f"{root or MESSAGES_ROOT}|{game_id}"
+    journal = _JOURNALS.get(key)
+    if journal is None:
+        journal = MessageJournal(game_id, root)
+        _JOURNALS[key] = journal
+    return journal
+
+
+def drop_message_journal(game_id: str, root: Path | str | None = None):
+    # frees the hot window; the next get_message_journal() rescans the file
+    journal = _JOURNALS.pop(f"{root or MESSAGES_ROOT}|{game_id}", None)
+    if journal is not None:
+        journal.flush()
+
+
+def _pinned(msg: Message):
+    return msg.role == "system" and any(marker in msg.content for marker in PINNED_MARKERS)
+
+
+def trim_context(messages: List[Message], cap: Optional[int] = None):
+    """Cap a DM context list: keep the first message, pinned prompts and the newest rest."""
+    cap = cap or config.message_context_cap
+    if len(messages) <= cap:
+        return messages
+    head = messages[:1]
+    rest = messages[1:]
+    pinned = [m for m in rest if _pinned(m)]
+    budget = max(0, cap - len(head) - len(pinned))
+    recent_ids = {id(m) for m in (rest[-budget:] if budget else [])}
+    return head + [m for m in rest if id(m) in recent_ids or _pinned(m)]
+
+
+def sync_messages(game, game_id: str, root: Path | str | None = None):
+    """Journal new messages in game.messages, queue the write, and cap the list."""
+    journal = get_message_journal(game_id, root)
+    fresh = [m for m in game.messages if m.seq is None]
+    for msg in fresh:
+        journal.append(msg)
+    if fresh:
+        persist(("messages", journal.path), journal.flush)
+        notify_change(game_id)
+    game.messages = trim_context(game.messages)
+    return journal
+
+
+def restore_context(game_id: str, n: int = 18, root: Path | str | None = None):
+    """The newest n player/DM messages from the journal, for rebuilding DM context after a load."""
+    journal = get_message_journal(game_id, root)
+    out: List[Message] = []
+    before = None
+    while len(out) < n and (before is None or before > 1):
+        batch = journal.page(before, limit=max(n * 2, 50))
+        if not batch:
+            break
+        out = [m for m in batch if m.role != "system"] + out
+        before = batch[0].seq
+    return out[-n:]
@@ -1,8 +1,51 @@
+import itertools
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import List, Dict, Optional
 
 
+# Process-wide edit stamps: every change to a PC's stats or skills (including in-place
+# edits such as pc.stats["DEX"] = 14) gives the PC a new, never reused version, so
+# caches keyed on it (action_modifiers.modifier_table) check freshness in O(1).
+_VERSIONS = itertools.count(1)
+
+
+def _bump(owner):
+    if owner is not None:
+        object.__setattr__(owner, "version", next(_VERSIONS))
+
+
+def _tracked(base, name):
+    def method(self, *args, **kwargs):
+        out = getattr(base, name)(self, *args, **kwargs)
+        _bump(getattr(self, "_owner", None))      # unset while pickle restores the items
+        return self if name == "__iadd__" else out
+    return method
+
+
+class _TrackedDict(dict):
+    __slots__ = ("_owner",)
+
+    def __init__(self, *args, owner=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._owner = owner
+
+
+class _TrackedList(list):
+    __slots__ = ("_owner",)
+
+    def __init__(self, *args, owner=None):
+        super().__init__(*args)
+        self._owner = owner
+
+
+for _name in ("__setitem__", "__delitem__", "update", "pop", "popitem", "clear", "setdefault"):
+    setattr(_TrackedDict, _name, _tracked(dict, _name))
+for _name in ("__setitem__", "__delitem__", "__iadd__", "append", "extend", "insert", "pop", "remove",
+              "clear", "sort", "reverse"):
+    setattr(_TrackedList, _name, _tracked(list, _name))
+
+
 @dataclass
 class World_State:
     world_id: str
@@ -87,10 +130,24 @@ class PlayerCharacter:
     notes: List[str] = field(default_factory=list)
     created_on: datetime = field(default_factory=datetime.utcnow)
     last_updated: Optional[datetime] = None
-    
+
+    # fields that must be assigned through __setattr__ (codec builders re-assign them)
+    _TRACKED_FIELDS = ("stats", "skills")
+
+    def __setattr__(self, name, value):
+        # stats/skills are wrapped so in-place edits bump `version` too
+        if name == "stats" and isinstance(value, dict):
+            value = _TrackedDict(value, owner=self)
+        elif name == "skills" and isinstance(value, list):
+            value = _TrackedList(value, owner=self)
+        object.__setattr__(self, name, value)
+        if name in self._TRACKED_FIELDS:
+            _bump(self)
 
     def to_dict(self):
         data = asdict(self)
+        data["stats"] = dict(data["stats"])
+        data["skills"] = list(data["skills"])
         if isinstance(self.created_on, datetime):
             data["created_on"] = self.created_on.isoformat()
         if isinstance(self.last_updated, datetime):
@@ -3,6 +3,7 @@ import json
 from typing import Dict
 
 from src.game.models import NPC
+from src.game.repository import sqlite_repository
 
 BASE_DIR = Path(__file__).resolve().parents[2]
 NPC_SAVE_DIR = BASE_DIR / "saves" / "npcs"
@@ -12,13 +13,25 @@ def _world_npc_path(world_id: str):
     return NPC_SAVE_DIR / f"{world_id}_npcs.json"
 
 def save_npcs(world_id: str, npcs: Dict[str, NPC]):
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.save_npcs(world_id, npcs)
+    _save_npcs_json(world_id, npcs)
+
+def load_npcs(world_id: str):
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.load_npcs(world_id)
+    return _load_npcs_json(world_id)
+
+def _save_npcs_json(world_id: str, npcs: Dict[str, NPC]):
     NPC_SAVE_DIR.mkdir(parents=True, exist_ok=True)
     path = _world_npc_path(world_id)
     data = {npc_id: npc.to_dict() for npc_id, npc in npcs.items()}
     with path.open("w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
-def load_npcs(world_id: str):
+def _load_npcs_json(world_id: str):
     path = _world_npc_path(world_id)
     if not path.exists():
         return {}
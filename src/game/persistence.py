@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src import config
+from src.metrics.metrics import metrics
+
+
+# Write-behind persistence. UI handlers call persist(key, fn, *args) instead of writing
+# files themselves; one worker thread runs the writes in FIFO order. A key that is
+# already waiting in the queue is not queued twice: the newer call replaces the older
+# one, so ten saves of the same quest list in a burst become one write.
+#
+# Metrics: persist.queue_depth and persist.lag_s (seconds the oldest data for a job
+# waited before being written) are gauges; persist.writes / coalesced / inline / errors
+# are counters.
+
+_STOP = object()
+
+
+@dataclass
+class _Job:
+    fn: Callable
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    enqueued_at: float = 0.0
+
+
+class PersistenceWorker:
+    def __init__(self, maxsize: int = 256, name: str = "persistence"):
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._pending: Dict[Hashable, _Job] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """Queue fn(*args, **kwargs) under `key`; returns False if it had to run inline."""
+        job = _Job(fn, args, kwargs, time.monotonic())
+        with self._lock:
+            waiting = self._pending.get(key)
+            if waiting is not None:
+                # lag is measured from the first unsaved change, not the latest
+                job.enqueued_at = waiting.enqueued_at
+            self._pending[key] = job
+        if waiting is not None:
+            metrics.increment("persist.coalesced")
+            return True
+
+        self.start()
+        try:
+            self._queue.put_nowait(key)
+        except queue.Full:
+            # backpressure: rather than dropping or blocking forever, write on the caller
+            metrics.increment("persist.inline")
+            with self._lock:
+                job = self._pending.pop(key, None)
+            if job is not None:
+                self._run(job)
+            return False
+        metrics.gauge("persist.queue_depth", self._queue.qsize())
+        return True
+
+    def _run(self, job: _Job):
+        metrics.gauge("persist.lag_s", round(time.monotonic() - job.enqueued_at, 4))
+        try:
+            job.fn(*job.args, **job.kwargs)
+        except Exception as e:
+            self.last_error = e
+            metrics.increment("persist.errors")
+            return
+        metrics.increment("persist.writes")
+
+    def _loop(self):
+        while True:
+            key = self._queue.get()
+            try:
+                if key is _STOP:
+                    return
+                with self._lock:
+                    job = self._pending.pop(key, None)
+                if job is not None:
+                    self._run(job)
+            finally:
+                self._queue.task_done()
+                metrics.gauge("persist.queue_depth", self._queue.qsize())
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far is written; False on timeout."""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain()
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self._queue.all_tasks_done
+        with done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                done.wait(remaining)
+        return True
+
+    def _drain(self):
+        # no worker thread (never started, or interpreter shutting down): write on this thread
+        while True:
+            try:
+                key = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                job = self._pending.pop(key, None)
+            if job is not None and key is not _STOP:
+                self._run(job)
+            self._queue.task_done()
+
+    def stop(self, timeout: Optional[float] = None):
+        self.flush(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+_WORKER: Optional[PersistenceWorker] = None
+_WORKER_LOCK = threading.Lock()
+
+
+def get_worker():
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = PersistenceWorker(maxsize=config.persist_queue_size)
+            atexit.register(flush_persistence, config.persist_flush_timeout_s)
+        return _WORKER
+
+
+def persist(key: Hashable, fn: Callable, *args, **kwargs):
+    """Write in the background (or right away when config.persist_async is off)."""
+    if not config.persist_async:
+        return fn(*args, **kwargs)
+    return get_worker().submit(key, fn, *args, **kwargs)
+
+
+def flush_persistence(timeout: Optional[float] = None):
+    # Call before reading back files that may still be queued.
+    if _WORKER is None:
+        return True
+    return _WORKER.flush(timeout)
@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import Dict
 
 from src.game.models import PlayerCharacter
+from src.game.repository import sqlite_repository
 
 SAVE_DIR = Path("saves")
 SAVE_DIR.mkdir(exist_ok=True)
@@ -16,6 +17,22 @@ def load_player_characters(world_id: str):
     
     # Load all PCs for a given world as a dict {pc_id: PlayerCharacter}.
     
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.load_pcs(world_id)
+    return _load_pcs_json(world_id)
+
+
+def save_player_characters(world_id: str, pcs: Dict[str, PlayerCharacter]):
+    # Save all PCs for a given world from a dict {pc_id: PlayerCharacter}.
+    
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.save_pcs(world_id, pcs)
+    _save_pcs_json(world_id, pcs)
+
+
+def _load_pcs_json(world_id: str):
     path = _world_players_path(world_id)
     if not path.exists():
         return {}
@@ -29,9 +46,7 @@ def load_player_characters(world_id: str):
     return pcs
 
 
-def save_player_characters(world_id: str, pcs: Dict[str, PlayerCharacter]):
-    # Save all PCs for a given world from a dict {pc_id: PlayerCharacter}.
-    
+def _save_pcs_json(world_id: str, pcs: Dict[str, PlayerCharacter]):
     path = _world_players_path(world_id)
     data = {pc_id: pc.to_dict() for pc_id, pc in pcs.items()}
 
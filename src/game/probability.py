@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from math import comb
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.game.action_modifiers import (
+    ALLOWED_ACTION_TYPES,
+    DAMAGE_ACTION_TYPES,
+    base_dice_for,
+    compute_action_modifier,
+    evaluate_check,
+)
+from src.game.dice_engine import MAX_EXPLOSIONS, ConstTerm, DiceTerm, compile_expr
+from src.game.models import PlayerCharacter
+
+
+# Reason text used to put a check in each difficulty tier (both the modifier
+# and the DC read the reason, same as a live ROLL_REQUEST).
+TIER_REASONS: Dict[str, str] = {
+    "easy": "easy",
+    "normal": "",
+    "hard": "hard",
+    "very_hard": "very hard",
+}
+
+# Display order for tables
+ACTION_ORDER = [
+    "attack",
+    "stealth_check",
+    "perception_check",
+    "lockpick",
+    "persuasion",
+    "athletics",
+    "acrobatics",
+    "damage_light",
+    "damage_heavy",
+]
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """Exact outcome distribution: probs[i] is P(total == offset + i)."""
+    offset: int
+    probs: np.ndarray
+
+    @property
+    def min(self):
+        return self.offset
+
+    @property
+    def max(self):
+        return self.offset + len(self.probs) - 1
+
+    def mean(self):
+        values = np.arange(self.offset, self.offset + len(self.probs))
+        return float(values @ self.probs)
+
+    def p_at_least(self, target: int):
+        idx = target - self.offset
+        if idx <= 0:
+            return 1.0
+        if idx >= len(self.probs):
+            return 0.0
+        return float(self.probs[idx:].sum())
+
+    def shifted(self, amount: int):
+        return Distribution(self.offset + amount, self.probs)
+
+
+def _convolve(a: Distribution, b: Distribution):
+    return Distribution(a.offset + b.offset, np.convolve(a.probs, b.probs))
+
+
+def _die(sides: int, explode: bool):
+    # One die, exploding up to MAX_EXPLOSIONS extra rolls like dice_engine does.
+    if not explode:
+        return Distribution(1, np.full(sides, 1.0 / sides))
+    probs = np.zeros((MAX_EXPLOSIONS + 1) * sides)
+    for depth in range(MAX_EXPLOSIONS + 1):
+        weight = (1.0 / sides) ** (depth + 1)
+        base = depth * sides  # value so far from the max rolls before this one
+        last = sides if depth == MAX_EXPLOSIONS else sides - 1
+        for face in range(1, last + 1):
+            probs[base + face - 1] += weight
+    return Distribution(1, probs)
+
+
+def _sum_of(die: Distribution, count: int):
+    # Repeated squaring keeps this to O(log count) convolutions.
+    result = Distribution(0, np.array([1.0]))
+    power = die
+    while count:
+        if count & 1:
+            result = _convolve(result, power)
+        count >>= 1
+        if count:
+            power = _convolve(power, power)
+    return result
+
+
+def _keep(die: Distribution, count: int, mode: str, keep: int):
+    """
+    Sum of the `keep` highest (mode "h") or lowest ("l") of `count` iid dice.
+    Walk face values from the kept end; state is (dice placed, kept sum) and each
+    step places c of the remaining dice on the current face (multinomial weights).
+    """
+    faces = [(die.offset + i, p) for i, p in enumerate(die.probs) if p > 0]
+    if mode == "h":
+        faces.reverse()
+
+    states: Dict[tuple, float] = {(0, 0): 1.0}
+    for value, p in faces:
+        nxt: Dict[tuple, float] = {}
+        for (placed, kept_sum), prob in states.items():
+            remaining = count - placed
+            for c in range(remaining + 1):
+                w = prob * comb(remaining, c) * (p ** c)
+                if w == 0.0:
+                    continue
+                taken = min(c, max(0, keep - min(placed, keep)))
+                key = (placed + c, kept_sum + taken * value)
+                nxt[key] = nxt.get(key, 0.0) + w
+        states = nxt
+
+    totals = {s: pr for (placed, s), pr in states.items() if placed == count}
+    lo = min(totals)
+    probs = np.zeros(max(totals) - lo + 1)
+    for s, pr in totals.items():
+        probs[s - lo] += pr
+    return Distribution(lo, probs)
+
+
+def _term_distribution(term: DiceTerm):
+    die = _die(term.sides, term.explode)
+    if term.keep is None:
+        dist = _sum_of(die, term.count)
+    else:
+        mode, keep = term.keep
+        dist = _keep(die, term.count, mode, keep)
+    if term.sign < 0:
+        dist = Distribution(-dist.max, dist.probs[::-1].copy())
+    return dist
+
+
+@lru_cache(maxsize=512)
+def distribution(expr: str):
+    """Exact distribution of a dice expression's total. Memoized per expression string."""
+    compiled = compile_expr(expr)
+    dist = Distribution(0, np.array([1.0]))
+    for term in compiled.terms:
+        if isinstance(term, ConstTerm):
+            dist = dist.shifted(term.sign * term.value)
+        else:
+            dist = _convolve(dist, _term_distribution(term))
+    return dist
+
+
+@dataclass
+class CheckOdds:
+    action_type: str
+    modifier: int
+    dc: Optional[int]
+    p_success: Optional[float]   # None for damage rolls
+    expected: float              # mean of base dice + modifier
+
+
+def check_odds(pc: Optional[PlayerCharacter], action_type: str, reason: str = "", base_expr: Optional[str] = None):
+    # Odds for one PC/action pair, using the same modifier and DC rules as a live roll.
+    base = distribution(base_expr or base_dice_for(action_type))
+    modifier = compute_action_modifier(pc, action_type, reason)
+    dc, _ = evaluate_check(total=0, action_type=action_type, reason=reason)
+    p = None if dc is None else base.p_at_least(dc - modifier)
+    return CheckOdds(
+        action_type=action_type,
+        modifier=modifier,
+        dc=dc,
+        p_success=p,
+        expected=base.mean() + modifier,
+    )
+
+
+def success_probability(pc: Optional[PlayerCharacter], action_type: str, reason: str = "", base_expr: Optional[str] = None):
+    return check_odds(pc, action_type, reason, base_expr).p_success
+
+
+def success_table(pc: Optional[PlayerCharacter]):
+    """
+    {action_type: {tier: CheckOdds}} for every allowed action type and difficulty tier.
+    The base distributions are memoized, so this is a handful of array sums per PC.
+    """
+    table: Dict[str, Dict[str, CheckOdds]] = {}
+    for action_type in ACTION_ORDER:
+        if action_type not in ALLOWED_ACTION_TYPES:
+            continue
+        tiers = {"normal": ""} if action_type in DAMAGE_ACTION_TYPES else TIER_REASONS
+        table[action_type] = {
+            tier: check_odds(pc, action_type, reason) for tier, reason in tiers.items()
+        }
+    return table
+
+
+def success_table_rows(pc: Optional[PlayerCharacter]):
+    # Flat rows for st.table / st.dataframe in the character manager.
+    rows: List[Dict[str, object]] = []
+    for action_type, tiers in success_table(pc).items():
+        normal = tiers["normal"]
+        row: Dict[str, object] = {"action": action_type, "mod": f"{normal.modifier:+d}"}
+        if action_type in DAMAGE_ACTION_TYPES:
+            row["avg damage"] = round(normal.expected, 1)
+        else:
+            for tier in TIER_REASONS:
+                odds = tiers[tier]
+                row[tier.replace("_", " ")] = f"{odds.p_success * 100:.0f}% (DC {odds.dc})"
+        rows.append(row)
+    return rows
@@ -8,6 +8,7 @@ from typing import Dict
 import json
 
 from src.game.models import Quest
+from src.game.repository import sqlite_repository
 
 SAVES_DIR = Path("saves")
 
@@ -19,13 +20,27 @@ def _quests_file_path(world_id: str):
 
 def save_quests(world_id: str, quests: Dict[str, Quest]):
     
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.save_quests(world_id, quests)
+    _save_quests_json(world_id, quests)
+
+
+def load_quests(world_id: str):
+    
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.load_quests(world_id)
+    return _load_quests_json(world_id)
+
+
+def _save_quests_json(world_id: str, quests: Dict[str, Quest]):
     path = _quests_file_path(world_id)
     data = {qid: q.to_dict() for qid, q in quests.items()}
     path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
 
 
-def load_quests(world_id: str):
-    
+def _load_quests_json(world_id: str):
     path = _quests_file_path(world_id)
     if not path.exists():
         return {}
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src import config
+from src.game.game_state import GameState
+from src.game.models import NPC, PlayerCharacter, Quest, World_State
+
+
+# One place to ask for persistence. get_repository() returns the backend picked by
+# config.storage_backend: JsonRepository (the split JSON files, default) or
+# sqlite_store.SqliteRepository. Keys are game ids for whole games / turn events and
+# world ids for the per-world stores, same as the JSON layout.
+
+
+class JsonRepository:
+    """The existing JSON files behind the repository interface."""
+
+    def __init__(self, games_root: Path | str = "saves/games"):
+        self.games_root = Path(games_root)
+
+    # worlds
+    def save_world(self, key: str, world: World_State):
+        from src.game.save_state import _save_world_json
+        _save_world_json(world)
+
+    def load_world(self, key: str):
+        from src.game.save_state import _load_world_json
+        return _load_world_json(key)
+
+    # pcs
+    def save_pcs(self, key: str, pcs: Dict[str, PlayerCharacter]):
+        from src.game.player_store import _save_pcs_json
+        _save_pcs_json(key, pcs)
+
+    def upsert_pcs(self, key: str, pcs: Dict[str, PlayerCharacter]):
+        merged = {**self.load_pcs(key), **pcs}
+        self.save_pcs(key, merged)
+        return len(pcs)
+
+    def load_pcs(self, key: str):
+        from src.game.player_store import _load_pcs_json
+        return _load_pcs_json(key)
+
+    # npcs
+    def save_npcs(self, key: str, npcs: Dict[str, NPC]):
+        from src.game.npc_store import _save_npcs_json
+        _save_npcs_json(key, npcs)
+
+    def upsert_npcs(self, key: str, npcs: Dict[str, NPC]):
+        merged = {**self.load_npcs(key), **npcs}
+        self.save_npcs(key, merged)
+        return len(npcs)
+
+    def load_npcs(self, key: str, location: Optional[str] = None):
+        from src.game.npc_store import _load_npcs_json
+        npcs = _load_npcs_json(key)
+        if location is None:
+            return npcs
+        return {k: n for k, n in npcs.items() if n.location == location}
+
+    # quests
+    def save_quests(self, key: str, quests: Dict[str, Quest]):
+        from src.game.quest_store import _save_quests_json
+        _save_quests_json(key, quests)
+
+    def upsert_quests(self, key: str, quests: Dict[str, Quest]):
+        merged = {**self.load_quests(key), **quests}
+        self.save_quests(key, merged)
+        return len(quests)
+
+    def load_quests(self, key: str, status: Optional[str] = None):
+        from src.game.quest_store import _load_quests_json
+        quests = _load_quests_json(key)
+        if status is None:
+            return quests
+        return {k: q for k, q in quests.items() if q.status == status}
+
+    # turn events (the turns.jsonl journal is written by turn_store itself)
+    def append_turn_events(self, key: str, events: List[Dict]):
+        return None
+
+    def load_turn_events(self, key: str, after_seq: int = 0):
+        from src.game.turn_store import load_turn_log, turn_log_events
+        events = turn_log_events(load_turn_log(key, root=self.games_root))
+        return [e for e in events if e["seq"] > after_seq]
+
+    def load_turn_log(self, key: str):
+        from src.game.turn_store import load_turn_log
+        return load_turn_log(key, root=self.games_root)
+
+    # whole games
+    def save_game(self, game: GameState, game_id: str, rng: Optional[Dict] = None):
+        # rng state is read from the live registry by write_game itself
+        from src.game.save_load import write_game
+        return write_game(game, game_id, root=self.games_root)
+
+    def load_game(self, game_id: str):
+        from src.game.save_load import load_game
+        return load_game(game_id, root=self.games_root)
+
+    def load_rng_state(self, game_id: str):
+        from src.game.save_load import load_game_rng
+        return load_game_rng(game_id, root=self.games_root).to_dict()
+
+
+_REPOS: Dict[tuple, object] = {}
+
+
+def get_repository():
+    # Built once per backend/path; switching config.storage_backend takes effect on the next call.
+    if config.storage_backend == "sqlite":
+        key = ("sqlite", str(config.sqlite_path))
+        if key not in _REPOS:
+            from src.game.sqlite_store import SqliteRepository
+            _REPOS[key] = SqliteRepository(config.sqlite_path)
+        return _REPOS[key]
+    key = ("json", "saves/games")
+    if key not in _REPOS:
+        _REPOS[key] = JsonRepository()
+    return _REPOS[key]
+
+
+def sqlite_repository():
+    # The SQLite repository when that backend is active, else None (JSON stores write their own files).
+    if config.storage_backend != "sqlite":
+        return None
+    return get_repository()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import random
+import secrets
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Per-game seeded randomness. Every stream is counter based: draw k of stream s is
+# seeded from sha256(game_seed:s:k), so a stream can resume from the counter alone
+# (that is all meta.json stores) and any recorded draw can be replayed on its own.
+
+STREAMS = ("dice", "worldgen", "npc")
+
+
+def new_seed():
+    return secrets.randbits(63)
+
+
+def derive_seed(seed: int, stream: str, counter: int):
+    digest = hashlib.sha256(f"{seed}:{stream}:{counter}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+@dataclass
+class Draw:
+    stream: str
+    counter: int
+    op: str          # "randint 1 20", "choice 5", "numpy", ...
+    result: object
+
+
+class RNGStream:
+    """
+    One named stream. Offers the bits of the random.Random API the game uses
+    (randint / choice / random / getrandbits), so it can be passed as `rng=`
+    anywhere a random.Random is accepted.
+    """
+
+    def __init__(self, owner: "GameRNG", name: str, counter: int = 0):
+        self.owner = owner
+        self.name = name
+        self.counter = counter
+
+    def _next(self):
+        with self.owner._lock:
+            counter = self.counter
+            self.counter += 1
+        return counter, random.Random(derive_seed(self.owner.seed, self.name, counter))
+
+    def _record(self, counter: int, op: str, result):
+        self.owner._record(Draw(stream=self.name, counter=counter, op=op, result=result))
+        return result
+
+    def randint(self, a: int, b: int):
+        counter, r = self._next()
+        return self._record(counter, f"randint {a} {b}", r.randint(a, b))
+
+    def choice(self, seq: Sequence):
+        counter, r = self._next()
+        idx = r.randrange(len(seq))
+        self._record(counter, f"choice {len(seq)}", idx)
+        return seq[idx]
+
+    def random(self):
+        counter, r = self._next()
+        return self._record(counter, "random", r.random())
+
+    def getrandbits(self, k: int):
+        counter, r = self._next()
+        return self._record(counter, f"getrandbits {k}", r.getrandbits(k))
+
+    def numpy(self):
+        # One draw hands out a whole numpy Generator for batch work (simulations etc).
+        counter, _ = self._next()
+        self._record(counter, "numpy", None)
+        return np.random.default_rng(derive_seed(self.owner.seed, self.name, counter))
+
+
+class GameRNG:
+    def __init__(self, seed: Optional[int] = None, counters: Optional[Dict[str, int]] = None):
+        self.seed = int(seed) if seed is not None else new_seed()
+        self._lock = Lock()
+        self._pending: List[Draw] = []
+        self._streams: Dict[str, RNGStream] = {}
+        for name, counter in (counters or {}).items():
+            self._streams[name] = RNGStream(self, name, int(counter))
+
+    def stream(self, name: str):
+        if name not in self._streams:
+            self._streams[name] = RNGStream(self, name)
+        return self._streams[name]
+
+    def _record(self, draw: Draw):
+        with self._lock:
+            self._pending.append(draw)
+
+    def drain_draws(self):
+        # Draws since the last drain, oldest first; the turn log picks these up.
+        with self._lock:
+            draws, self._pending = self._pending, []
+        return draws
+
+    def counters(self):
+        return {name: s.counter for name, s in self._streams.items()}
+
+    def to_dict(self):
+        return {"seed": self.seed, "counters": self.counters()}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict]):
+        data = data or {}
+        return cls(seed=data.get("seed"), counters=data.get("counters"))
+
+
+def replay_draw(seed: int, draw: Dict):
+    """Recompute a recorded draw (as stored in the turn log) from the seed alone."""
+    r = random.Random(derive_seed(seed, draw["stream"], int(draw["counter"])))
+    op, *args = draw["op"].split()
+    if op == "randint":
+        return r.randint(int(args[0]), int(args[1]))
+    if op == "choice":
+        return r.randrange(int(args[0]))
+    if op == "random":
+        return r.random()
+    if op == "getrandbits":
+        return r.getrandbits(int(args[0]))
+    return None
+
+
+def draw_records(draws: List[Draw]):
+    return [asdict(d) for d in draws]
+
+
+_RNGS: Dict[str, GameRNG] = {}
+
+
+def get_game_rng(game_id: str):
+    # One RNG per game id; a fresh game gets a fresh random seed.
+    rng = _RNGS.get(game_id)
+    if rng is None:
+        rng = GameRNG()
+        _RNGS[game_id] = rng
+    return rng
+
+
+def set_game_rng(game_id: str, rng: GameRNG):
+    _RNGS[game_id] = rng
+    return rng
@@ -1,11 +1,19 @@
+import hashlib
 import json
+import os
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
+from src import config
+from src.game.codec import CODEC_VERSION, SECTION_EXT, decode_section, decode_section_dicts, encode_section
 from src.game.game_state import GameState
+from src.game.lazy_map import LazyEntityMap
 from src.game.models import World_State, PlayerCharacter, NPC, Quest
+from src.game.rng import GameRNG, get_game_rng
+from src.metrics.metrics import metrics
 
 
 def _slug(text: str):
@@ -18,55 +26,176 @@ def _conf_game_dir(game_id: str, root: Path | str = "saves/games") -> Path:
     return base
 
 
+@dataclass
+class SaveReport:
+    path: Path
+    written: Dict[str, int] = field(default_factory=dict)   # section -> bytes written
+    skipped: List[str] = field(default_factory=list)        # sections that were already clean
+
+    @property
+    def bytes_written(self):
+        return sum(self.written.values())
+
+
+def content_hash(payload: bytes):
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def section_dirty(game: GameState, key: str, payload: bytes, existing: Optional[Path] = None):
+    """
+    True if `payload` differs from what was last written under `key`. With no record
+    yet (fresh process, just loaded) the file on disk, if any, is the reference.
+    """
+    digest = content_hash(payload)
+    known = game.save_hashes.get(key)
+    if known is None and existing is not None and existing.exists():
+        known = content_hash(existing.read_bytes())
+        game.save_hashes[key] = known
+    return known != digest
+
+
+def _atomic_write(path: Path, payload: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def _encode(data: Dict[str, Any]):
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
 def _write_json(path: Path, data: Dict[str, Any]):
-    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    return _atomic_write(path, _encode(data))
 
 
-def save_game(game: GameState, game_id: str, root: Path | str = "saves/games") -> Path:
-    """Persist the game into split JSON files under saves/games/<game_id>."""
+def write_game(game: GameState, game_id: str, root: Path | str = "saves/games"):
+    """
+    Write the split save, skipping sections whose content has not changed since the
+    last save. Each file is replaced atomically. Returns a SaveReport.
+    """
     if game.world is None:
         raise ValueError("Cannot save: World is empty")
 
     base = _conf_game_dir(game_id, root)
-    timestamp = datetime.utcnow().isoformat()
-
-    _write_json(
-        base / "meta.json",
-        {
-            "game_id": game_id,
-            "world_id": getattr(game.world, "world_id", None),
-            "saved_at": timestamp,
-            "version": "1.0",
-            "players": list(game.player_characters.keys()),
-            "npcs": list(game.npcs.keys()),
-            "quests": list(game.quests.keys()),
-        },
-    )
-    _write_json(base / "world.json", game.world.to_dict())
-    _write_json(
-        base / "players.json",
-        {pc_id: pc.to_dict() for pc_id, pc in (game.player_characters or {}).items()},
-    )
-    _write_json(
-        base / "npcs.json",
-        {npc_id: npc.to_dict() for npc_id, npc in (game.npcs or {}).items()},
-    )
-    _write_json(
-        base / "quests.json",
-        {qid: quest.to_dict() for qid, quest in (game.quests or {}).items()},
-    )
-    _write_json(
-        base / "initiative.json",
-        {
-            "order": list(game.initiative_order or []),
-            "active_turn_index": int(game.active_turn_index or 0),
-        },
-    )
-    return base
+    report = SaveReport(path=base)
+    compact = config.save_format == "compact"
+    sections: Dict[str, bytes] = {}
+    stale = []
+    for stem, obj in (
+        ("world", game.world),
+        ("players", game.player_characters or {}),
+        ("npcs", game.npcs or {}),
+        ("quests", game.quests or {}),
+    ):
+        if compact:
+            sections[stem + SECTION_EXT] = encode_section(stem, obj, body=config.save_codec_body)
+            stale.append(base / f"{stem}.json")
+        else:
+            data = obj.to_dict() if stem == "world" else {k: v.to_dict() for k, v in obj.items()}
+            sections[stem + ".json"] = _encode(data)
+            stale.append(base / f"{stem}{SECTION_EXT}")
+    sections["initiative.json"] = _encode({
+        "order": list(game.initiative_order or []),
+        "active_turn_index": int(game.active_turn_index or 0),
+    })
+
+    # meta carries a timestamp, so only its stable part decides whether it is dirty
+    meta = {
+        "game_id": game_id,
+        "world_id": getattr(game.world, "world_id", None),
+        "version": "1.0",
+        "format": config.save_format,
+        "codec_version": CODEC_VERSION if compact else None,
+        "players": list(game.player_characters.keys()),
+        "npcs": list(game.npcs.keys()),
+        "quests": list(game.quests.keys()),
+        "rng": get_game_rng(game_id).to_dict(),
+    }
+
+    target = str(base.resolve())
+    for name, payload in sections.items():
+        key = f"{target}|{name}"
+        path = base / name
+        if not section_dirty(game, key, payload, path):
+            report.skipped.append(name)
+            continue
+        report.written[name] = _atomic_write(path, payload)
+        game.save_hashes[key] = content_hash(payload)
+
+    meta_key = f"{target}|meta.json"
+    meta_hash = content_hash(_encode(meta))
+    meta_path = base / "meta.json"
+    if meta_key not in game.save_hashes and meta_path.exists():
+        on_disk = json.loads(meta_path.read_text(encoding="utf-8"))
+        on_disk.pop("saved_at", None)
+        game.save_hashes[meta_key] = content_hash(_encode(on_disk))
+    if report.written or game.save_hashes.get(meta_key) != meta_hash or not meta_path.exists():
+        report.written["meta.json"] = _write_json(meta_path, {**meta, "saved_at": datetime.utcnow().isoformat()})
+        game.save_hashes[meta_key] = meta_hash
+    else:
+        report.skipped.append("meta.json")
+
+    # a section saved in the other format is now out of date
+    for path in stale:
+        if path.exists():
+            path.unlink()
+
+    metrics.increment("save.bytes_written", report.bytes_written)
+    metrics.increment("save.sections_written", len(report.written))
+    metrics.increment("save.sections_skipped", len(report.skipped))
+    return report
 
 
-def load_game(game_id: str, root: Path | str = "saves/games"):
-    """Load a split save for the given game_id."""
+def save_game(game: GameState, game_id: str, root: Path | str = "saves/games") -> Path:
+    """Persist the game into split section files under saves/games/<game_id>."""
+    return write_game(game, game_id, root).path
+
+
+_LEGACY = {
+    "world": World_State.from_dict,
+    "players": PlayerCharacter.from_dict,
+    "npcs": NPC.from_dict,
+    "quests": Quest.from_dict,
+}
+
+
+def load_section(base: Path, stem: str, lazy: bool = False):
+    """
+    Models for one section: the compact file if present, else the old JSON file.
+    lazy=True returns a LazyEntityMap that builds models on first access.
+    """
+    path = base / f"{stem}{SECTION_EXT}"
+    if path.exists():
+        return decode_section(path.read_bytes(), lazy=lazy)
+    path = base / f"{stem}.json"
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if not data:
+        return None if stem == "world" else {}
+    if stem == "world":
+        return World_State.from_dict(data)
+    build = _LEGACY[stem]
+    if lazy:
+        return LazyEntityMap(data, build)
+    return {k: build(v) for k, v in data.items()}
+
+
+def read_section(base: Path, stem: str):
+    """Plain dicts for one section, whichever format it was saved in (None if missing)."""
+    path = base / f"{stem}{SECTION_EXT}"
+    if path.exists():
+        return decode_section_dicts(path.read_bytes())
+    path = base / f"{stem}.json"
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def load_game(game_id: str, root: Path | str = "saves/games", lazy: bool = True):
+    """
+    Load a split save for the given game_id. NPCs and quests come back as
+    LazyEntityMaps (built on first access) unless lazy=False.
+    """
     base = Path(root) / _slug(game_id)
     if not base.exists():
         raise FileNotFoundError(f"No save folder for game id '{game_id}' at {base}")
@@ -77,17 +206,12 @@ def load_game(game_id: str, root: Path | str = "saves/games"):
             return default
         return json.loads(path.read_text(encoding="utf-8"))
 
-    world_data = _read("world.json")
-    world = World_State.from_dict(world_data) if world_data else None
-    players_data = _read("players.json", {}) or {}
-    npcs_data = _read("npcs.json", {}) or {}
-    quests_data = _read("quests.json", {}) or {}
+    world = load_section(base, "world")
+    players = load_section(base, "players") or {}
+    npcs = load_section(base, "npcs", lazy=lazy) or {}
+    quests = load_section(base, "quests", lazy=lazy) or {}
     initiative_data = _read("initiative.json", {}) or {}
 
-    players = {pc_id: PlayerCharacter.from_dict(pc) for pc_id, pc in players_data.items()}
-    npcs = {npc_id: NPC.from_dict(npc) for npc_id, npc in npcs_data.items()}
-    quests = {qid: Quest.from_dict(q) for qid, q in quests_data.items()}
-
     return (
         world,
         players,
@@ -96,3 +220,10 @@ def load_game(game_id: str, root: Path | str = "saves/games"):
         initiative_data.get("order", []),
         int(initiative_data.get("active_turn_index", 0)),
     )
+
+
+def load_game_rng(game_id: str, root: Path | str = "saves/games"):
+    """Seed and stream counters from meta.json; saves without them get a fresh seed."""
+    path = Path(root) / _slug(game_id) / "meta.json"
+    data = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    return GameRNG.from_dict(data.get("rng"))
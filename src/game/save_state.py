@@ -2,19 +2,34 @@ import json
 from pathlib import Path
 from typing import Optional
 from src.game.models import World_State
+from src.game.repository import sqlite_repository
 
 SAVE_DIR = Path("saves")
 SAVE_DIR.mkdir(exist_ok=True)
 
 
 def save_world_state(world: World_State):
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.save_world(world.world_id, world)
+    _save_world_json(world)
+
+
+def load_world_state(world_id: str):
+    repo = sqlite_repository()
+    if repo is not None:
+        return repo.load_world(world_id)
+    return _load_world_json(world_id)
+
+
+def _save_world_json(world: World_State):
     path = SAVE_DIR / f"{world.world_id}.json"
     data = world.to_dict()
     with path.open("w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False, default=str)
 
 
-def load_world_state(world_id: str):
+def _load_world_json(world_id: str):
     path = SAVE_DIR / f"{world_id}.json"
     if not path.exists():
         return None
@@ -0,0 +1,253 @@
+"""
+Headless Monte Carlo encounter simulator for balance checks before a session.
+
+    python -m src.game.simulator <game_id> [-n 10000] [--enemy-hp 30] ...
+
+Loads the party from a save (players.json via load_game) and plays `n` encounters
+against one generic enemy at once: every round is a handful of NumPy array ops over
+all encounters, never a Python call per roll.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.game.action_modifiers import (
+    ALLOWED_ACTION_TYPES,
+    DAMAGE_ACTION_TYPES,
+    PRIMARY_STAT,
+    ability_mod,
+    base_dice_for,
+    compute_action_modifier,
+    evaluate_check,
+)
+from src.game.dice_engine import compile_expr
+from src.game.models import PlayerCharacter
+from src.game.save_load import load_game, load_game_rng
+
+
+@dataclass
+class EnemySpec:
+    hp: int = 30
+    attack_bonus: int = 4
+    damage: str = "1d8+2"
+    difficulty: str = ""      # reason text for the party's attack DC, e.g. "hard"
+
+
+@dataclass
+class PCReport:
+    pc_id: str
+    name: str
+    damage_action: str
+    hit_rate: float
+    damage_mean: float        # per encounter
+    damage_p90: float
+    downed_rate: float
+    check_success: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class SimulationReport:
+    encounters: int
+    win_rate: float
+    loss_rate: float
+    timeout_rate: float
+    rounds_mean: float
+    rounds_p50: float
+    rounds_p90: float
+    rounds_hist: Dict[int, int]
+    party_damage_mean: float
+    pcs: List[PCReport]
+    elapsed_s: float
+
+
+def damage_action_for(pc: PlayerCharacter):
+    # Light (finesse) weapons for DEX-leaning PCs, heavy for STR-leaning ones.
+    stats = pc.stats or {}
+    light, heavy = PRIMARY_STAT["damage_light"], PRIMARY_STAT["damage_heavy"]
+    return "damage_light" if stats.get(light, 10) > stats.get(heavy, 10) else "damage_heavy"
+
+
+def _defense(pc: PlayerCharacter):
+    return 10 + ability_mod((pc.stats or {}).get("DEX", 10))
+
+
+def _check_success_rates(pc: PlayerCharacter, n: int, rng: np.random.Generator):
+    # Plain skill checks at normal difficulty, same DC rule as a live ROLL_REQUEST.
+    d20 = compile_expr(base_dice_for("attack"))
+    rates: Dict[str, float] = {}
+    for action_type in sorted(ALLOWED_ACTION_TYPES - DAMAGE_ACTION_TYPES):
+        dc, _ = evaluate_check(total=0, action_type=action_type, reason="")
+        totals = d20.roll_batch(n, rng=rng) + compute_action_modifier(pc, action_type, "")
+        rates[action_type] = float((totals >= dc).mean())
+    return rates
+
+
+def simulate(
+    pcs: List[PlayerCharacter],
+    n: int = 10_000,
+    enemy: Optional[EnemySpec] = None,
+    max_rounds: int = 20,
+    seed: Optional[int] = None,
+):
+    """Run `n` encounters of the party against `enemy`; returns a SimulationReport."""
+    if not pcs:
+        raise ValueError("Cannot simulate an encounter without player characters")
+    enemy = enemy or EnemySpec()
+    rng = np.random.default_rng(seed)
+    started = time.perf_counter()
+
+    k = len(pcs)
+    d20 = compile_expr(base_dice_for("attack"))
+    dc, _ = evaluate_check(total=0, action_type="attack", reason=enemy.difficulty)
+    attack_mod = np.array([compute_action_modifier(pc, "attack", enemy.difficulty) for pc in pcs])
+    dmg_actions = [damage_action_for(pc) for pc in pcs]
+    dmg_exprs = [compile_expr(base_dice_for(a)) for a in dmg_actions]
+    dmg_mod = np.array([compute_action_modifier(pc, a, "") for pc, a in zip(pcs, dmg_actions)])
+    defense = np.array([_defense(pc) for pc in pcs])
+    enemy_dmg = compile_expr(enemy.damage)
+
+    pc_hp = np.tile(np.array([max(1, pc.current_hp or pc.max_hp) for pc in pcs]), (n, 1))
+    enemy_hp = np.full(n, enemy.hp, dtype=np.int64)
+    ended_at = np.zeros(n, dtype=np.int64)        # 0 = still running
+    won = np.zeros(n, dtype=bool)
+    hits = np.zeros((n, k), dtype=np.int64)
+    swings = np.zeros((n, k), dtype=np.int64)
+    dealt = np.zeros((n, k), dtype=np.int64)
+    taken = np.zeros(n, dtype=np.int64)
+
+    for rnd in range(1, max_rounds + 1):
+        live = ended_at == 0
+        if not live.any():
+            break
+
+        # party turn, in initiative order (list order)
+        for j in range(k):
+            acting = live & (pc_hp[:, j] > 0) & (enemy_hp > 0)
+            hit = acting & (d20.roll_batch(n, rng=rng) + attack_mod[j] >= dc)
+            dmg = np.maximum(0, dmg_exprs[j].roll_batch(n, rng=rng) + dmg_mod[j]) * hit
+            enemy_hp -= dmg
+            dealt[:, j] += dmg
+            hits[:, j] += hit
+            swings[:, j] += acting
+
+        # enemy turn: one attack on a random standing PC
+        standing = pc_hp > 0
+        enemy_acts = live & (enemy_hp > 0) & standing.any(axis=1)
+        target = np.argmax(rng.random((n, k)) * standing, axis=1)
+        rows = np.arange(n)
+        hit = enemy_acts & (d20.roll_batch(n, rng=rng) + enemy.attack_bonus >= defense[target])
+        dmg = np.maximum(0, enemy_dmg.roll_batch(n, rng=rng)) * hit
+        pc_hp[rows, target] -= dmg
+        taken += dmg
+
+        win_now = live & (enemy_hp <= 0)
+        lose_now = live & ~win_now & ~(pc_hp > 0).any(axis=1)
+        won |= win_now
+        ended_at[win_now | lose_now] = rnd
+
+    timeout = ended_at == 0
+    ended_at[timeout] = max_rounds
+    lost = ~won & ~timeout
+    resolved = ended_at[~timeout]
+    hist_keys, hist_counts = np.unique(ended_at, return_counts=True)
+
+    check_n = min(n, 10_000)
+    pc_reports = []
+    for j, pc in enumerate(pcs):
+        total_swings = int(swings[:, j].sum())
+        pc_reports.append(
+            PCReport(
+                pc_id=pc.pc_id,
+                name=pc.name,
+                damage_action=dmg_actions[j],
+                hit_rate=float(hits[:, j].sum() / total_swings) if total_swings else 0.0,
+                damage_mean=float(dealt[:, j].mean()),
+                damage_p90=float(np.percentile(dealt[:, j], 90)),
+                downed_rate=float((pc_hp[:, j] <= 0).mean()),
+                check_success=_check_success_rates(pc, check_n, rng),
+            )
+        )
+
+    return SimulationReport(
+        encounters=n,
+        win_rate=float(won.mean()),
+        loss_rate=float(lost.mean()),
+        timeout_rate=float(timeout.mean()),
+        rounds_mean=float(resolved.mean()) if resolved.size else float(max_rounds),
+        rounds_p50=float(np.percentile(resolved, 50)) if resolved.size else float(max_rounds),
+        rounds_p90=float(np.percentile(resolved, 90)) if resolved.size else float(max_rounds),
+        rounds_hist={int(r): int(c) for r, c in zip(hist_keys, hist_counts)},
+        party_damage_mean=float(taken.mean()),
+        pcs=pc_reports,
+        elapsed_s=time.perf_counter() - started,
+    )
+
+
+def simulate_game(game_id: str, root: Path | str = "saves/games", **kwargs):
+    _world, players, _npcs, _quests, order, _idx = load_game(game_id, root=root)
+    # Party acts in saved initiative order when there is one.
+    ordered = [players[pid] for pid in order if pid in players]
+    ordered += [pc for pid, pc in players.items() if pid not in order]
+    # Default to the game's own seed so repeated runs on one save are identical.
+    if kwargs.get("seed") is None:
+        kwargs["seed"] = load_game_rng(game_id, root=root).seed
+    return simulate(ordered, **kwargs)
+
+
+def format_report(report: SimulationReport):
+    lines = [
+        f"{report.encounters} encounters in {report.elapsed_s * 1000:.0f} ms",
+        f"win {report.win_rate:.1%}  loss {report.loss_rate:.1%}  timeout {report.timeout_rate:.1%}",
+        f"rounds to resolution: mean {report.rounds_mean:.2f}  p50 {report.rounds_p50:.0f}  p90 {report.rounds_p90:.0f}",
+        f"party damage taken per encounter: {report.party_damage_mean:.1f}",
+        "rounds histogram: " + ", ".join(f"{r}:{c}" for r, c in report.rounds_hist.items()),
+    ]
+    for pc in report.pcs:
+        lines.append(
+            f"- {pc.name} ({pc.damage_action}): hit {pc.hit_rate:.1%}, "
+            f"damage mean {pc.damage_mean:.1f} / p90 {pc.damage_p90:.0f}, downed {pc.downed_rate:.1%}"
+        )
+        checks = ", ".join(f"{a} {p:.0%}" for a, p in pc.check_success.items())
+        lines.append(f"    checks: {checks}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo encounter simulator")
+    parser.add_argument("game_id")
+    parser.add_argument("--root", default="saves/games")
+    parser.add_argument("-n", "--encounters", type=int, default=10_000)
+    parser.add_argument("--enemy-hp", type=int, default=30)
+    parser.add_argument("--enemy-attack", type=int, default=4)
+    parser.add_argument("--enemy-damage", default="1d8+2")
+    parser.add_argument("--difficulty", default="", help='reason text for the attack DC, e.g. "hard"')
+    parser.add_argument("--max-rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    report = simulate_game(
+        args.game_id,
+        root=args.root,
+        n=args.encounters,
+        enemy=EnemySpec(
+            hp=args.enemy_hp,
+            attack_bonus=args.enemy_attack,
+            damage=args.enemy_damage,
+            difficulty=args.difficulty,
+        ),
+        max_rounds=args.max_rounds,
+        seed=args.seed,
+    )
+    print(json.dumps(asdict(report), indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Content-addressed, compressed snapshots of turn logs.
+
+    python -m src.game.snapshot_store list [--world W] [--root saves/snapshots]
+    python -m src.game.snapshot_store restore <world_id> <snapshot_id> [-o out.json]
+    python -m src.game.snapshot_store gc
+
+A snapshot is a small manifest plus chunks. Each chunk holds the entries of a fixed
+turn range (turns 1-50, 51-100, ...) as canonical JSON. It is stored once under
+objects/<sha256[:2]>/<sha256>.z (zlib) or .xz (lzma), keyed by the hash of its
+uncompressed bytes. Ranges are aligned, so a new export of a longer campaign only adds
+the chunk for the range still being played (and the header); every earlier chunk is
+shared with the previous snapshots.
+
+    <root>/objects/ab/ab12....z
+    <root>/<world_id>_actions/<world_id>_turns_<ts>.manifest.json
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.game.turn_store import TurnLog
+
+
+SNAPSHOT_ROOT = Path("saves") / "snapshots"
+CHUNK_TURNS = 50
+MANIFEST_VERSION = 1
+
+_SUFFIX = {"zlib": ".z", "lzma": ".xz"}
+
+
+@dataclass
+class ChunkRef:
+    hash: str
+    first_turn: int
+    last_turn: int
+    entries: int
+    size: int           # compressed bytes on disk
+
+
+@dataclass
+class Manifest:
+    snapshot_id: str
+    world_id: str
+    created_at: str
+    turn_count: int
+    header: str                          # chunk hash of the non-entry fields
+    chunks: List[ChunkRef] = field(default_factory=list)
+    version: int = MANIFEST_VERSION
+
+    @property
+    def stored_bytes(self):
+        return sum(c.size for c in self.chunks)
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        return cls(
+            snapshot_id=data["snapshot_id"],
+            world_id=data["world_id"],
+            created_at=data.get("created_at", ""),
+            turn_count=int(data.get("turn_count", 0)),
+            header=data["header"],
+            chunks=[ChunkRef(**c) for c in data.get("chunks", [])],
+            version=int(data.get("version", MANIFEST_VERSION)),
+        )
+
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _bucket(turn_number: int):
+    return max(0, int(turn_number) - 1) // CHUNK_TURNS
+
+
+class SnapshotStore:
+    def __init__(self, root: Path | str | None = None, compression: str = "zlib"):
+        if compression not in _SUFFIX:
+            raise ValueError(f"Unknown compression '{compression}' (use zlib or lzma)")
+        self.root = Path(root or SNAPSHOT_ROOT)
+        self.compression = compression
+        self.objects = self.root / "objects"
+
+    # ------------------------------------------------------------------
+    # chunks
+    # ------------------------------------------------------------------
+
+    def _object_path(self, digest: str, compression: str):
+        return self.objects / digest[:2] / f"{digest}{_SUFFIX[compression]}"
+
+    def _find_object(self, digest: str):
+        for compression in _SUFFIX:
+            path = self._object_path(digest, compression)
+            if path.exists():
+                return path
+        return None
+
+    def put_chunk(self, payload: bytes):
+        """Store payload if new; returns (hash, compressed size on disk)."""
+        digest = hashlib.sha256(payload).hexdigest()
+        existing = self._find_object(digest)
+        if existing is not None:
+            return digest, existing.stat().st_size
+        data = zlib.compress(payload, 6) if self.compression == "zlib" else lzma.compress(payload)
+        path = self._object_path(digest, self.compression)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return digest, len(data)
+
+    def get_chunk(self, digest: str):
+        return _read_object(str(self.objects), digest)
+
+    # ------------------------------------------------------------------
+    # snapshots
+    # ------------------------------------------------------------------
+
+    def _manifest_dir(self, world_id: str):
+        return self.root / f"{world_id}_actions"
+
+    def manifest_path(self, world_id: str, snapshot_id: str):
+        return self._manifest_dir(world_id) / f"{world_id}_turns_{snapshot_id}.manifest.json"
+
+    def save(self, turn_log: TurnLog, snapshot_id: Optional[str] = None):
+        data = turn_log.to_dict()
+        entries = data.pop("entries")
+        header_hash, _ = self.put_chunk(_canonical(data))
+
+        groups: Dict[int, List[Dict]] = {}
+        for entry in entries:
+            groups.setdefault(_bucket(entry.get("turn_number", 0)), []).append(entry)
+
+        chunks = []
+        for bucket in sorted(groups):
+            group = groups[bucket]
+            digest, size = self.put_chunk(_canonical(group))
+            chunks.append(ChunkRef(
+                hash=digest,
+                first_turn=bucket * CHUNK_TURNS + 1,
+                last_turn=(bucket + 1) * CHUNK_TURNS,
+                entries=len(group),
+                size=size,
+            ))
+
+        now = datetime.utcnow()
+        manifest = Manifest(
+            snapshot_id=snapshot_id or f"{now.strftime('%Y%m%d_%H%M%S')}_{header_hash[:6]}",
+            world_id=turn_log.world_id,
+            created_at=now.isoformat(),
+            turn_count=turn_log.turn_count,
+            header=header_hash,
+            chunks=chunks,
+        )
+        path = self.manifest_path(turn_log.world_id, manifest.snapshot_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(asdict(manifest), indent=2), encoding="utf-8")
+        return manifest, path
+
+    def list_snapshots(self, world_id: Optional[str] = None):
+        """Manifests, oldest first (all worlds unless world_id is given)."""
+        pattern = f"{world_id}_actions/*.manifest.json" if world_id else "*_actions/*.manifest.json"
+        manifests = [
+            Manifest.from_dict(json.loads(p.read_text(encoding="utf-8")))
+            for p in self.root.glob(pattern)
+        ]
+        return sorted(manifests, key=lambda m: (m.created_at, m.snapshot_id))
+
+    def load_manifest(self, world_id: str, snapshot_id: str):
+        path = self.manifest_path(world_id, snapshot_id)
+        if not path.exists():
+            raise FileNotFoundError(f"No snapshot '{snapshot_id}' for world '{world_id}' in {self.root}")
+        return Manifest.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+    def restore(self, world_id: str, snapshot_id: str):
+        """The TurnLog exactly as it was when the snapshot was taken."""
+        manifest = self.load_manifest(world_id, snapshot_id)
+        data = json.loads(self.get_chunk(manifest.header))
+        data["entries"] = [e for ref in manifest.chunks for e in json.loads(self.get_chunk(ref.hash))]
+        return TurnLog.from_dict(data)
+
+    def gc(self):
+        """Delete objects no manifest references; returns how many were removed."""
+        live = set()
+        for manifest in self.list_snapshots():
+            live.add(manifest.header)
+            live.update(c.hash for c in manifest.chunks)
+        removed = 0
+        for path in self.objects.glob("*/*"):
+            if path.name.split(".")[0] not in live:
+                path.unlink()
+                removed += 1
+        return removed
+
+    def disk_usage(self):
+        return sum(p.stat().st_size for p in self.objects.glob("*/*"))
+
+
+@lru_cache(maxsize=256)
+def _read_object(objects: str, digest: str):
+    # objects are immutable once written, so caching by hash is safe
+    base = Path(objects) / digest[:2]
+    path = base / f"{digest}.z"
+    if path.exists():
+        return zlib.decompress(path.read_bytes())
+    path = base / f"{digest}.xz"
+    if path.exists():
+        return lzma.decompress(path.read_bytes())
+    raise FileNotFoundError(f"Missing snapshot chunk {digest} under {objects}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Turn log snapshot store")
+    parser.add_argument("--root", default=str(SNAPSHOT_ROOT))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="list snapshots")
+    p_list.add_argument("--world", default=None)
+    p_restore = sub.add_parser("restore", help="write a snapshot back out as turn log JSON")
+    p_restore.add_argument("world_id")
+    p_restore.add_argument("snapshot_id")
+    p_restore.add_argument("-o", "--out", default=None, help="output path (default: stdout)")
+    sub.add_parser("gc", help="remove chunks no snapshot uses")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.root)
+    if args.cmd == "list":
+        for m in store.list_snapshots(args.world):
+            print(f"{m.world_id}  {m.snapshot_id}  turns={m.turn_count}  chunks={len(m.chunks)}  {m.stored_bytes} B")
+        print(f"objects on disk: {store.disk_usage()} B")
+    elif args.cmd == "restore":
+        text = json.dumps(store.restore(args.world_id, args.snapshot_id).to_dict(), indent=2)
+        if args.out:
+            Path(args.out).write_text(text, encoding="utf-8")
+            print(f"Restored {args.snapshot_id} to {args.out}")
+        else:
+            print(text)
+    elif args.cmd == "gc":
+        print(f"Removed {store.gc()} unreferenced chunks")
+
+
+if __name__ == "__main__":
+    main()
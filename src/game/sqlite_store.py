@@ -0,0 +1,434 @@
+"""
+SQLite backend for game state (WAL mode, row-level upserts).
+
+    python -m src.game.sqlite_store migrate [--saves saves] [--db saves/game.db]
+
+Rows are keyed by a game key: the game id for full-game saves and turn events,
+the world id for the per-world stores (players/npcs/quests/world files).
+Each entity keeps its full to_dict() payload in `data`; the columns next to it
+are only there to be indexed and queried.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.game.game_state import GameState
+from src.game.models import NPC, PlayerCharacter, Quest, World_State
+from src.game.save_load import SaveReport, content_hash, section_dirty
+from src.metrics.metrics import metrics
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS worlds (
+    game_id     TEXT PRIMARY KEY,
+    world_id    TEXT,
+    title       TEXT,
+    data        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pcs (
+    game_id     TEXT NOT NULL,
+    pc_id       TEXT NOT NULL,
+    name        TEXT,
+    player_name TEXT,
+    data        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (game_id, pc_id)
+);
+CREATE TABLE IF NOT EXISTS npcs (
+    game_id     TEXT NOT NULL,
+    npc_id      TEXT NOT NULL,
+    name        TEXT,
+    location    TEXT,
+    data        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (game_id, npc_id)
+);
+CREATE INDEX IF NOT EXISTS npcs_by_location ON npcs (game_id, location);
+CREATE TABLE IF NOT EXISTS quests (
+    game_id     TEXT NOT NULL,
+    quest_id    TEXT NOT NULL,
+    title       TEXT,
+    status      TEXT,
+    location    TEXT,
+    data        TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    PRIMARY KEY (game_id, quest_id)
+);
+CREATE INDEX IF NOT EXISTS quests_by_status ON quests (game_id, status);
+CREATE INDEX IF NOT EXISTS quests_by_location ON quests (game_id, location);
+CREATE TABLE IF NOT EXISTS turn_events (
+    game_id     TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    type        TEXT,
+    data        TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS game_meta (
+    game_id           TEXT PRIMARY KEY,
+    initiative        TEXT NOT NULL,
+    active_turn_index INTEGER NOT NULL,
+    rng               TEXT,
+    saved_at          TEXT NOT NULL
+);
+"""
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+class SqliteRepository:
+    """Same interface as repository.JsonRepository, backed by one SQLite file."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # sqlite connections are per thread; Streamlit runs each session in its own
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # generic row helpers
+    # ------------------------------------------------------------------
+
+    def _upsert(self, conn, table: str, key_cols: List[str], rows: Iterable[Dict]):
+        rows = list(rows)
+        if not rows:
+            return 0
+        cols = list(rows[0].keys())
+        updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c not in key_cols)
+        sql = (
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+            f"ON CONFLICT ({', '.join(key_cols)}) DO UPDATE SET {updates}"
+        )
+        conn.executemany(sql, [tuple(r[c] for c in cols) for r in rows])
+        return len(rows)
+
+    def _prune(self, conn, table: str, id_col: str, key: str, keep: Iterable[str]):
+        # Drop rows for `key` whose id is not in `keep` (replace-all semantics).
+        keep = list(keep)
+        if keep:
+            marks = ", ".join("?" for _ in keep)
+            conn.execute(f"DELETE FROM {table} WHERE game_id = ? AND {id_col} NOT IN ({marks})", [key, *keep])
+        else:
+            conn.execute(f"DELETE FROM {table} WHERE game_id = ?", [key])
+
+    # ------------------------------------------------------------------
+    # worlds
+    # ------------------------------------------------------------------
+
+    def save_world(self, key: str, world: World_State):
+        with self._conn() as conn:
+            self._upsert(conn, "worlds", ["game_id"], [{
+                "game_id": key,
+                "world_id": world.world_id,
+                "title": world.title,
+                "data": _dumps(world.to_dict()),
+                "updated_at": _now(),
+            }])
+
+    def load_world(self, key: str):
+        row = self._conn().execute("SELECT data FROM worlds WHERE game_id = ?", [key]).fetchone()
+        return World_State.from_dict(json.loads(row[0])) if row else None
+
+    # ------------------------------------------------------------------
+    # pcs / npcs / quests
+    # ------------------------------------------------------------------
+
+    def _pc_rows(self, key: str, pcs: Dict[str, PlayerCharacter]):
+        now = _now()
+        return [
+            {"game_id": key, "pc_id": pc_id, "name": pc.name, "player_name": pc.player_name,
+             "data": _dumps(pc.to_dict()), "updated_at": now}
+            for pc_id, pc in pcs.items()
+        ]
+
+    def _npc_rows(self, key: str, npcs: Dict[str, NPC]):
+        now = _now()
+        return [
+            {"game_id": key, "npc_id": npc_id, "name": npc.name, "location": npc.location,
+             "data": _dumps(npc.to_dict()), "updated_at": now}
+            for npc_id, npc in npcs.items()
+        ]
+
+    def _quest_rows(self, key: str, quests: Dict[str, Quest]):
+        now = _now()
+        return [
+            {"game_id": key, "quest_id": qid, "title": q.title, "status": q.status,
+             "location": q.target_location,
+             "data": _dumps(q.to_dict()), "updated_at": now}
+            for qid, q in quests.items()
+        ]
+
+    def upsert_pcs(self, key: str, pcs: Dict[str, PlayerCharacter]):
+        with self._conn() as conn:
+            return self._upsert(conn, "pcs", ["game_id", "pc_id"], self._pc_rows(key, pcs))
+
+    def save_pcs(self, key: str, pcs: Dict[str, PlayerCharacter]):
+        with self._conn() as conn:
+            self._upsert(conn, "pcs", ["game_id", "pc_id"], self._pc_rows(key, pcs))
+            self._prune(conn, "pcs", "pc_id", key, pcs.keys())
+
+    def load_pcs(self, key: str):
+        rows = self._conn().execute("SELECT pc_id, data FROM pcs WHERE game_id = ? ORDER BY rowid", [key])
+        return {pc_id: PlayerCharacter.from_dict(json.loads(data)) for pc_id, data in rows}
+
+    def upsert_npcs(self, key: str, npcs: Dict[str, NPC]):
+        with self._conn() as conn:
+            return self._upsert(conn, "npcs", ["game_id", "npc_id"], self._npc_rows(key, npcs))
+
+    def save_npcs(self, key: str, npcs: Dict[str, NPC]):
+        with self._conn() as conn:
+            self._upsert(conn, "npcs", ["game_id", "npc_id"], self._npc_rows(key, npcs))
+            self._prune(conn, "npcs", "npc_id", key, npcs.keys())
+
+    def load_npcs(self, key: str, location: Optional[str] = None):
+        sql = "SELECT npc_id, data FROM npcs WHERE game_id = ?"
+        args = [key]
+        if location is not None:
+            sql += " AND location = ?"
+            args.append(location)
+        rows = self._conn().execute(sql + " ORDER BY rowid", args)
+        return {npc_id: NPC.from_dict(json.loads(data)) for npc_id, data in rows}
+
+    def upsert_quests(self, key: str, quests: Dict[str, Quest]):
+        with self._conn() as conn:
+            return self._upsert(conn, "quests", ["game_id", "quest_id"], self._quest_rows(key, quests))
+
+    def save_quests(self, key: str, quests: Dict[str, Quest]):
+        with self._conn() as conn:
+            self._upsert(conn, "quests", ["game_id", "quest_id"], self._quest_rows(key, quests))
+            self._prune(conn, "quests", "quest_id", key, quests.keys())
+
+    def load_quests(self, key: str, status: Optional[str] = None):
+        sql = "SELECT quest_id, data FROM quests WHERE game_id = ?"
+        args = [key]
+        if status is not None:
+            sql += " AND status = ?"
+            args.append(status)
+        rows = self._conn().execute(sql + " ORDER BY rowid", args)
+        return {qid: Quest.from_dict(json.loads(data)) for qid, data in rows}
+
+    # ------------------------------------------------------------------
+    # turn events
+    # ------------------------------------------------------------------
+
+    def append_turn_events(self, key: str, events: List[Dict]):
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO turn_events (game_id, seq, type, data) VALUES (?, ?, ?, ?)",
+                [(key, int(e["seq"]), e.get("type"), _dumps(e)) for e in events],
+            )
+
+    def replace_turn_events(self, key: str, events: List[Dict]):
+        # the whole history of one game, e.g. rebuilt from the JSON journal by a migration
+        with self._conn() as conn:
+            conn.execute("DELETE FROM turn_events WHERE game_id = ?", [key])
+            conn.executemany(
+                "INSERT INTO turn_events (game_id, seq, type, data) VALUES (?, ?, ?, ?)",
+                [(key, int(e["seq"]), e.get("type"), _dumps(e)) for e in events],
+            )
+
+    def load_turn_events(self, key: str, after_seq: int = 0):
+        rows = self._conn().execute(
+            "SELECT data FROM turn_events WHERE game_id = ? AND seq > ? ORDER BY seq", [key, after_seq]
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def load_turn_log(self, key: str):
+        from src.game.turn_store import TurnLog, apply_event
+
+        turn_log = TurnLog(world_id=key)
+        for event in self.load_turn_events(key):
+            apply_event(turn_log, event)
+        return turn_log
+
+    # ------------------------------------------------------------------
+    # whole games (same shape as save_load.save_game / load_game)
+    # ------------------------------------------------------------------
+
+    def _dirty_rows(self, game: GameState, target: str, section: str, id_col: str, rows: List[Dict], report: SaveReport):
+        # Only rows whose serialized data changed since the last save of this game are rewritten.
+        dirty = []
+        for row in rows:
+            payload = row["data"].encode("utf-8")
+            key = f"{target}|{section}|{row[id_col]}"
+            if section_dirty(game, key, payload):
+                dirty.append(row)
+                game.save_hashes[key] = content_hash(payload)
+                report.written[section] = report.written.get(section, 0) + len(payload)
+        if not dirty:
+            report.skipped.append(section)
+        return dirty
+
+    def save_game(self, game: GameState, game_id: str, rng: Optional[Dict] = None):
+        if game.world is None:
+            raise ValueError("Cannot save: World is empty")
+        report = SaveReport(path=self.path)
+        target = f"{self.path.resolve()}|{game_id}"
+        with self._conn() as conn:
+            now = _now()
+            world_row = {
+                "game_id": game_id, "world_id": game.world.world_id, "title": game.world.title,
+                "data": _dumps(game.world.to_dict()), "updated_at": now,
+            }
+            self._upsert(conn, "worlds", ["game_id"], self._dirty_rows(game, target, "world", "game_id", [world_row], report))
+            pcs, npcs, quests = game.player_characters or {}, game.npcs or {}, game.quests or {}
+            self._upsert(conn, "pcs", ["game_id", "pc_id"],
+                         self._dirty_rows(game, target, "pcs", "pc_id", self._pc_rows(game_id, pcs), report))
+            self._prune(conn, "pcs", "pc_id", game_id, pcs.keys())
+            self._upsert(conn, "npcs", ["game_id", "npc_id"],
+                         self._dirty_rows(game, target, "npcs", "npc_id", self._npc_rows(game_id, npcs), report))
+            self._prune(conn, "npcs", "npc_id", game_id, npcs.keys())
+            self._upsert(conn, "quests", ["game_id", "quest_id"],
+                         self._dirty_rows(game, target, "quests", "quest_id", self._quest_rows(game_id, quests), report))
+            self._prune(conn, "quests", "quest_id", game_id, quests.keys())
+            meta = {
+                "game_id": game_id,
+                "initiative": _dumps(list(game.initiative_order or [])),
+                "active_turn_index": int(game.active_turn_index or 0),
+                "rng": _dumps(rng) if rng is not None else None,
+            }
+            meta_payload = _dumps(meta).encode("utf-8")
+            meta_key = f"{target}|meta"
+            if report.written or section_dirty(game, meta_key, meta_payload):
+                self._upsert(conn, "game_meta", ["game_id"], [{**meta, "saved_at": now}])
+                game.save_hashes[meta_key] = content_hash(meta_payload)
+                report.written["meta"] = len(meta_payload)
+            else:
+                report.skipped.append("meta")
+        metrics.increment("save.bytes_written", report.bytes_written)
+        metrics.increment("save.sections_written", len(report.written))
+        metrics.increment("save.sections_skipped", len(report.skipped))
+        return report
+
+    def load_game(self, game_id: str):
+        row = self._conn().execute(
+            "SELECT initiative, active_turn_index FROM game_meta WHERE game_id = ?", [game_id]
+        ).fetchone()
+        world = self.load_world(game_id)
+        if row is None and world is None:
+            raise FileNotFoundError(f"No saved game '{game_id}' in {self.path}")
+        order, active = (json.loads(row[0]), int(row[1])) if row else ([], 0)
+        return (
+            world,
+            self.load_pcs(game_id),
+            self.load_npcs(game_id),
+            self.load_quests(game_id),
+            order,
+            active,
+        )
+
+    def load_rng_state(self, game_id: str):
+        row = self._conn().execute("SELECT rng FROM game_meta WHERE game_id = ?", [game_id]).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+
+# ----------------------------------------------------------------------
+# migration from the JSON layout
+# ----------------------------------------------------------------------
+
+def _read_json(path: Path):
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def migrate_json_saves(saves_root: Path | str, repo: SqliteRepository):
+    """
+    Copy every JSON save under `saves_root` into `repo`:
+      saves/games/<id>/          full games (+ turn log events, rng state)
+      saves/<world>.json         worlds
+      saves/<world>_players.json, saves/<world>_quests.json, saves/npcs/<world>_npcs.json
+    Returns counts per kind. Safe to re-run: rows are upserts and each game's turn
+    events are replaced by the history rebuilt from its journal.
+    """
+    from src.game.save_load import load_game
+    from src.game.turn_store import load_turn_log, turn_log_events
+
+    saves_root = Path(saves_root)
+    counts = {"games": 0, "worlds": 0, "pcs": 0, "npcs": 0, "quests": 0, "turn_events": 0}
+
+    games_dir = saves_root / "games"
+    for game_dir in sorted(p for p in games_dir.glob("*") if p.is_dir()):
+        game_id = game_dir.name
+        if (game_dir / "world.json").exists() or (game_dir / "world.dms").exists():
+            world, players, npcs, quests, order, active = load_game(game_id, root=games_dir)
+            game = GameState(world=world, player_characters=players, npcs=npcs, quests=quests,
+                             initiative_order=order, active_turn_index=active)
+            meta = _read_json(game_dir / "meta.json") or {}
+            repo.save_game(game, game_id, rng=meta.get("rng"))
+            counts["games"] += 1
+        if (game_dir / "turns.json").exists() or (game_dir / "turns.jsonl").exists():
+            turn_log = load_turn_log(game_id, root=games_dir)
+            events = turn_log_events(turn_log)
+            # end the rebuilt history at the journal's seq, where live play appends next
+            shift = max(0, turn_log.seq - len(events))
+            for event in events:
+                event["seq"] += shift
+            repo.replace_turn_events(game_id, events)
+            counts["turn_events"] += len(events)
+
+    for path in sorted(saves_root.glob("*.json")):
+        name = path.stem
+        data = _read_json(path) or {}
+        if name.endswith("_players"):
+            pcs = {k: PlayerCharacter.from_dict(v) for k, v in data.items()}
+            counts["pcs"] += repo.upsert_pcs(name[: -len("_players")], pcs)
+        elif name.endswith("_quests"):
+            quests = {k: Quest.from_dict(v) for k, v in data.items()}
+            counts["quests"] += repo.upsert_quests(name[: -len("_quests")], quests)
+        elif "world_id" in data:
+            repo.save_world(data["world_id"], World_State.from_dict(data))
+            counts["worlds"] += 1
+
+    for path in sorted((saves_root / "npcs").glob("*_npcs.json")):
+        npcs = {k: NPC.from_dict(v) for k, v in (_read_json(path) or {}).items()}
+        counts["npcs"] += repo.upsert_npcs(path.stem[: -len("_npcs")], npcs)
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite game store tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mig = sub.add_parser("migrate", help="copy the JSON saves into the SQLite database")
+    mig.add_argument("--saves", default="saves")
+    mig.add_argument("--db", default=None, help="defaults to config.sqlite_path")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        from src.config import sqlite_path
+
+        repo = SqliteRepository(args.db or sqlite_path)
+        counts = migrate_json_saves(args.saves, repo)
+        print(f"Migrated into {repo.path}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import json
+import os
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from threading import Lock
+from typing import Dict, Iterator, List, Optional
 
 from src.game.models import PlayerCharacter
 
@@ -28,6 +30,7 @@ class TurnEntry:
     description: str
     options: List[str] = field(default_factory=list)
     actions: List[ActionEntry] = field(default_factory=list)
+    rolls: List[Dict] = field(default_factory=list)   # RNG draws made during this turn
 
 
 @dataclass
@@ -36,6 +39,11 @@ class TurnLog:
     turn_count: int = 0
     current_actor_id: Optional[str] = None
     entries: List[TurnEntry] = field(default_factory=list)
+    setup_rolls: List[Dict] = field(default_factory=list)  # draws made before the first turn
+    # journal bookkeeping, never serialized
+    seq: int = field(default=0, repr=False, compare=False)              # last event seq applied
+    pending: List[Dict] = field(default_factory=list, repr=False, compare=False)
+    since_checkpoint: int = field(default=0, repr=False, compare=False)
 
     def to_dict(self):
         return {
@@ -43,6 +51,7 @@ class TurnLog:
             "turn_count": self.turn_count,
             "current_actor_id": self.current_actor_id,
             "entries": [asdict(e) for e in self.entries],
+            "setup_rolls": list(self.setup_rolls),
         }
 
     @classmethod
@@ -66,6 +75,7 @@ class TurnLog:
                     )
                     for a in e.get("actions", [])
                 ],
+                rolls=list(e.get("rolls", [])),
             )
             for e in data.get("entries", [])
         ]
@@ -74,55 +84,268 @@ class TurnLog:
             turn_count=int(data.get("turn_count", 0)),
             current_actor_id=data.get("current_actor_id"),
             entries=entries,
+            setup_rolls=list(data.get("setup_rolls", [])),
         )
 
 
+# On disk a turn log is two files under saves/games/<game_id>/:
+#   turns.jsonl  append-only journal, one compact JSON event per line
+#   turns.json   compacted checkpoint (the full TurnLog plus the journal seq it covers)
+# Every note/action/turn start appends one line; the checkpoint is rewritten only every
+# CHECKPOINT_EVERY events, after which the journal starts over.
+
+TURNS_ROOT = Path("saves") / "games"
+CHECKPOINT_EVERY = 200
+
+_IO_LOCK = Lock()
+# guards TurnLog.pending: events are emitted on the UI thread and drained by the persistence worker
+_PENDING_LOCK = Lock()
+
+
 def _slug(text: str):
     return "".join(c if c.isalnum() or c in {"-", "_"} else "_" for c in (text or "")).strip("_") or "game"
 
 
-def _turns_path(game_id: str):
-    base = Path("saves") / "games" / _slug(game_id)
+def _turns_dir(game_id: str, root: Path | str | None = None):
+    base = Path(root or TURNS_ROOT) / _slug(game_id)
     base.mkdir(parents=True, exist_ok=True)
-    return base / "turns.json"
+    return base
+
 
+def _turns_path(game_id: str, root: Path | str | None = None):
+    return _turns_dir(game_id, root) / "turns.json"
 
-def load_turn_log(game_id: str):
-    path = _turns_path(game_id)
+
+def _journal_path(game_id: str, root: Path | str | None = None):
+    return _turns_dir(game_id, root) / "turns.jsonl"
+
+
+def _read_journal(path: Path):
+    # Yields events in order; a torn last line (crash mid-append) is skipped.
     if not path.exists():
-        return TurnLog(world_id=game_id)
-    data = json.loads(path.read_text(encoding="utf-8"))
-    return TurnLog.from_dict(data)
+        return
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def _torn_tail(path: Path):
+    # True when the journal's last line has no newline yet (crash mid-append)
+    try:
+        with path.open("rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) != b"\n"
+    except OSError:   # missing or empty
+        return False
+
+
+# ----------------------------------------------------------------------
+# events
+# ----------------------------------------------------------------------
+
+def apply_event(turn_log: TurnLog, event: Dict):
+    kind = event.get("type")
+    if kind == "begin_turn":
+        turn_log.turn_count = int(event.get("turn_number", turn_log.turn_count + 1))
+        turn_log.current_actor_id = event.get("actor_id")
+        turn_log.entries.append(
+            TurnEntry(
+                turn_number=turn_log.turn_count,
+                actor_id=event.get("actor_id"),
+                actor_name=event.get("actor_name", "Unknown"),
+                timestamp=event.get("timestamp", ""),
+                description="Turn started",
+            )
+        )
+    elif kind == "note":
+        if turn_log.entries:
+            entry = turn_log.entries[-1]
+            entry.description += f" | {event.get('note', '')}"
+            entry.options.extend(event.get("options") or [])
+    elif kind == "action":
+        if turn_log.entries:
+            a = event.get("action") or {}
+            turn_log.entries[-1].actions.append(
+                ActionEntry(
+                    actor_id=a.get("actor_id"),
+                    actor_name=a.get("actor_name", ""),
+                    player_name=a.get("player_name", ""),
+                    content=a.get("content", ""),
+                    timestamp=a.get("timestamp", ""),
+                    tags=list(a.get("tags", [])),
+                )
+            )
+    elif kind == "rolls":
+        rolls = list(event.get("rolls") or [])
+        if turn_log.entries:
+            turn_log.entries[-1].rolls.extend(rolls)
+        else:
+            turn_log.setup_rolls.extend(rolls)
+    seq = event.get("seq")
+    if seq is not None:
+        turn_log.seq = max(turn_log.seq, int(seq))
+    return turn_log
+
+
+def _emit(turn_log: TurnLog, event: Dict):
+    # Apply in memory now; the event is appended to the journal on the next save.
+    event = {"seq": turn_log.seq + 1, **event}
+    apply_event(turn_log, event)
+    with _PENDING_LOCK:
+        turn_log.pending.append(event)
+    return turn_log
+
+
+def turn_log_events(turn_log: TurnLog):
+    """Re-express a whole TurnLog as events (used to migrate checkpoints elsewhere)."""
+    events: List[Dict] = []
 
+    def add(event):
+        events.append({"seq": len(events) + 1, **event})
 
-def save_turn_log(turn_log: TurnLog):
-    path = _turns_path(turn_log.world_id)
-    path.write_text(json.dumps(turn_log.to_dict(), indent=2), encoding="utf-8")
+    if turn_log.setup_rolls:
+        add({"type": "rolls", "rolls": list(turn_log.setup_rolls)})
+    for entry in turn_log.entries:
+        add({
+            "type": "begin_turn",
+            "turn_number": entry.turn_number,
+            "actor_id": entry.actor_id,
+            "actor_name": entry.actor_name,
+            "timestamp": entry.timestamp,
+        })
+        notes = entry.description.split(" | ")[1:] if entry.description.startswith("Turn started") else [entry.description]
+        for i, note in enumerate(notes):
+            add({"type": "note", "note": note, "options": list(entry.options) if i == len(notes) - 1 else []})
+        if not notes and entry.options:
+            add({"type": "note", "note": "", "options": list(entry.options)})
+        for action in entry.actions:
+            add({"type": "action", "action": asdict(action)})
+        if entry.rolls:
+            add({"type": "rolls", "rolls": list(entry.rolls)})
+    return events
+
+
+# ----------------------------------------------------------------------
+# load / save
+# ----------------------------------------------------------------------
+
+def load_turn_log(game_id: str, root: Path | str | None = None):
+    """Checkpoint (turns.json) plus every journal event newer than it."""
+    path = _turns_path(game_id, root)
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        turn_log = TurnLog.from_dict(data)
+        turn_log.seq = int(data.get("journal_seq", 0))
+    else:
+        turn_log = TurnLog(world_id=game_id)
+
+    checkpoint_seq = turn_log.seq
+    for event in _read_journal(_journal_path(game_id, root)):
+        if int(event.get("seq", 0)) <= checkpoint_seq:
+            continue  # already folded into the checkpoint
+        apply_event(turn_log, event)
+        turn_log.since_checkpoint += 1
+    return turn_log
+
+
+def checkpoint_turn_log(turn_log: TurnLog, root: Path | str | None = None):
+    # Atomic rewrite of turns.json, then an empty journal: the checkpoint covers it all.
+    path = _turns_path(turn_log.world_id, root)
+    data = turn_log.to_dict()
+    data["journal_seq"] = turn_log.seq
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    _journal_path(turn_log.world_id, root).write_text("", encoding="utf-8")
+    turn_log.since_checkpoint = 0
     return path
 
 
+def _mirror_events(game_id: str, events: List[Dict]):
+    # With the SQLite backend the same events also land in its turn_events table.
+    from src.game.repository import sqlite_repository
+
+    repo = sqlite_repository()
+    if repo is not None:
+        repo.append_turn_events(game_id, events)
+
+
+def save_turn_log(turn_log: TurnLog, root: Path | str | None = None):
+    """Append pending events to the journal; checkpoint every CHECKPOINT_EVERY events."""
+    with _IO_LOCK:
+        with _PENDING_LOCK:
+            events, turn_log.pending = turn_log.pending, []
+        journal = _journal_path(turn_log.world_id, root)
+        if events:
+            # close off a torn line so the first new event is not glued onto it
+            lead = "\n" if _torn_tail(journal) else ""
+            with journal.open("a", encoding="utf-8") as fh:
+                fh.write(lead + "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events))
+            turn_log.since_checkpoint += len(events)
+            _mirror_events(turn_log.world_id, events)
+        if turn_log.since_checkpoint >= CHECKPOINT_EVERY:
+            checkpoint_turn_log(turn_log, root)
+    return journal
+
+
+def iter_turn_texts(game_id: str, root: Path | str | None = None) -> Iterator[str]:
+    """
+    Final description of each turn entry, oldest first, without building a TurnLog:
+    the checkpoint's entries, then the journal streamed line by line.
+    """
+    path = Path(root or TURNS_ROOT) / _slug(game_id) / "turns.json"
+    checkpoint_seq = 0
+    if path.exists():
+        data = json.loads(path.read_text(encoding="utf-8"))
+        checkpoint_seq = int(data.get("journal_seq", 0))
+        entries = data.get("entries", [])
+        # the last checkpointed entry may still collect notes from the journal
+        for entry in entries[:-1]:
+            yield entry.get("description") or entry.get("content") or ""
+        current = (entries[-1].get("description") or "") if entries else None
+    else:
+        current = None
+
+    for event in _read_journal(path.with_name("turns.jsonl")):
+        if int(event.get("seq", 0)) <= checkpoint_seq:
+            continue
+        if event.get("type") == "begin_turn":
+            if current is not None:
+                yield current
+            current = "Turn started"
+        elif event.get("type") == "note" and current is not None:
+            current += f" | {event.get('note', '')}"
+    if current is not None:
+        yield current
+
+
+# ----------------------------------------------------------------------
+# mutators
+# ----------------------------------------------------------------------
+
 def begin_turn(turn_log: TurnLog, actor: Optional[PlayerCharacter]):
-    turn_log.turn_count += 1
-    turn_log.current_actor_id = actor.pc_id if actor else None
-    entry = TurnEntry(
-        turn_number=turn_log.turn_count,
-        actor_id=actor.pc_id if actor else None,
-        actor_name=actor.name if actor else "Unknown",
-        timestamp=datetime.utcnow().isoformat(),
-        description="Turn started",
+    return _emit(
+        turn_log,
+        {
+            "type": "begin_turn",
+            "turn_number": turn_log.turn_count + 1,
+            "actor_id": actor.pc_id if actor else None,
+            "actor_name": actor.name if actor else "Unknown",
+            "timestamp": datetime.utcnow().isoformat(),
+        },
     )
-    turn_log.entries.append(entry)
-    return turn_log
 
 
 def add_turn_note(turn_log: TurnLog, note: str, options: Optional[List[str]] = None):
     if not turn_log.entries:
         return turn_log
-    entry = turn_log.entries[-1]
-    entry.description += f" | {note}"
-    if options:
-        entry.options.extend(options)
-    return turn_log
+    return _emit(turn_log, {"type": "note", "note": note, "options": list(options or [])})
 
 
 def add_turn_action(
@@ -144,8 +367,15 @@ def add_turn_action(
         timestamp=datetime.utcnow().isoformat(),
         tags=list(tags or []),
     )
-    turn_log.entries[-1].actions.append(action)
-    return turn_log
+    return _emit(turn_log, {"type": "action", "action": asdict(action)})
+
+
+def record_draws(turn_log: TurnLog, draws: List[Dict]):
+    # Attach RNG draws (see src.game.rng) to the current turn, or to setup before turn 1.
+    if not draws:
+        return turn_log
+    records = [d if isinstance(d, dict) else asdict(d) for d in draws]
+    return _emit(turn_log, {"type": "rolls", "rolls": records})
 
 
 def build_action_summary(
@@ -184,16 +414,16 @@ def build_action_summary(
 
 
 def export_turn_log_snapshot(turn_log: TurnLog, summary_text: Optional[str] = None):
-    
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    export_root = Path("saves") / "snapshots" / f"{turn_log.world_id}_actions"
-    export_root.mkdir(parents=True, exist_ok=True)
-
-    json_path = export_root / f"{turn_log.world_id}_turns_{timestamp}.json"
-    summary_path = export_root / f"{turn_log.world_id}_summary_{timestamp}.txt"
-
-    json_path.write_text(json.dumps(turn_log.to_dict(), indent=2), encoding="utf-8")
+    """
+    Snapshot the turn log into the content-addressed store under saves/snapshots/
+    (chunks already stored by earlier exports are reused) and write the recap text.
+    Returns (manifest_path, summary_path).
+    """
+    from src.game.snapshot_store import SnapshotStore
+
+    manifest, manifest_path = SnapshotStore().save(turn_log)
+    summary_path = manifest_path.parent / f"{turn_log.world_id}_summary_{manifest.snapshot_id}.txt"
     summary_text = summary_text if summary_text is not None else build_action_summary(turn_log)
     summary_path.write_text(summary_text, encoding="utf-8")
 
-    return json_path, summary_path
+    return manifest_path, summary_path
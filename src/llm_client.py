@@ -1,6 +1,6 @@
 import os
 from functools import lru_cache
-from typing import List
+from typing import Callable, List, Optional
 from src.metrics.metrics import track_gen,metrics
 
 
@@ -15,11 +15,20 @@ class withmetrics:
     def __call__(self, *args, metric_name=None, **kwargs):
         name = metric_name or self.default
         kwargs.pop("metric_name",None)
+        if kwargs.get("stream"):
+            return self._stream(name, *args, **kwargs)
         with track_gen(name):
             result = self.llm(*args,**kwargs)
         metrics.increment(f"llm_calls.{name}")
         metrics.increment("llm_calls_total")
         return result
+
+    def _stream(self, name, *args, **kwargs):
+        # a streamed call only does its work while being iterated, so time the iteration
+        with track_gen(name):
+            yield from self.llm(*args,**kwargs)
+        metrics.increment(f"llm_calls.{name}")
+        metrics.increment("llm_calls_total")
     
     def __getattr__(self, item):
         return getattr(self.llm, item)
@@ -51,14 +60,29 @@ from src.config import (
     model_path,)
 
 
-@lru_cache(maxsize=1)
-def get_llm():
-    """Load and cache the Llama model."""
+# stand-in model set with use_llm() (load tests use a latency-modelled fake)
+_LLM_OVERRIDE = None
 
+
+@lru_cache(maxsize=1)
+def _load_llm():
     config = Llama(model_path=str(model_path), n_ctx=max_CTX, n_threads=cpu_threads, n_gpu_layers=gpu_layers, verbose=False)
     return withmetrics(config,default_name='llm_call') 
 
 
+def get_llm():
+    """Load and cache the Llama model (or return the stand-in set with use_llm)."""
+    if _LLM_OVERRIDE is not None:
+        return _LLM_OVERRIDE
+    return _load_llm()
+
+
+def use_llm(llm):
+    # Route every model call to `llm` (called like Llama); None goes back to the real model.
+    global _LLM_OVERRIDE
+    _LLM_OVERRIDE = llm
+
+
 def format_prompt(messages: List[Message]):
     # how to instruct the model.. {role:user:content}
 
@@ -80,7 +104,10 @@ def chat_completion(
     messages: List[Message],
     temperature: float = default_temp,
     max_tokens: int = default_max_tokens,
-    prefix: str = ""):
+    prefix: str = "",
+    on_token: Optional[Callable[[str], None]] = None):
+
+    # on_token, if given, receives each piece of text as the model produces it
 
     llm = get_llm()
 
@@ -93,8 +120,7 @@ def chat_completion(
     # Debug: show the prompt in the console
     #print("\n=== LLM PROMPT START ===\n")
     
-    result = llm(
-        prompt,
+    sampling = dict(
         max_tokens=max_tokens,
         temperature=temperature,
         top_p=0.9,
@@ -102,6 +128,18 @@ def chat_completion(
         repeat_penalty=1.1,
         # Stop the model as soon as it tries to start a new turn or switch speaker
         stop=["[PLAYER", "[ASSISTANT", "[SYSTEM", "[ITEM", "</s>"])
+
+    if on_token is not None:
+        pieces = []
+        for chunk in llm(prompt, stream=True, **sampling):
+            text = (chunk.get("choices") or [{}])[0].get("text", "")
+            if text:
+                pieces.append(text)
+                on_token(text)
+        reply = "".join(pieces).strip()
+        return reply or "[DM is silent: no output from model]"
+
+    result = llm(prompt, **sampling)
     
     choices = result.get("choices", [])
     if not choices:
@@ -111,7 +149,7 @@ def chat_completion(
 
 
 def reset_model():
-    get_llm.cache_clear()
+    _load_llm.cache_clear()
 
 
 def _trim_messages(messages: List[Message], max_chars: int):
@@ -0,0 +1,124 @@
+"""
+Round-trip benchmark: old pretty JSON + from_dict vs the compact save codec.
+
+    python -m src.metrics.bench_codec [-n 5000] [--repeat 5] [--body auto|json|msgpack]
+
+Builds a synthetic world with `n` NPCs (plus a few PCs and quests), then times
+encode and decode of each format and a full save_game/load_game through a temp dir.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src import config
+from src.game.codec import decode_section, encode_section
+from src.game.game_state import GameState
+from src.game.models import NPC, PlayerCharacter, Quest, World_State
+from src.game.save_load import load_game, save_game
+
+
+def build_world(n_npcs: int = 5000):
+    now = datetime(2025, 1, 1)
+    locations = [{"name": f"Location {i}", "description": f"A place numbered {i}."} for i in range(40)]
+    world = World_State(
+        world_id="bench", title="Bench World", setting_prompt="bench", world_summary="A large world.",
+        lore="Old lore. " * 50, players=["Alice", "Bob"], created_on=now,
+        major_locations=locations[:10], minor_locations=locations[10:],
+        skills=["stealth", "athletics", "arcana"], themes=["intrigue"],
+    )
+    npcs = {}
+    for i in range(n_npcs):
+        npc_id = f"bench_npc_{i:05d}"
+        npcs[npc_id] = NPC(
+            npc_id=npc_id, world_id="bench", name=f"Npc {i}", role="merchant" if i % 7 == 0 else "villager",
+            location=locations[i % len(locations)]["name"],
+            description=f"Npc {i} keeps to themselves and knows a little about location {i % 40}.",
+            hooks=[f"hook {i}", "rumour"], tags=["town"], inventory=["dagger", "bread"],
+            created_on=now + timedelta(seconds=i), last_updated=now + timedelta(minutes=i),
+        )
+    pcs = {
+        f"pc{i}": PlayerCharacter(
+            pc_id=f"pc{i}", player_name=f"Player {i}", name=f"Hero {i}", gender="", ancestry="human",
+            archetype="fighter", level=3, concept="bench", stats={"STR": 14, "DEX": 12}, max_hp=20,
+            current_hp=20, skills=["athletics"], inventory=["sword"], created_on=now,
+        )
+        for i in range(4)
+    }
+    quests = {
+        f"q{i}": Quest(quest_id=f"q{i}", world_id="bench", title=f"Quest {i}", summary="Do a thing.",
+                       steps=["go", "return"], rewards=["gold"], created_on=now)
+        for i in range(50)
+    }
+    return GameState(world=world, player_characters=pcs, npcs=npcs, quests=quests)
+
+
+def _best(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def bench_sections(game: GameState, repeat: int = 5, body: str = "auto"):
+    npcs = game.npcs
+    legacy = json.dumps({k: v.to_dict() for k, v in npcs.items()}, indent=2).encode("utf-8")
+    compact = encode_section("npcs", npcs, body=body)
+    assert decode_section(compact) == npcs
+
+    return {
+        "npcs": len(npcs),
+        "json_bytes": len(legacy),
+        "compact_bytes": len(compact),
+        "json_encode_s": _best(lambda: json.dumps({k: v.to_dict() for k, v in npcs.items()}, indent=2), repeat),
+        "compact_encode_s": _best(lambda: encode_section("npcs", npcs, body=body), repeat),
+        "json_decode_s": _best(lambda: {k: NPC.from_dict(v) for k, v in json.loads(legacy).items()}, repeat),
+        "compact_decode_s": _best(lambda: decode_section(compact), repeat),
+    }
+
+
+def bench_full_save(game: GameState, repeat: int = 3):
+    results = {}
+    previous = config.save_format
+    try:
+        for fmt in ("json", "compact"):
+            config.save_format = fmt
+            with tempfile.TemporaryDirectory() as root:
+                def _save():
+                    game.save_hashes.clear()
+                    save_game(game, "bench", root=root)
+                results[f"{fmt}_save_s"] = _best(_save, repeat)
+                results[f"{fmt}_load_s"] = _best(lambda: load_game("bench", root=root), repeat)
+    finally:
+        config.save_format = previous
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Save codec round-trip benchmark")
+    parser.add_argument("-n", "--npcs", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--body", default="auto", choices=["auto", "json", "msgpack"])
+    args = parser.parse_args(argv)
+
+    game = build_world(args.npcs)
+    sections = bench_sections(game, args.repeat, args.body)
+    full = bench_full_save(game, max(1, args.repeat // 2))
+
+    print(f"{sections['npcs']} NPCs")
+    print(f"size     json {sections['json_bytes'] / 1024:8.0f} KiB   compact {sections['compact_bytes'] / 1024:8.0f} KiB")
+    for step in ("encode", "decode"):
+        old, new = sections[f"json_{step}_s"], sections[f"compact_{step}_s"]
+        print(f"{step:8} json {old * 1000:8.1f} ms    compact {new * 1000:8.1f} ms   x{old / new:.1f}")
+    for step in ("save", "load"):
+        old, new = full[f"json_{step}_s"], full[f"compact_{step}_s"]
+        print(f"{step:8} json {old * 1000:8.1f} ms    compact {new * 1000:8.1f} ms   x{old / new:.1f}  (full game)")
+
+
+if __name__ == "__main__":
+    main()
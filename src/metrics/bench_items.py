@@ -0,0 +1,80 @@
+"""
+Cost of item generation for world creation: one call per owner vs owner-tagged batches.
+
+    python -m src.metrics.bench_items [--merchants 4] [--quests 5] [--prefill-tps 800] [--decode-tps 30]
+
+Runs both ways against the latency-modelled FakeLLM from src.service.loadtest (no
+sleeping, no model needed) and reports model calls, prompt/output tokens and modelled
+seconds, in total and per generated item. Per-owner mode is what NPC and quest
+generation used to do: one generate_items_for_character call per merchant and quest.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+
+from src.agent.item_gen import generate_items_batch, generate_items_for_character
+from src.llm_client import use_llm
+from src.service.loadtest import FakeLLM, _WORLD
+
+ARCHETYPES = {"merchant": ("merchant_stock", 4), "quest": ("quest_reward", 2)}
+
+
+def _requests(merchants: int, quests: int):
+    reqs = [(f"npc_{i + 1}", *ARCHETYPES["merchant"]) for i in range(merchants)]
+    reqs += [(f"quest_{i + 1}", *ARCHETYPES["quest"]) for i in range(quests)]
+    return reqs
+
+
+def measure(mode: str, merchants: int, quests: int, prefill_tps: float, decode_tps: float):
+    llm = FakeLLM(prefill_tps, decode_tps, jitter=0.0, realtime=False)
+    summary = _WORLD.split("LORE:")[0]
+    reqs = _requests(merchants, quests)
+    use_llm(llm)
+    try:
+        if mode == "per_owner":
+            items = sum(len(generate_items_for_character(summary, archetype, count)) for _, archetype, count in reqs)
+        else:
+            items = sum(len(v) for v in generate_items_batch(summary, reqs).values())
+    finally:
+        use_llm(None)
+    per_item = max(1, items)
+    return {
+        "mode": mode,
+        "items": items,
+        "calls": llm.calls,
+        "prompt_tokens": llm.prompt_tokens,
+        "output_tokens": llm.output_tokens,
+        "model_s": round(llm.busy_s, 2),
+        "prompt_tokens_per_item": round(llm.prompt_tokens / per_item, 1),
+        "model_s_per_item": round(llm.busy_s / per_item, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-owner vs batched item generation")
+    parser.add_argument("--merchants", type=int, default=4)
+    parser.add_argument("--quests", type=int, default=5)
+    parser.add_argument("--prefill-tps", type=float, default=800.0)
+    parser.add_argument("--decode-tps", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="print the rows as JSON")
+    args = parser.parse_args(argv)
+
+    rows = [
+        measure(mode, args.merchants, args.quests, args.prefill_tps, args.decode_tps)
+        for mode in ("per_owner", "batch")
+    ]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return rows
+    for row in rows:
+        print(
+            f"{row['mode']:<10} items={row['items']:<4} calls={row['calls']:<3} "
+            f"prompt_tok={row['prompt_tokens']:<6} out_tok={row['output_tokens']:<6} "
+            f"model={row['model_s']}s  per item: {row['prompt_tokens_per_item']} prompt tok, {row['model_s_per_item']}s"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Load-latency benchmark for load_game: eager models vs LazyEntityMap.
+
+    python -m src.metrics.bench_load [-n 5000] [--format compact|json]
+
+Saves a synthetic world with `n` NPCs to a temp dir, then loads it in a fresh child
+process per mode so one run's memory does not pollute the other. Reports load time,
+time to read one NPC afterwards, RSS growth, and the peak of Python allocations
+during the load (tracemalloc, on a second untimed pass).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+from src import config
+from src.game.save_load import load_game, save_game
+from src.metrics.bench_codec import build_world
+
+
+def _rss_mb():
+    return psutil.Process().memory_info().rss / (1024 ** 2)
+
+
+def measure(root: str, lazy: bool):
+    gc.collect()
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    _world, _pcs, npcs, _quests, _order, _idx = load_game("bench", root=root, lazy=lazy)
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    first = npcs[next(iter(npcs))]
+    first_s = time.perf_counter() - t0
+    rss_after = _rss_mb()
+    del npcs, _quests, first
+
+    # second pass under tracemalloc for the peak of Python allocations during the load
+    gc.collect()
+    tracemalloc.start()
+    load_game("bench", root=root, lazy=lazy)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": "lazy" if lazy else "eager",
+        "load_ms": round(load_s * 1000, 2),
+        "first_npc_ms": round(first_s * 1000, 3),
+        "rss_delta_mb": round(rss_after - rss_before, 1),
+        "peak_alloc_mb": round(peak / (1024 ** 2), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="load_game latency / RSS benchmark")
+    parser.add_argument("-n", "--npcs", type=int, default=5000)
+    parser.add_argument("--format", default="compact", choices=["compact", "json"])
+    parser.add_argument("--child", nargs=2, metavar=("ROOT", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        root, mode = args.child
+        print(json.dumps(measure(root, lazy=mode == "lazy")))
+        return
+
+    config.save_format = args.format
+    with tempfile.TemporaryDirectory() as root:
+        save_game(build_world(args.npcs), "bench", root=root)
+        print(f"{args.npcs} NPCs, {args.format} save")
+        for mode in ("eager", "lazy"):
+            out = subprocess.run(
+                [sys.executable, "-m", "src.metrics.bench_load", "--child", root, mode],
+                check=True, capture_output=True, text=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(
+                f"{r['mode']:6} load {r['load_ms']:8.1f} ms   first npc {r['first_npc_ms']:7.3f} ms"
+                f"   RSS +{r['rss_delta_mb']:.1f} MB   peak alloc {r['peak_alloc_mb']:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
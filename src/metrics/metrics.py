@@ -31,6 +31,7 @@ class metricsreg():
         self.lock = threading.Lock()                        
         self.generations: Dict[str, llm_gen_stat] = {}
         self.counters: Dict[str,int] = {}
+        self.gauges: Dict[str,float] = {}
     
     def recording(self,name,duration_s,success,memory_gb,mem_delta_gb):
         with self.lock:
@@ -52,11 +53,22 @@ class metricsreg():
         with self.lock:
             self.counters[name] = self.counters.get(name,0)+amount
 
+    def gauge(self,name,value):
+        # last value wins (queue depth, lag, ...)
+        with self.lock:
+            self.gauges[name] = value
+
+    def drop_gauge(self,name):
+        # for per-object gauges whose object is gone
+        with self.lock:
+            self.gauges.pop(name,None)
+
     def snapshot(self):
         with self.lock:
             gen = {k: asdict(v) for k,v in self.generations.items()}
             counters = dict(self.counters)
-        return {"Generations":gen,"Counters":counters,"Process Memory in GB": read_process_memory()}
+            gauges = dict(self.gauges)
+        return {"Generations":gen,"Counters":counters,"Gauges":gauges,"Process Memory in GB": read_process_memory()}
     ########## THIS BIT IS NOT WORKING !! WHY ?? ###############     
     def write_snapshot(self, path=None):
         base_dir = Path(path) if path else Path(__file__).resolve().parent
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, List, Optional, Tuple
+
+from src import config
+from src.game.change_feed import notify_change
+from src.metrics.metrics import metrics
+
+
+# Process-wide character generation queue. Any session (or the API) submits a job for
+# a game; background workers run jobs in arrival order through GameService, so they
+# share the table locks and model slots with chat turns and nobody's browser blocks
+# on a sheet. A re-roll for a pc_id that is still queued replaces the queued job in
+# place; one submitted while that pc_id is generating waits and runs after it, and the
+# older result is overwritten. Every status change bumps the game's change feed.
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "superseded")
+
+
+@dataclass
+class CharJob:
+    job_id: int
+    game_id: str
+    pc_id: str
+    player_name: str
+    concept: str
+    char_name: str = ""
+    gender: str = ""
+    ancestry: str = ""
+    status: str = "queued"
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    pc_name: Optional[str] = None            # name on the finished sheet
+    eta_s: Optional[float] = None            # filled in by CharGenPool.jobs()
+
+    def to_dict(self):
+        return asdict(self)
+
+
+class CharGenPool:
+    def __init__(self, service=None, workers: Optional[int] = None, history: int = 20):
+        self._service = service
+        self.workers = max(1, workers or config.char_gen_workers)
+        self._cond = threading.Condition()
+        self._pending: Deque[CharJob] = deque()
+        self._queued: Dict[Tuple[str, str], CharJob] = {}      # (game_id, pc_id) -> queued job
+        self._running: Dict[int, CharJob] = {}
+        self._finished: Dict[str, Deque[CharJob]] = {}
+        self._history = history
+        self._ids = itertools.count(1)
+        self._avg_s = float(config.char_gen_eta_s)             # running average of job time
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def service(self):
+        if self._service is None:
+            from src.service.game_service import get_global_service
+            self._service = get_global_service()
+        return self._service
+
+    def _start(self):
+        # workers start on first use so importing the module is free
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"chargen-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(
+        self,
+        game_id: str,
+        pc_id: str,
+        player_name: str,
+        concept: str,
+        char_name: str = "",
+        gender: str = "",
+        ancestry: str = "",
+    ):
+        job = CharJob(
+            job_id=next(self._ids), game_id=game_id, pc_id=pc_id, player_name=player_name,
+            concept=concept, char_name=char_name, gender=gender, ancestry=ancestry,
+        )
+        with self._cond:
+            old = self._queued.get((game_id, pc_id))
+            if old is not None:
+                # re-roll before the old request ran: only the newest one runs, in the old slot
+                self._pending[self._pending.index(old)] = job
+                self._retire(old, "superseded")
+                metrics.increment("chargen.superseded")
+            else:
+                self._pending.append(job)
+            self._queued[(game_id, pc_id)] = job
+            self._start()
+            self._cond.notify()
+            metrics.gauge("chargen.queued", len(self._pending))
+        notify_change(game_id)
+        return job
+
+    def _retire(self, job: CharJob, status: str):
+        job.status = status
+        job.finished_at = time.time()
+        job.eta_s = None
+        self._finished.setdefault(job.game_id, deque(maxlen=self._history)).append(job)
+
+    def _next(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending)
+            job = self._pending.popleft()
+            del self._queued[(job.game_id, job.pc_id)]
+            job.status = "running"
+            job.started_at = time.time()
+            self._running[job.job_id] = job
+            metrics.gauge("chargen.queued", len(self._pending))
+        notify_change(job.game_id)
+        return job
+
+    def _loop(self):
+        while True:
+            job = self._next()
+            try:
+                pc = self.service.create_character(
+                    job.game_id, job.player_name, job.concept,
+                    char_name=job.char_name or None, gender=job.gender, ancestry=job.ancestry, pc_id=job.pc_id,
+                )
+                job.pc_name = pc.name
+                status = "done"
+            except Exception as exc:  # the job records the error; the worker keeps going
+                job.error = f"{type(exc).__name__}: {exc}"
+                status = "failed"
+            with self._cond:
+                del self._running[job.job_id]
+                self._retire(job, status)
+                if status == "done":
+                    self._avg_s = 0.7 * self._avg_s + 0.3 * (job.finished_at - job.started_at)
+            metrics.increment(f"chargen.{status}")
+            notify_change(job.game_id)
+
+    def jobs(self, game_id: str):
+        """Running, queued and recently finished jobs for one game, with ETAs in seconds."""
+        now = time.time()
+        with self._cond:
+            avg = self._avg_s
+            remaining = sorted(max(0.0, avg - (now - j.started_at)) for j in self._running.values())
+            # simulate the workers draining the queue: each takes the next job when it frees up
+            free_at = (remaining + [0.0] * self.workers)[: self.workers]
+            for job in self._running.values():
+                job.eta_s = max(0.0, avg - (now - job.started_at))
+            for job in self._pending:
+                start = min(free_at)
+                free_at[free_at.index(start)] = start + avg
+                job.eta_s = start + avg
+            running = [j for j in self._running.values() if j.game_id == game_id]
+            queued = [j for j in self._pending if j.game_id == game_id]
+            finished = list(reversed(self._finished.get(game_id, ())))
+        return running + queued + finished
+
+    def pending(self):
+        """Jobs queued or running across all games."""
+        with self._cond:
+            return len(self._pending) + len(self._running)
+
+
+_POOL: Optional[CharGenPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_char_gen_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = CharGenPool()
+        return _POOL
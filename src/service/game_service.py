@@ -0,0 +1,698 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from src import config
+from src.agent.char_gen import generate_character_sheet
+from src.agent.dm_dice import dm_turn_with_dice, refresh_corpus
+from src.agent.encounter_build import detect_encounter, encounter_prompt
+from src.agent.mechanics_prompt import refresh_mechanics_prompt
+from src.agent.item_gen import generate_items_batch, generate_items_for_character
+from src.agent.npc_gen import generate_npcs_for_world, label_item, stock_requests
+from src.agent.persona import DM_SYSTEM_PROMPT_TEMPLATE
+from src.agent.quest_commands import handle_quest_command
+from src.agent.quest_gen import generate_quests_for_world, reward_label, reward_requests
+from src.agent.types import Message
+from src.agent.world_build import generate_world_state
+from src.game.autosave import request_autosave
+from src.game.change_feed import get_change_feed, notify_change
+from src.game.entity_index import EntityIndex, get_entity_index
+from src.game.game_state import GameState, get_global_games
+from src.game.message_store import get_message_journal, sync_messages
+from src.game.models import PlayerCharacter
+from src.game.npc_store import save_npcs
+from src.game.persistence import persist
+from src.game.player_store import save_player_characters
+from src.game.quest_store import save_quests
+from src.game.rng import get_game_rng
+from src.game.save_state import save_world_state
+from src.game.turn_store import add_turn_action, add_turn_note, begin_turn, load_turn_log, record_draws, save_turn_log
+from src.metrics.metrics import metrics
+
+
+# Gameplay without Streamlit. The functions below take a GameState and do what the
+# UI handlers used to do inline (world creation, a player's input, initiative); the
+# Streamlit pages call them inside a spinner, and GameService puts them behind
+# per-table locks and a model slot for the HTTP/WebSocket server in server.py.
+
+START_WORDS = {"start", "begin", "let's begin", "i am ready"}
+
+TokenCallback = Optional[Callable[[str], None]]
+ProgressCallback = Optional[Callable[[str, str], None]]      # (stage, message)
+
+
+@dataclass
+class TurnResult:
+    game_id: str
+    accepted: bool
+    reason: Optional[str] = None                         # why input was not played: quest_command, not_your_turn
+    messages: List[Message] = field(default_factory=list)  # journaled messages this call added, oldest first
+    queue_wait_s: float = 0.0
+    elapsed_s: float = 0.0
+
+    def to_dict(self):
+        return {
+            "game_id": self.game_id,
+            "accepted": self.accepted,
+            "reason": self.reason,
+            "messages": [message_dict(m) for m in self.messages],
+            "queue_wait_s": round(self.queue_wait_s, 4),
+            "elapsed_s": round(self.elapsed_s, 4),
+        }
+
+
+def message_dict(msg: Message):
+    return {"seq": msg.seq, "role": msg.role, "content": msg.content, "speaker": msg.speaker}
+
+
+# ----------------------------------------------------------------------
+# turn order
+# ----------------------------------------------------------------------
+
+def current_actor(game: GameState):
+    if not game.initiative_order:
+        return None
+    if game.active_turn_index >= len(game.initiative_order):
+        game.active_turn_index = 0
+    pc_id = game.initiative_order[game.active_turn_index]
+    return game.player_characters.get(pc_id)
+
+
+def add_turn_system_message(game: GameState, pc):
+    if not pc:
+        return
+    turn_line = (
+        f"[TURN] It is now {pc.player_name} playing {pc.name}. "
+        "Use this character for all actions until the turn advances. "
+        "Click Next Turn when done."
+    )
+    game.messages.append(Message(role="system", content=turn_line))
+
+
+def rebuild_initiative_order(game: GameState, game_id: str):
+    pcs = game.player_characters or {}
+    ordered = sorted(
+        pcs.values(),
+        key=lambda pc: getattr(pc, "initiative", 0),
+        reverse=True,
+    )
+    game.initiative_order = [pc.pc_id for pc in ordered]
+    game.active_turn_index = 0
+    refresh_corpus(game_id)
+
+
+def _start_actor_turn(game: GameState, game_id: str, actor: PlayerCharacter):
+    # [TURN] line, a new turn-log entry, and the options stored for it (if any)
+    add_turn_system_message(game, actor)
+    if game.world is not None:
+        if not hasattr(game, "turn_log"):
+            game.turn_log = load_turn_log(game_id)
+        game.turn_log = record_draws(game.turn_log, get_game_rng(game_id).drain_draws())
+        game.turn_log = begin_turn(game.turn_log, actor)
+        persist(("turns", game.turn_log.world_id), save_turn_log, game.turn_log)
+    refresh_mechanics_prompt(game)
+    options = []
+    if getattr(game, "turn_log", None) and game.turn_log.entries:
+        options = game.turn_log.entries[-1].options or []
+    if options:
+        game.messages.append(
+            Message(
+                role="system",
+                content=(
+                    f"[TURN ACTIONS] {actor.player_name} as {actor.name}, "
+                    f"available actions: {', '.join(options)}"
+                ),
+            )
+        )
+    return options
+
+
+def build_initiative(game: GameState, game_id: str):
+    """Order PCs by initiative and start the first turn; returns (actor, options)."""
+    rebuild_initiative_order(game, game_id)
+    actor = current_actor(game)
+    options = _start_actor_turn(game, game_id, actor) if actor else []
+    sync_messages(game, game_id)
+    notify_change(game_id)
+    return actor, options
+
+
+def advance_turn(game: GameState, game_id: str):
+    """Hand the turn to the next PC in initiative; returns (actor, options)."""
+    if not game.initiative_order:
+        return None, []
+    game.active_turn_index = (game.active_turn_index + 1) % len(game.initiative_order)
+    actor = current_actor(game)
+    options = []
+    if actor:
+        options = _start_actor_turn(game, game_id, actor)
+        request_autosave(game, game_id)
+    sync_messages(game, game_id)
+    notify_change(game_id)
+    return actor, options
+
+
+# ----------------------------------------------------------------------
+# world, characters, player input
+# ----------------------------------------------------------------------
+
+def resolve_actor(game: GameState, speaker: str, index: Optional[EntityIndex] = None):
+
+    #Try to find the PlayerCharacter being referenced by the current speaker label.
+
+    if not game.player_characters:
+        return None
+    if index is None:
+        index = EntityIndex().sync_pcs(game.player_characters)
+
+    player_name = speaker
+    pc_name = None
+    if ":" in speaker:
+        player_name, pc_name = [part.strip() for part in speaker.split(":", 1)]
+
+    # Prefer explicit character match, then player name match.
+    if pc_name:
+        for entity in index.lookup(pc_name, kinds=("pc",)):
+            pc = game.player_characters.get(entity.key)
+            if pc:
+                return pc
+    for entity in index.lookup(player_name, kinds=("player",)):
+        pc = game.player_characters.get(entity.key)
+        if pc:
+            return pc
+    return None
+
+
+def derive_world_id(prompt: str, fallback: str):
+    #Build a stable, filesystem-friendly world_id from the user's prompt.
+    if prompt:
+        # keep letters/numbers, replace gaps with dashes, trim repeats, shorten
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", prompt).strip("-").lower()
+        slug = re.sub(r"-{2,}", "-", slug)[:40].strip("-")
+        if slug:
+            return slug
+    return fallback or "default"
+
+
+def dm_system_prompt(world):
+    players_str = ", ".join(world.players) if world.players else "Unnamed adventurers"
+    return DM_SYSTEM_PROMPT_TEMPLATE.format(
+        title=world.title,
+        world_summary=world.world_summary,
+        lore=world.lore,
+        players=players_str,
+    )
+
+
+def _set_busy(game: GameState, game_id: str, by: Optional[str], task: Optional[str]):
+    game.busy = task is not None
+    game.busy_by = by
+    game.busy_task = task
+    notify_change(game_id)
+
+
+def _stock_world_items(world, npcs, quests):
+    # merchant stock and quest rewards for the whole world in one batched item call
+    requests = stock_requests(npcs) + reward_requests(quests)
+    if not requests:
+        return 0
+    try:
+        items = generate_items_batch(world.world_summary, requests)
+    except Exception:
+        metrics.increment("worldgen.item_failures")
+        return 0
+    for npc_id, npc in npcs.items():
+        if npc_id in items:
+            npc.inventory = [label_item(it) for it in items[npc_id]]
+    for quest_id, quest in quests.items():
+        if quest_id in items:
+            quest.reward_items = [reward_label(it) for it in items[quest_id]]
+    return sum(len(v) for v in items.values())
+
+
+def create_world(
+    game: GameState,
+    game_id: str,
+    prompt: str,
+    players: Optional[List[str]] = None,
+    on_progress: ProgressCallback = None,
+):
+    """
+    Generate the world, NPCs, quests and their items from the first prompt and reset the
+    DM context. Each stage is published on the game as soon as it parses (the world and
+    DM intro first), and on_progress(stage, message) plus the busy banner report it.
+    """
+    game.messages.append(Message(role="user", content=prompt, speaker="Player"))
+    sync_messages(game, game_id)
+
+    def progress(stage: str, message: str):
+        game.busy_task = message
+        notify_change(game_id)
+        if on_progress is not None:
+            on_progress(stage, message)
+
+    _set_busy(game, game_id, "World creation", "Forging world...")
+    try:
+        progress("world", "Forging world...")
+        world = generate_world_state(
+            setting_prompt=prompt,
+            players=players or ["Player"],
+            world_id=derive_world_id(prompt, game_id),
+        )
+        persist(("world", world.world_id), save_world_state, world)
+        game.world = world
+
+        intro = (
+            f"Welcome to **{world.title}**.\n\n"
+            f"{world.world_summary}\n\n"
+            "Tell me who you are as the story opens."
+        )
+        game.messages = [
+            Message(role="system", content=dm_system_prompt(world)),
+            Message(role="assistant", content=intro, speaker="Dungeon Master"),
+        ]
+        sync_messages(game, game_id)
+
+        progress("npcs", f"{world.title}: populating the NPC roster...")
+        game.npcs = generate_npcs_for_world(world, max_npcs=10, rng=get_game_rng(game_id), with_items=False)
+
+        progress("quests", f"{world.title}: writing quests...")
+        game.quests = generate_quests_for_world(world, game.npcs, with_items=False)
+
+        progress("items", f"{world.title}: stocking merchants and quest rewards...")
+        _stock_world_items(world, game.npcs, game.quests)
+        persist(("npcs", world.world_id), save_npcs, world.world_id, game.npcs.copy())
+        persist(("quests", world.world_id), save_quests, world.world_id, game.quests.copy())
+
+        game.turn_log = load_turn_log(game_id)
+        request_autosave(game, game_id)
+        progress("done", f"{world.title} is ready.")
+        return world
+    finally:
+        sync_messages(game, game_id)
+        _set_busy(game, game_id, None, None)
+
+
+def create_character(
+    game: GameState,
+    game_id: str,
+    player_name: str,
+    concept: str,
+    char_name: Optional[str] = None,
+    gender: str = "",
+    ancestry: str = "",
+    pc_id: Optional[str] = None,
+):
+    """Generate (or re-roll) one player's character sheet and store it on the game."""
+    world = game.world
+    if world is None:
+        raise ValueError("Create a world before generating characters")
+    pc_id = pc_id or f"{world.world_id}_{player_name.lower().replace(' ', '_')}"
+    _set_busy(game, game_id, player_name, "Generating character")
+    try:
+        pc = generate_character_sheet(
+            world_summary=world.world_summary,
+            world_skills=world.skills,
+            player_name=player_name,
+            character_prompt=concept,
+            pc_id=pc_id,
+            char_name=char_name or f"{player_name}'s character",
+            gender=gender,
+            ancestry=ancestry,
+            rng=get_game_rng(game_id).stream("dice"),
+            world_id=world.world_id,
+        )
+        game.player_characters[pc_id] = pc
+        persist(("pcs", world.world_id), save_player_characters, world.world_id, dict(game.player_characters))
+        request_autosave(game, game_id)
+        return pc
+    finally:
+        _set_busy(game, game_id, None, None)
+
+
+def restock_merchant(game: GameState, game_id: str, npc_id: str):
+    """New stock for one merchant NPC (pre-generated items first); returns the inventory."""
+    world = game.world
+    npc = game.npcs[npc_id]
+    items = generate_items_for_character(
+        world_summary=world.world_summary,
+        archetype="merchant_stock",
+        count=4,
+        world_id=world.world_id,
+    )
+    npc.inventory = [f"{it.item_name} ({it.item_category or 'gear'})" for it in items]
+    game.npcs[npc_id] = npc
+    persist(("npcs", world.world_id), save_npcs, world.world_id, game.npcs.copy())
+    return npc.inventory
+
+
+def _opening_input(game: GameState):
+    if len(game.player_characters) == 1:
+        pc = next(iter(game.player_characters.values()))
+        return (
+            "We are ready to begin. "
+            f"Introduce {pc.name}, a level {pc.level} "
+            f"{pc.ancestry} {pc.archetype}, and describe the opening scene."
+            "Do not invent new player characters."
+        )
+    return (
+        "We are ready to begin. Use PARTY SUMMARY. "
+        "Describe the opening scene without making new characters."
+    )
+
+
+def play_input(game: GameState, game_id: str, speaker: str, user_input: str, on_token: TokenCallback = None):
+    """
+    One player input: /quest commands, the start prompt, turn-order checks, encounter
+    detection, then the DM turn (with dice). on_token receives the DM's text as it streams.
+    """
+    journal = get_message_journal(game_id)
+    sync_messages(game, game_id)
+    first_new = len(journal)
+    result = TurnResult(game_id=game_id, accepted=True)
+
+    if game.world is not None and not hasattr(game, "turn_log"):
+        game.turn_log = load_turn_log(game_id)
+
+    # Keep the per-game name index in step with any entity edits since the last input.
+    index = get_entity_index(game_id).sync_game(game)
+
+    try:
+        # 1) Intercept /quest commands
+        if handle_quest_command(user_input, game, index):
+            game.messages.append(Message(role="user", content=user_input, speaker=speaker))
+            result.accepted, result.reason = False, "quest_command"
+            return result
+
+        # 2) Start-game normalization
+        is_start = user_input.strip().lower() in START_WORDS
+        if is_start:
+            user_input = _opening_input(game)
+
+        # 3) Normal player message
+        refresh_mechanics_prompt(game)
+        game.messages.append(Message(role="user", content=user_input, speaker=speaker))
+
+        # If this is the kickoff prompt, instruct the DM to name the party and active turn.
+        if is_start:
+            party_text = ", ".join(
+                f"{pc.player_name} as {pc.name}" for pc in game.player_characters.values()
+            ) or "the party"
+            turn_label = "no initiative set yet"
+            active_pc = current_actor(game)
+            if active_pc:
+                turn_label = f"{active_pc.player_name} as {active_pc.name}"
+            game.messages.append(
+                Message(
+                    role="system",
+                    content=(
+                        "Opening scene guidance: explicitly mention the whole party "
+                        f"({party_text}) and state whose turn it is ({turn_label}). "
+                        "Then describe the scene."
+                    ),
+                )
+            )
+            game.messages.append(
+                Message(
+                    role="system",
+                    content=(
+                        "Do not create or rename player characters. "
+                        "Use only the provided PARTY SUMMARY for the party roster."
+                    ),
+                )
+            )
+            # Auto-advance to the current actor so everyone sees whose turn it is.
+            if game.initiative_order:
+                actor = current_actor(game)
+                if actor:
+                    add_turn_system_message(game, actor)
+                    if game.world is not None:
+                        game.turn_log = record_draws(game.turn_log, get_game_rng(game_id).drain_draws())
+                        game.turn_log = begin_turn(game.turn_log, actor)
+                        persist(("turns", game.turn_log.world_id), save_turn_log, game.turn_log)
+
+        # 3a) Enforce initiative order: block out-of-turn actions
+        if game.initiative_order:
+            expected_actor = current_actor(game)
+            actor = resolve_actor(game, speaker, index)
+            if expected_actor and (not actor or expected_actor.pc_id != actor.pc_id):
+                expected_label = f"{expected_actor.player_name} as {expected_actor.name}"
+                game.messages.append(
+                    Message(
+                        role="system",
+                        content=(
+                            f"It's not your turn. Active turn: {expected_label}. "
+                            "Click Next Turn when they finish."
+                        ),
+                    )
+                )
+                result.accepted, result.reason = False, "not_your_turn"
+                return result
+
+        # 3b) Encounter detection
+        encounter = detect_encounter(user_input)
+        actor = resolve_actor(game, speaker, index)
+        if encounter and game.active_encounter != encounter.encounter_type:
+            game.active_encounter = encounter.encounter_type
+            game.active_encounter_summary = encounter.summary
+            game.encounter_history.append(encounter.summary)
+            player_name = actor.player_name if actor else speaker
+            char_name = actor.name if actor else "Unknown character"
+            game.messages.append(
+                Message(
+                    role="system",
+                    content=encounter_prompt(encounter, player_name, char_name),
+                )
+            )
+            if hasattr(game, "turn_log"):
+                note = f"Encounter started: {encounter.encounter_type}"
+                game.turn_log = add_turn_note(game.turn_log, note)
+                persist(("turns", game.turn_log.world_id), save_turn_log, game.turn_log)
+
+        # 4) DM turn, with dice support for /action
+        _set_busy(game, game_id, speaker, "DM is thinking...")
+        try:
+            game.messages = dm_turn_with_dice(game_id, game.messages, game.player_characters, on_token=on_token)
+            if hasattr(game, "turn_log"):
+                game.turn_log = add_turn_note(game.turn_log, f"{speaker}: {user_input}")
+                actor = resolve_actor(game, speaker, index)
+                tags = ["action"] if user_input.strip().startswith("/action") else None
+                game.turn_log = add_turn_action(
+                    game.turn_log,
+                    player_name=speaker,
+                    actor=actor,
+                    content=user_input,
+                    tags=tags,
+                )
+                game.turn_log = record_draws(game.turn_log, get_game_rng(game_id).drain_draws())
+                persist(("turns", game.turn_log.world_id), save_turn_log, game.turn_log)
+            # Explicitly remind to advance the turn, with both player and character names.
+            actor = resolve_actor(game, speaker, index)
+            label = f"{actor.player_name} as {actor.name}" if actor else speaker
+            game.messages.append(
+                Message(
+                    role="system",
+                    content=f"Turn resolved for {label}. Click Next Turn to move to the next character.",
+                )
+            )
+            # Suggest who is next in initiative, if available
+            if game.initiative_order:
+                next_idx = (game.active_turn_index + 1) % len(game.initiative_order)
+                next_pc = game.player_characters.get(game.initiative_order[next_idx])
+                if next_pc:
+                    game.messages.append(
+                        Message(
+                            role="system",
+                            content=(
+                                f"Next up: {next_pc.player_name} as {next_pc.name}. "
+                                "Press Next Turn to hand over."
+                            ),
+                        )
+                    )
+            request_autosave(game, game_id)
+        finally:
+            _set_busy(game, game_id, None, None)
+        return result
+    finally:
+        sync_messages(game, game_id)
+        added = len(journal) - first_new
+        result.messages = journal.page(limit=added) if added else []
+
+
+def game_snapshot(game: GameState, game_id: str, recent: int = 20):
+    """JSON-ready view of a table: world, party, turn order, busy flag and recent chat."""
+    world = game.world
+    actor = current_actor(game)
+    journal = get_message_journal(game_id)
+    return {
+        "game_id": game_id,
+        "version": get_change_feed(game_id).version,
+        "world": None if world is None else {
+            "world_id": world.world_id,
+            "title": world.title,
+            "world_summary": world.world_summary,
+        },
+        "player_characters": {pc_id: pc.to_dict() for pc_id, pc in game.player_characters.items()},
+        "initiative_order": list(game.initiative_order),
+        "active_turn_index": game.active_turn_index,
+        "current_actor": None if actor is None else {"pc_id": actor.pc_id, "name": actor.name, "player_name": actor.player_name},
+        "active_encounter": game.active_encounter,
+        "busy": {"by": game.busy_by, "task": game.busy_task} if game.busy else None,
+        "messages": [message_dict(m) for m in journal.visible(recent)],
+        "message_count": len(journal),
+    }
+
+
+# ----------------------------------------------------------------------
+# service
+# ----------------------------------------------------------------------
+
+class ModelSlots:
+    """
+    First-come-first-served counting semaphore. threading.Semaphore lets a thread that
+    just released a slot take it straight back, so under load one table could run turn
+    after turn while the others never got the model.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._free = slots
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+
+    def try_acquire(self):
+        # only when a slot is free and nobody is queued; background work never jumps the queue
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            return False
+
+    def idle(self):
+        with self._lock:
+            return self._free == self.slots and not self._waiters
+
+    def acquire(self):
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            ticket = threading.Event()
+            self._waiters.append(ticket)
+        # release() hands the slot straight to the oldest waiter
+        ticket.wait()
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()
+            else:
+                self._free += 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class GameService:
+    """
+    Thread-safe front for many tables. Each table runs one request at a time; calls
+    that need the model also take one of `model_slots` slots, so any number of tables
+    can queue on a single llama.cpp instance, served in arrival order. queue_wait_s on results is the time spent
+    waiting for both.
+    """
+
+    def __init__(self, games=None, model_slots: Optional[int] = None):
+        self.games = get_global_games() if games is None else games
+        self._model = ModelSlots(model_slots or config.service_model_slots)
+        self._tables: Dict[str, threading.Lock] = {}
+        self._tables_lock = threading.Lock()
+
+    def game(self, game_id: str):
+        if game_id not in self.games:
+            self.games[game_id] = GameState()
+        return self.games[game_id]
+
+    def _table(self, game_id: str):
+        with self._tables_lock:
+            lock = self._tables.get(game_id)
+            if lock is None:
+                lock = threading.Lock()
+                self._tables[game_id] = lock
+            return lock
+
+    def _hold(self, game_id: str):
+        # keeps the registry from spilling a table while a request is queued or running on it
+        hold = getattr(self.games, "hold", None)
+        return hold(game_id) if hold is not None else nullcontext()
+
+    def _run(self, game_id: str, uses_model: bool, fn, *args, **kwargs):
+        queued = time.perf_counter()
+        with self._hold(game_id), self._table(game_id):
+            if uses_model:
+                self._model.acquire()
+            try:
+                started = time.perf_counter()
+                metrics.gauge("service.queue_wait_s", round(started - queued, 4))
+                out = fn(self.game(game_id), game_id, *args, **kwargs)
+                if isinstance(out, TurnResult):
+                    out.queue_wait_s = started - queued
+                    out.elapsed_s = time.perf_counter() - started
+                return out
+            finally:
+                if uses_model:
+                    self._model.release()
+
+    def model_idle(self):
+        return self._model.idle()
+
+    def run_when_idle(self, fn, *args, **kwargs):
+        """Run fn with a model slot only if one is free right now; returns (ran, result)."""
+        if not self._model.try_acquire():
+            return False, None
+        try:
+            return True, fn(*args, **kwargs)
+        finally:
+            self._model.release()
+
+    def create_world(
+        self, game_id: str, prompt: str, players: Optional[List[str]] = None, on_progress: ProgressCallback = None
+    ):
+        return self._run(game_id, True, create_world, prompt, players, on_progress=on_progress)
+
+    def create_character(self, game_id: str, player_name: str, concept: str, **kwargs):
+        return self._run(game_id, True, create_character, player_name, concept, **kwargs)
+
+    def restock_merchant(self, game_id: str, npc_id: str):
+        return self._run(game_id, True, restock_merchant, npc_id)
+
+    def act(self, game_id: str, speaker: str, text: str, on_token: TokenCallback = None):
+        result = self._run(game_id, True, play_input, speaker, text, on_token=on_token)
+        metrics.increment("service.turns")
+        return result
+
+    def build_initiative(self, game_id: str):
+        return self._run(game_id, False, build_initiative)
+
+    def next_turn(self, game_id: str):
+        return self._run(game_id, False, advance_turn)
+
+    def snapshot(self, game_id: str, recent: int = 20):
+        return game_snapshot(self.game(game_id), game_id, recent)
+
+
+@lru_cache(maxsize=1)
+def get_global_service():
+    # One service per process over the shared games registry, so the Streamlit pages,
+    # background jobs and the API queue on the same table locks and model slots.
+    return GameService()
@@ -0,0 +1,482 @@
+"""
+Multi-table load test for the game service.
+
+    python -m src.service.loadtest --tables 4 --players 3 --turns 10 [--fake] [--json out.json]
+
+Runs `tables` synthetic tables at once, each with `players` scripted players, through
+GameService (the same code the HTTP/WebSocket server uses): world creation, one
+character per player, initiative, "start", then `turns` rounds of /action inputs with
+Next Turn after each. Every table is its own thread, like one browser per table.
+
+--fake swaps the model for FakeLLM: canned, parseable replies whose duration follows
+prompt and reply length (prefill and decode tokens/s), one call at a time like a single
+llama.cpp instance. Retrieval is switched off in that mode so only model time counts.
+Without --fake the configured GGUF model is used.
+
+Reports p50/p95/p99 turn latency and queue wait (time a turn waited for its table and a
+model slot), world/character generation time, turns per second, and RSS sampled every
+--sample-s seconds. Saves go to a temporary directory unless --keep-saves is given.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import psutil
+
+from src import config
+from src.agent import dm_dice
+from src.agent.char_gen import END_MARKER
+from src.game import npc_store
+from src.game.persistence import flush_persistence
+from src.llm_client import use_llm
+from src.service import game_service
+from src.service.game_service import GameService, current_actor
+
+
+ACTIONS = [
+    "/action I sneak past the guard",
+    "/action I attack the nearest bandit",
+    "/action I pick the lock on the chest",
+    "/action I persuade the merchant to lower the price",
+    "/action I climb the crumbling wall",
+    "I look around the room",
+]
+
+
+# ----------------------------------------------------------------------
+# fake model
+# ----------------------------------------------------------------------
+
+_WORLD = """TITLE: Ashes of Varn
+
+WORLD SUMMARY:
+A frontier realm of ash plains and river forts, where old gods sleep under the hills. Trade barons and hill clans fight over the last clean rivers.
+
+LORE:
+The empire of Varn fell when its sky-forges cracked. Its heirs now hold river forts and sell water to the clans.
+
+MAJOR LOCATIONS (1):
+1. Varnhold - A walled river city built around a dead sky-forge.
+
+MINOR LOCATIONS (2):
+1. Cinder Ford - A toll crossing run by smugglers.
+2. Hollow Barrow - A burial mound where lights move at night.
+
+WORLD SKILLS:
+Stealth
+Athletics
+Persuasion
+Lockpicking
+Perception
+Survival
+
+THEMES & TONE:
+- Scarcity and loyalty
+- Old power waking
+"""
+
+_NPCS = """NPC 1:
+Name: Mara Vell
+Role: merchant
+Location: Cinder Ford
+Description: A water trader with a ledger for every debt.
+Hooks:
+- Needs a shipment guarded
+Attitude: greedy
+Tags:
+- merchant
+
+NPC 2:
+Name: Captain Orrin
+Role: leader
+Location: Varnhold
+Description: Commander of the river watch.
+Hooks:
+- Wants the barrow lights explained
+Attitude: stern
+Tags:
+- leader
+- quest giver
+"""
+
+_QUESTS = """QUEST 1:
+Title: Lights in the Barrow
+Giver: Captain Orrin
+Location: Hollow Barrow
+Summary: Strange lights move over the barrow at night and patrols have gone missing.
+Steps:
+- Question the last patrol's families
+- Enter the barrow after dark
+Rewards:
+- 50 silver
+- A watch commission
+"""
+
+_ITEMS = """ITEM 1:
+Name: Short Sword
+Category: weapon
+Subcategory: sword
+Damage: 1d6
+Damage Type: slashing
+Properties: finesse, light
+
+ITEM 2:
+Name: Healing Draught
+Category: consumable
+Subcategory: potion
+Damage: -
+Damage Type: healing
+Properties: consumable
+"""
+
+_SHEET = """NAME: {name}
+GENDER: unspecified
+ANCESTRY: human
+ARCHETYPE: Scout
+LEVEL: 1
+
+CONCEPT:
+A quiet scout from the river forts. Knows every ford between Varnhold and the barrows.
+
+STATS:
+STR: 10
+DEX: 15
+CON: 12
+INT: 11
+WIS: 13
+CHA: 9
+
+MAX HP: 11
+
+SKILLS:
+- Stealth
+- Perception
+- Survival
+
+END: {end}
+"""
+
+_NARRATION = (
+    "The ash wind drops for a moment. Torches gutter along the wall as you move, and somewhere "
+    "below a chain rattles. The guard shifts his weight, eyes on the river, and the way ahead "
+    "opens for a heartbeat. What do you do next?"
+)
+
+
+_ITEM_BODIES = [b.split(":\n", 1)[1] for b in _ITEMS.strip().split("\n\n")]
+
+
+def _counted_items(prompt: str):
+    # single-owner item prompt: as many blocks as it asks for
+    count = re.search(r"Output exactly (\d+) items", prompt)
+    n = int(count.group(1)) if count else 2
+    return "\n\n".join(f"ITEM {i + 1}:\n{_ITEM_BODIES[i % len(_ITEM_BODIES)]}" for i in range(n))
+
+
+def _owner_items(prompt: str):
+    # batched item prompt: the requested number of blocks per owner id, each tagged
+    out, n = [], 0
+    for owner, count in re.findall(r"^(O\d+): .*?, (\d+) items?$", prompt, re.MULTILINE):
+        for _ in range(int(count)):
+            out.append(f"ITEM {n + 1}:\nOwner: {owner}\n{_ITEM_BODIES[n % len(_ITEM_BODIES)]}")
+            n += 1
+    return "\n\n".join(out)
+
+
+class FakeLLM:
+    """
+    Stand-in for the Llama object: canned replies that the generators can parse, with
+    sleep time = prompt tokens / prefill_tps + reply tokens / decode_tps (about 4 chars
+    per token). One call runs at a time, like a single model instance. With
+    realtime=False it only adds the modelled time to busy_s (for benchmarks).
+    """
+
+    def __init__(
+        self,
+        prefill_tps: float = 800.0,
+        decode_tps: float = 30.0,
+        jitter: float = 0.1,
+        seed: int = 0,
+        realtime: bool = True,
+    ):
+        self.prefill_tps = prefill_tps
+        self.decode_tps = decode_tps
+        self.jitter = jitter
+        self.realtime = realtime
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.busy_s = 0.0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+
+    def _reply(self, prompt: str):
+        if "Expand the user's idea" in prompt:
+            return _WORLD
+        if "NPC designer" in prompt:
+            return _NPCS
+        if "quest designer" in prompt:
+            return _QUESTS
+        if "several owners" in prompt:
+            return _owner_items(prompt)
+        if "quartermaster" in prompt:
+            return _counted_items(prompt)
+        if "create a tabletop RPG character" in prompt:
+            name = re.search(r"Character name:\s*(.+)", prompt)
+            return _SHEET.format(name=name.group(1).strip() if name else "Scout", end=END_MARKER)
+        if "session scribe" in prompt:
+            return "The party reached the ford, argued with the toll keeper and crossed at night."
+        return _NARRATION
+
+    def _durations(self, prompt: str, text: str, max_tokens: int):
+        scale = 1.0 + self._rng.uniform(-self.jitter, self.jitter)
+        out_tokens = max(1, min(max_tokens, len(text) // 4))
+        self.calls += 1
+        self.prompt_tokens += len(prompt) // 4
+        self.output_tokens += out_tokens
+        self.busy_s += scale * ((len(prompt) / 4) / self.prefill_tps + out_tokens / self.decode_tps)
+        return scale * (len(prompt) / 4) / self.prefill_tps, scale / self.decode_tps, out_tokens
+
+    def __call__(self, prompt: str, max_tokens: int = 256, stream: bool = False, **kwargs):
+        text = self._reply(prompt)
+        if stream:
+            return self._stream(prompt, text, max_tokens)
+        with self._lock:
+            prefill, per_token, out_tokens = self._durations(prompt, text, max_tokens)
+            if self.realtime:
+                time.sleep(prefill + per_token * out_tokens)
+        return {"choices": [{"text": text}]}
+
+    def _stream(self, prompt: str, text: str, max_tokens: int):
+        with self._lock:
+            prefill, per_token, out_tokens = self._durations(prompt, text, max_tokens)
+            words = text.split(" ")
+            per_word = per_token * out_tokens / max(1, len(words)) if self.realtime else 0.0
+            if self.realtime:
+                time.sleep(prefill)
+            for i, word in enumerate(words):
+                if per_word:
+                    time.sleep(per_word)
+                yield {"choices": [{"text": word if i == 0 else " " + word}]}
+
+
+@contextmanager
+def fake_backend(llm: FakeLLM):
+    # model calls go to llm; retrieval (embeddings) is skipped so only model time is measured
+    saved = (dm_dice._ensure_index, dm_dice._build_context_prefix, game_service.refresh_corpus)
+    use_llm(llm)
+    dm_dice._ensure_index = lambda game_id: None
+    dm_dice._build_context_prefix = lambda game_id, messages: ""
+    game_service.refresh_corpus = lambda game_id: None
+    try:
+        yield llm
+    finally:
+        use_llm(None)
+        dm_dice._ensure_index, dm_dice._build_context_prefix, game_service.refresh_corpus = saved
+
+
+# ----------------------------------------------------------------------
+# tables
+# ----------------------------------------------------------------------
+
+@dataclass
+class LoadStats:
+    turn_s: List[float] = field(default_factory=list)
+    queue_wait_s: List[float] = field(default_factory=list)
+    world_s: List[float] = field(default_factory=list)
+    character_s: List[float] = field(default_factory=list)
+    rejected: int = 0
+    errors: List[str] = field(default_factory=list)
+    rss_mb: List[tuple] = field(default_factory=list)     # (seconds since start, MB)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, name: str, value: float):
+        with self._lock:
+            getattr(self, name).append(value)
+
+
+def run_table(service: GameService, table_id: str, players: int, turns: int, stats: LoadStats, seed: int = 0,
+              ready: Optional[threading.Barrier] = None):
+    # ready: tables wait for each other after setup so the turn phase overlaps
+    rng = random.Random(seed)
+    names = [f"{table_id}-p{i + 1}" for i in range(players)]
+    try:
+        t0 = time.perf_counter()
+        service.create_world(table_id, "A frontier of ash plains and river forts", names)
+        stats.add("world_s", time.perf_counter() - t0)
+
+        for name in names:
+            t0 = time.perf_counter()
+            service.create_character(table_id, name, "A quiet scout who knows the river fords", char_name=f"{name} scout")
+            stats.add("character_s", time.perf_counter() - t0)
+
+        service.build_initiative(table_id)
+        if ready is not None:
+            ready.wait()
+        game = service.game(table_id)
+        actor = current_actor(game)
+        service.act(table_id, f"{actor.player_name}:{actor.name}", "start")
+
+        for _ in range(turns * players):
+            actor = current_actor(game)
+            t0 = time.perf_counter()
+            result = service.act(table_id, f"{actor.player_name}:{actor.name}", rng.choice(ACTIONS))
+            stats.add("turn_s", time.perf_counter() - t0)
+            stats.add("queue_wait_s", result.queue_wait_s)
+            if not result.accepted:
+                with stats._lock:
+                    stats.rejected += 1
+            service.next_turn(table_id)
+    except Exception as exc:  # keep the other tables running; the report lists failures
+        if ready is not None:
+            ready.abort()
+        stats.add("errors", f"{table_id}: {type(exc).__name__}: {exc}")
+
+
+def _sample_rss(stats: LoadStats, stop: threading.Event, every_s: float, started: float):
+    proc = psutil.Process()
+    while True:
+        stats.add("rss_mb", (round(time.perf_counter() - started, 2), round(proc.memory_info().rss / (1024 ** 2), 1)))
+        if stop.wait(every_s):
+            return
+
+
+def _pct(values: List[float]):
+    if not values:
+        return {"n": 0}
+    arr = np.asarray(values)
+    return {
+        "n": int(arr.size),
+        "p50": round(float(np.percentile(arr, 50)), 4),
+        "p95": round(float(np.percentile(arr, 95)), 4),
+        "p99": round(float(np.percentile(arr, 99)), 4),
+        "max": round(float(arr.max()), 4),
+    }
+
+
+def run_load(tables: int, players: int, turns: int, llm: Optional[FakeLLM] = None, sample_s: float = 1.0, seed: int = 0):
+    """Run the whole load test in this process; returns the report dict."""
+    service = GameService(games={})
+    stats = LoadStats()
+    stop = threading.Event()
+    started = time.perf_counter()
+    sampler = threading.Thread(target=_sample_rss, args=(stats, stop, sample_s, started), daemon=True)
+    sampler.start()
+
+    ready = threading.Barrier(tables)
+
+    def _run():
+        with ThreadPoolExecutor(max_workers=tables, thread_name_prefix="table") as pool:
+            for i in range(tables):
+                pool.submit(run_table, service, f"load{i + 1}", players, turns, stats, seed + i, ready)
+
+    if llm is not None:
+        with fake_backend(llm):
+            _run()
+    else:
+        _run()
+    wall_s = time.perf_counter() - started
+    flush_persistence()       # background saves land in this directory, not the caller's
+    stop.set()
+    sampler.join()
+
+    report: Dict = {
+        "tables": tables,
+        "players": players,
+        "turns_per_player": turns,
+        "backend": "fake" if llm is not None else "model",
+        "model_slots": config.service_model_slots,
+        "wall_s": round(wall_s, 2),
+        "turns": len(stats.turn_s),
+        "turns_per_s": round(len(stats.turn_s) / wall_s, 3) if wall_s else 0.0,
+        "turn_latency_s": _pct(stats.turn_s),
+        "queue_wait_s": _pct(stats.queue_wait_s),
+        "world_gen_s": _pct(stats.world_s),
+        "character_gen_s": _pct(stats.character_s),
+        "rejected_turns": stats.rejected,
+        "errors": stats.errors,
+        "rss_mb": stats.rss_mb,
+    }
+    if llm is not None:
+        report["model_calls"] = llm.calls
+        report["model_utilization"] = round(llm.busy_s / wall_s, 3) if wall_s else 0.0
+    return report
+
+
+def _print_report(report: Dict):
+    print(
+        f"{report['tables']} tables x {report['players']} players, {report['backend']} backend, "
+        f"{report['model_slots']} model slot(s): {report['turns']} turns in {report['wall_s']} s "
+        f"({report['turns_per_s']} turns/s)"
+    )
+    for key in ("turn_latency_s", "queue_wait_s", "world_gen_s", "character_gen_s"):
+        row = report[key]
+        if row.get("n"):
+            print(f"  {key:<16} n={row['n']:<5} p50={row['p50']:<8} p95={row['p95']:<8} p99={row['p99']:<8} max={row['max']}")
+    if "model_utilization" in report:
+        print(f"  model calls {report['model_calls']}, busy {report['model_utilization'] * 100:.0f}% of wall time")
+    rss = [mb for _, mb in report["rss_mb"]]
+    if rss:
+        print(f"  RSS MB: start {rss[0]}, peak {max(rss)}, end {rss[-1]} ({len(rss)} samples)")
+    if report["rejected_turns"]:
+        print(f"  rejected turns: {report['rejected_turns']}")
+    for err in report["errors"]:
+        print(f"  error: {err}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-table load test for the game service")
+    parser.add_argument("--tables", type=int, default=4)
+    parser.add_argument("--players", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=5, help="rounds; each player acts once per round")
+    parser.add_argument("--fake", action="store_true", help="use the latency-modelled fake model")
+    parser.add_argument("--prefill-tps", type=float, default=800.0)
+    parser.add_argument("--decode-tps", type=float, default=30.0)
+    parser.add_argument("--model-slots", type=int, default=None, help="override config.service_model_slots")
+    parser.add_argument("--sample-s", type=float, default=1.0, help="RSS sampling interval")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-saves", action="store_true", help="write saves under ./saves instead of a temp dir")
+    parser.add_argument("--json", default=None, help="also write the report to this path")
+    args = parser.parse_args(argv)
+
+    if args.model_slots:
+        config.service_model_slots = args.model_slots
+    llm = FakeLLM(args.prefill_tps, args.decode_tps, seed=args.seed) if args.fake else None
+    out = os.path.abspath(args.json) if args.json else None
+
+    cwd = os.getcwd()
+    tmp = None if args.keep_saves else tempfile.TemporaryDirectory(prefix="dm_loadtest_")
+    npc_dir = npc_store.NPC_SAVE_DIR
+    if tmp is not None:
+        os.chdir(tmp.name)
+        npc_store.NPC_SAVE_DIR = Path(tmp.name) / "saves" / "npcs"    # the only save root anchored to the repo
+    try:
+        report = run_load(args.tables, args.players, args.turns, llm=llm, sample_s=args.sample_s, seed=args.seed)
+    finally:
+        os.chdir(cwd)
+        npc_store.NPC_SAVE_DIR = npc_dir
+        if tmp is not None:
+            tmp.cleanup()
+
+    _print_report(report)
+    if out:
+        with open(out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
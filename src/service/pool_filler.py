@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+from typing import List, Optional, Tuple
+
+from src import config
+from src.agent.item_gen import generate_items_batch
+from src.game.content_pool import ContentPool, get_content_pool, pool_key
+from src.metrics.metrics import metrics
+
+
+# Background top-up of the content pools (src/game/content_pool.py). Every
+# content_pool_idle_check_s it looks at the resident games; when no table holds the
+# model, no character job is waiting and no game is busy, it runs ONE small generation
+# (at most content_pool_batch_items items) for the emptiest pool and goes back to sleep. The model slot is only taken when it is free with nobody
+# queued, so a player who shows up waits for at most that one small call.
+
+ITEM_KEYS = ("merchant_stock",)        # plus the archetypes of the game's characters
+
+
+class PoolFiller:
+    def __init__(self, service=None, pool: Optional[ContentPool] = None, interval: Optional[float] = None):
+        self._service = service
+        self.pool = pool or get_content_pool()
+        self.interval = config.content_pool_idle_check_s if interval is None else interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def service(self):
+        if self._service is None:
+            from src.service.game_service import get_global_service
+            self._service = get_global_service()
+        return self._service
+
+    def _games(self):
+        games = self.service.games
+        if hasattr(games, "peek"):
+            # don't refresh the registry's LRU just by looking
+            return [g for g in (games.peek(gid) for gid in games.resident) if g is not None]
+        return list(games.values())
+
+    def _idle(self, games):
+        from src.service.char_jobs import get_char_gen_pool
+
+        if not self.service.model_idle() or get_char_gen_pool().pending():
+            return False
+        return not any(getattr(g, "busy", False) for g in games)
+
+    def _shortfalls(self, games) -> List[Tuple[int, object, str]]:
+        # (missing, world, archetype), emptiest first
+        out = []
+        seen = set()
+        for game in games:
+            world = getattr(game, "world", None)
+            if world is None or world.world_id in seen:
+                continue
+            seen.add(world.world_id)
+            archetypes = [pc.archetype for pc in game.player_characters.values() if pc.archetype]
+            for key in dict.fromkeys(pool_key(k) for k in (*ITEM_KEYS, *archetypes)):
+                missing = config.content_pool_target_items - self.pool.level(world.world_id, "items", key)
+                if missing > 0:
+                    out.append((missing, world, key))
+        out.sort(key=lambda s: -s[0])
+        return out
+
+    def _generate(self, world, key: str, missing: int):
+        count = min(missing, config.content_pool_batch_items)
+        items = generate_items_batch(
+            world.world_summary, [(key, key.replace("_", " "), count)], retry_missing=False,
+        )[key]
+        return [item.to_dict() for item in items]
+
+    def fill_once(self):
+        """One top-up step; returns (world_id, archetype, added) or None when nothing ran."""
+        if not config.content_pool_enabled:
+            return None
+        games = self._games()
+        if not self._idle(games):
+            metrics.increment("pool.fill_skipped_busy")
+            return None
+        todo = self._shortfalls(games)
+        if not todo:
+            return None
+        missing, world, key = todo[0]
+        ran, entries = self.service.run_when_idle(self._generate, world, key, missing)
+        if not ran:
+            metrics.increment("pool.fill_skipped_busy")
+            return None
+        self.pool.add(world.world_id, "items", key, entries)
+        metrics.increment("pool.items_filled", len(entries))
+        return world.world_id, key, len(entries)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.fill_once()
+            except Exception:  # a bad generation must not kill the thread
+                metrics.increment("pool.fill_errors")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="pool-filler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+_FILLER: Optional[PoolFiller] = None
+_FILLER_LOCK = threading.Lock()
+
+
+def start_pool_filler():
+    # idempotent; every Streamlit rerun and the API server call this
+    global _FILLER
+    with _FILLER_LOCK:
+        if _FILLER is None and config.content_pool_enabled:
+            _FILLER = PoolFiller().start()
+        return _FILLER
@@ -0,0 +1,236 @@
+"""
+Headless game API: the same gameplay as the Streamlit app, over HTTP and WebSocket.
+
+    python -m src.service.server [--host 127.0.0.1] [--port 8765]
+
+    GET  /games/{game_id}              state snapshot (?recent=N chat messages)
+    POST /games/{game_id}/world        {"prompt": "...", "players": ["Alice", ...]}
+    POST /games/{game_id}/characters   {"player_name", "concept", "char_name"?, "gender"?, "ancestry"?}
+    GET  /games/{game_id}/characters/jobs   queued/running/finished character jobs with ETAs
+    POST /games/{game_id}/characters/jobs   same body as /characters; queued for the worker pool
+    POST /games/{game_id}/initiative   build the initiative order
+    POST /games/{game_id}/turn/next    hand the turn to the next PC
+    POST /games/{game_id}/actions      {"speaker": "Alice", "text": "/action I pick the lock"}
+    WS   /games/{game_id}/ws
+
+On the WebSocket, send {"type": "action", "speaker", "text"}, {"type": "world", "prompt",
+"players"?}, {"type": "next_turn"} or {"type": "snapshot"}. The server answers with
+{"type": "token", "text"} events while the DM writes, then {"type": "result", ...}; world
+creation sends {"type": "progress", "stage", "message"} per stage, then {"type": "world"}.
+It also pushes {"type": "changed", "version"} whenever anyone changes the table.
+
+Blocking game calls run on worker threads. GameService keeps one request per table at
+a time and limits model calls to config.service_model_slots, so many tables share one
+model instead of each browser session holding it through a rerun.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from src import config
+from src.game.change_feed import get_change_feed
+from src.service.char_jobs import get_char_gen_pool
+from src.service.game_service import GameService, get_global_service
+from src.service.pool_filler import start_pool_filler
+
+
+def _turn_payload(actor, options):
+    if actor is None:
+        return {"actor": None, "options": []}
+    return {"actor": {"pc_id": actor.pc_id, "name": actor.name, "player_name": actor.player_name}, "options": options}
+
+
+def create_app(service: GameService | None = None):
+    service = service or get_global_service()
+
+    async def _body(request: Request):
+        try:
+            return await request.json()
+        except ValueError:
+            return {}
+
+    def _error(message: str, status: int = 400):
+        return JSONResponse({"error": message}, status_code=status)
+
+    async def snapshot(request: Request):
+        game_id = request.path_params["game_id"]
+        if game_id not in service.games:
+            return _error(f"No game '{game_id}'", 404)
+        recent = int(request.query_params.get("recent", 20))
+        return JSONResponse(await run_in_threadpool(service.snapshot, game_id, recent))
+
+    async def world(request: Request):
+        game_id = request.path_params["game_id"]
+        data = await _body(request)
+        if not data.get("prompt"):
+            return _error("prompt is required")
+        created = await run_in_threadpool(service.create_world, game_id, data["prompt"], data.get("players"))
+        return JSONResponse({"world_id": created.world_id, "title": created.title})
+
+    async def characters(request: Request):
+        game_id = request.path_params["game_id"]
+        data = await _body(request)
+        if not data.get("player_name") or not data.get("concept"):
+            return _error("player_name and concept are required")
+        extra = {k: data[k] for k in ("char_name", "gender", "ancestry", "pc_id") if data.get(k)}
+        try:
+            pc = await run_in_threadpool(
+                service.create_character, game_id, data["player_name"], data["concept"], **extra
+            )
+        except ValueError as exc:
+            return _error(str(exc), 409)
+        return JSONResponse(pc.to_dict())
+
+    async def character_jobs(request: Request):
+        game_id = request.path_params["game_id"]
+        pool = get_char_gen_pool()
+        if request.method == "POST":
+            data = await _body(request)
+            if not data.get("player_name") or not data.get("concept"):
+                return _error("player_name and concept are required")
+            game = service.game(game_id)
+            if game.world is None:
+                return _error("Create a world before generating characters", 409)
+            player_name = data["player_name"]
+            pc_id = data.get("pc_id") or f"{game.world.world_id}_{player_name.lower().replace(' ', '_')}"
+            extra = {k: data[k] for k in ("char_name", "gender", "ancestry") if data.get(k)}
+            job = pool.submit(game_id, pc_id, player_name, data["concept"], **extra)
+            return JSONResponse(job.to_dict(), status_code=202)
+        return JSONResponse({"jobs": [job.to_dict() for job in pool.jobs(game_id)]})
+
+    async def initiative(request: Request):
+        actor, options = await run_in_threadpool(service.build_initiative, request.path_params["game_id"])
+        return JSONResponse(_turn_payload(actor, options))
+
+    async def next_turn(request: Request):
+        actor, options = await run_in_threadpool(service.next_turn, request.path_params["game_id"])
+        return JSONResponse(_turn_payload(actor, options))
+
+    async def actions(request: Request):
+        game_id = request.path_params["game_id"]
+        data = await _body(request)
+        if not data.get("text"):
+            return _error("text is required")
+        result = await run_in_threadpool(service.act, game_id, data.get("speaker") or "Player", data["text"])
+        return JSONResponse(result.to_dict())
+
+    async def game_socket(ws: WebSocket):
+        game_id = ws.path_params["game_id"]
+        await ws.accept()
+        loop = asyncio.get_running_loop()
+        send_lock = asyncio.Lock()
+        changes: asyncio.Queue = asyncio.Queue()
+
+        async def send(payload):
+            async with send_lock:
+                await ws.send_json(payload)
+
+        def on_change(version):
+            # called from whichever thread bumped the feed
+            loop.call_soon_threadsafe(changes.put_nowait, version)
+
+        async def push_changes():
+            while True:
+                version = await changes.get()
+                while not changes.empty():
+                    version = changes.get_nowait()
+                await send({"type": "changed", "version": version})
+
+        async def run_streaming(fn, *args, event: str, field: str):
+            # run fn on a worker thread, forwarding what it reports through its callback
+            events: asyncio.Queue = asyncio.Queue()
+
+            def report(*values):
+                loop.call_soon_threadsafe(events.put_nowait, values)
+
+            job = asyncio.ensure_future(run_in_threadpool(fn, game_id, *args, **{field: report}))
+            while not job.done() or not events.empty():
+                get = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({get, job}, return_when=asyncio.FIRST_COMPLETED)
+                if get in done:
+                    await send(event(*get.result()))
+                else:
+                    get.cancel()
+            return job.result()
+
+        async def run_action(data):
+            result = await run_streaming(
+                service.act, data.get("speaker") or "Player", data.get("text", ""),
+                event=lambda text: {"type": "token", "text": text}, field="on_token",
+            )
+            await send({"type": "result", **result.to_dict()})
+
+        async def run_world(data):
+            if not data.get("prompt"):
+                raise ValueError("prompt is required")
+            world = await run_streaming(
+                service.create_world, data["prompt"], data.get("players"),
+                event=lambda stage, message: {"type": "progress", "stage": stage, "message": message},
+                field="on_progress",
+            )
+            await send({"type": "world", "world_id": world.world_id, "title": world.title})
+
+        feed = get_change_feed(game_id)
+        feed.add_listener(on_change)
+        pusher = asyncio.ensure_future(push_changes())
+        try:
+            while True:
+                data = await ws.receive_json()
+                kind = data.get("type")
+                try:
+                    if kind == "action":
+                        await run_action(data)
+                    elif kind == "world":
+                        await run_world(data)
+                    elif kind == "next_turn":
+                        actor, options = await run_in_threadpool(service.next_turn, game_id)
+                        await send({"type": "turn", **_turn_payload(actor, options)})
+                    elif kind == "snapshot":
+                        state = await run_in_threadpool(service.snapshot, game_id, int(data.get("recent", 20)))
+                        await send({"type": "snapshot", **state})
+                    else:
+                        await send({"type": "error", "error": f"Unknown message type '{kind}'"})
+                except (ValueError, KeyError) as exc:
+                    await send({"type": "error", "error": str(exc)})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            feed.remove_listener(on_change)
+            pusher.cancel()
+
+    routes = [
+        Route("/games/{game_id}", snapshot, methods=["GET"]),
+        Route("/games/{game_id}/world", world, methods=["POST"]),
+        Route("/games/{game_id}/characters", characters, methods=["POST"]),
+        Route("/games/{game_id}/characters/jobs", character_jobs, methods=["GET", "POST"]),
+        Route("/games/{game_id}/initiative", initiative, methods=["POST"]),
+        Route("/games/{game_id}/turn/next", next_turn, methods=["POST"]),
+        Route("/games/{game_id}/actions", actions, methods=["POST"]),
+        WebSocketRoute("/games/{game_id}/ws", game_socket),
+    ]
+    app = Starlette(routes=routes)
+    app.state.service = service
+    return app
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Headless game API")
+    parser.add_argument("--host", default=config.service_host)
+    parser.add_argument("--port", type=int, default=config.service_port)
+    args = parser.parse_args(argv)
+    start_pool_filler()
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -71,7 +71,7 @@ def test_save_and_load_split(tmp_path: Path):
     )
 
     save_dir = save_game(game, game_id="game-1", root=tmp_path)
-    assert (save_dir / "world.json").exists()
+    assert (save_dir / "world.dms").exists()
     loaded = load_game("game-1", root=tmp_path)
 
     world, players, npcs, quests, initiative_order, active_turn_index = loaded
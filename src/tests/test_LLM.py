@@ -1,7 +1,11 @@
+import time
+
 import pytest
 
+from src.agent.item_gen import generate_items_batch
 from src.agent.world_build import generate_world_state, _parse_world_output
-from src.llm_client import format_prompt, _trim_messages
+from src.llm_client import format_prompt, _trim_messages, withmetrics
+from src.metrics.metrics import metrics
 from src.agent.types import Message
 
 
@@ -72,3 +76,67 @@ def test_format_prompt_and_trim():
     trimmed = _trim_messages(messages, max_chars=120)
     assert trimmed[0].role == "system"
     assert trimmed[-1].content == "Hello" or trimmed[-1].content == "Hi there."
+
+
+def test_generate_items_batch_splits_by_owner(monkeypatch):
+    fake_output = """ITEM 1:
+Owner: O2
+Name: Silver Ring
+Category: trinket
+ITEM 2:
+Owner: O1
+Name: Rope
+Category: gear
+ITEM 3:
+Name: Torch
+Category: gear
+ITEM 4:
+Owner: O2
+Name: Spare Ring
+Category: trinket
+"""
+    fake_llm = FakeLLM(fake_output)
+    monkeypatch.setattr("src.agent.item_gen.get_llm", lambda: fake_llm)
+
+    items = generate_items_batch("sky islands", [("npc_1", "merchant_stock", 2), ("quest_1", "quest_reward", 1)])
+
+    assert "O1: merchant_stock, 2 items" in fake_llm.last_prompt
+    assert "O2: quest_reward, 1 item" in fake_llm.last_prompt
+    assert [it.item_name for it in items["quest_1"]] == ["Silver Ring"]
+    # the untagged block and the overflow go to whoever is still short
+    assert [it.item_name for it in items["npc_1"]] == ["Rope", "Torch"]
+
+
+def test_generate_items_batch_chunks_and_retries_shorted_owners(monkeypatch):
+    replies = [
+        "ITEM 1:\nOwner: O1\nName: Rope\nITEM 2:\nOwner: O1\nName: Lamp\n",
+        "ITEM 1:\nOwner: O1\nName: Idol\n",          # second chunk: quest_1, one short
+        "ITEM 1:\nOwner: O1\nName: Crown\n",         # follow-up for quest_1 only
+    ]
+    prompts = []
+
+    def fake_llm(prompt, **kwargs):
+        prompts.append(prompt)
+        return {"choices": [{"text": replies[len(prompts) - 1]}]}
+
+    monkeypatch.setattr("src.agent.item_gen.get_llm", lambda: fake_llm)
+
+    items = generate_items_batch("sky islands", [("npc_1", "merchant_stock", 2), ("quest_1", "quest_reward", 2)], max_items=2)
+
+    assert len(prompts) == 3
+    assert "O1: quest_reward, 1 item" in prompts[2]
+    assert [it.item_name for it in items["npc_1"]] == ["Rope", "Lamp"]
+    assert [it.item_name for it in items["quest_1"]] == ["Idol", "Crown"]
+
+
+def test_streamed_calls_are_timed_while_consumed():
+    def slow_stream(prompt, stream=False, **kwargs):
+        for text in ("a", "b"):
+            time.sleep(0.05)
+            yield {"choices": [{"text": text}]}
+
+    llm = withmetrics(slow_stream, default_name="test_stream")
+    chunks = llm("hi", stream=True)
+    assert "test_stream" not in metrics.generations      # nothing has run yet
+    assert [c["choices"][0]["text"] for c in chunks] == ["a", "b"]
+    assert metrics.generations["test_stream"].last_time_seconds >= 0.1
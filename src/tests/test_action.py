@@ -24,3 +24,50 @@ def test_evaluate_check_returns_dc_and_outcome():
     dc, outcome = evaluate_check(total=15, action_type="stealth_check", reason="stealth_check: sneak")
     assert dc is not None
     assert outcome in {"success", "fail", "mixed", None}
+
+
+def test_modifier_table_tracks_stat_and_skill_changes():
+    from src.game.action_modifiers import modifier_table
+
+    pc = _pc()
+    table = modifier_table(pc)
+    assert modifier_table(pc) is table
+    assert compute_action_modifier(pc, "stealth_check", "") == 2  # DEX 14, no skill
+
+    pc.skills.append("Sneaking")
+    assert compute_action_modifier(pc, "stealth_check", "") == 4
+    assert modifier_table(pc).has_proficiency("stealth_check")
+
+    pc.stats["DEX"] = 18
+    assert compute_action_modifier(pc, "stealth_check", "") == 6
+    assert modifier_table(pc) is not table
+
+
+def test_pc_edits_bump_the_version_stamp():
+    pc = _pc()
+    seen = [pc.version]
+    pc.stats["DEX"] = 16
+    seen.append(pc.version)
+    pc.skills += ["Stealth"]
+    seen.append(pc.version)
+    pc.skills = ["Athletics"]
+    seen.append(pc.version)
+    assert seen == sorted(set(seen))
+    data = pc.to_dict()
+    assert "version" not in data and type(data["stats"]) is dict
+    assert PlayerCharacter.from_dict(data).version != pc.version
+
+
+def test_difficulty_tiers_share_one_parser():
+    pc = _pc()
+    cases = {
+        "climb the very hard wall": (-4, 20),
+        "a hard climb": (-2, 17),
+        "simple, but extremely risky": (-4, 20),
+        "an easy jump": (2, 10),
+        "just walk": (0, 13),
+    }
+    base = compute_action_modifier(pc, "athletics", "")
+    for reason, (adj, dc) in cases.items():
+        assert compute_action_modifier(pc, "athletics", reason) == base + adj
+        assert evaluate_check(total=0, action_type="athletics", reason=reason)[0] == dc
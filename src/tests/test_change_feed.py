@@ -0,0 +1,53 @@
+import threading
+
+from src import config
+from src.agent.types import Message
+from src.game.change_feed import ChangeFeed, get_change_feed, notify_change
+from src.game.game_state import GameState
+from src.game.message_store import sync_messages
+
+
+def test_wait_returns_on_bump_or_timeout():
+    feed = ChangeFeed()
+    assert feed.wait(0, timeout=0.01) == 0
+
+    timer = threading.Timer(0.05, feed.bump)
+    timer.start()
+    assert feed.wait(0, timeout=5) == 1
+    timer.join()
+    assert feed.changed_since(0) and not feed.changed_since(1)
+
+
+def test_feeds_are_per_game():
+    before = get_change_feed("feed-a").version
+    notify_change("feed-a")
+    assert get_change_feed("feed-a").version == before + 1
+    assert get_change_feed("feed-a") is get_change_feed("feed-a")
+    assert not get_change_feed("feed-b").changed_since(0)
+
+
+def test_failing_listener_is_dropped():
+    feed = ChangeFeed()
+    seen = []
+
+    def closed_loop(version):
+        raise RuntimeError("Event loop is closed")
+
+    feed.add_listener(closed_loop)
+    feed.add_listener(seen.append)
+    assert feed.bump() == 1
+    assert feed.bump() == 2
+    assert seen == [1, 2] and feed._listeners == [seen.append]
+
+
+def test_sync_messages_bumps_only_for_new_messages(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "persist_async", False)
+    feed = get_change_feed("feed-sync")
+    game = GameState(messages=[Message(role="user", content="hi", speaker="Alice")])
+    sync_messages(game, "feed-sync", root=tmp_path)
+    seen = feed.version
+    sync_messages(game, "feed-sync", root=tmp_path)
+    assert not feed.changed_since(seen)
+    game.messages.append(Message(role="assistant", content="hello"))
+    sync_messages(game, "feed-sync", root=tmp_path)
+    assert feed.changed_since(seen)
@@ -0,0 +1,67 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from src.service.char_jobs import CharGenPool
+
+
+class _Service:
+    # stands in for GameService: records calls, and can hold a job until released
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def create_character(self, game_id, player_name, concept, char_name=None, gender="", ancestry="", pc_id=None):
+        self.gate.wait(5)
+        if concept == "boom":
+            raise RuntimeError("model fell over")
+        self.calls.append((game_id, pc_id, concept))
+        return SimpleNamespace(pc_id=pc_id, name=char_name or player_name, player_name=player_name)
+
+
+def _wait_idle(pool, game_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if all(j.status not in ("queued", "running") for j in pool.jobs(game_id)):
+            return
+        time.sleep(0.01)
+    raise AssertionError("jobs did not finish")
+
+
+def _wait_running(pool, game_id):
+    for _ in range(500):
+        if any(j.status == "running" for j in pool.jobs(game_id)):
+            return
+        time.sleep(0.01)
+
+
+def test_jobs_run_in_background_and_reroll_replaces_queued():
+    service = _Service()
+    pool = CharGenPool(service=service, workers=1)
+    service.gate.clear()
+    first = pool.submit("g1", "pc_a", "Alice", "a knight")
+    _wait_running(pool, "g1")
+
+    queued = pool.submit("g1", "pc_b", "Bob", "a thief")
+    reroll = pool.submit("g1", "pc_b", "Bob", "a better thief")
+    assert queued.status == "superseded"
+    statuses = {j.job_id: j for j in pool.jobs("g1")}
+    assert statuses[first.job_id].status == "running"
+    assert statuses[reroll.job_id].status == "queued"
+    assert statuses[reroll.job_id].eta_s > statuses[first.job_id].eta_s
+
+    service.gate.set()
+    _wait_idle(pool, "g1")
+    assert service.calls == [("g1", "pc_a", "a knight"), ("g1", "pc_b", "a better thief")]
+    assert reroll.status == "done" and reroll.pc_name == "Bob"
+
+
+def test_failed_job_is_reported_and_worker_keeps_going():
+    service = _Service()
+    pool = CharGenPool(service=service, workers=1)
+    bad = pool.submit("g2", "pc_a", "Alice", "boom")
+    good = pool.submit("g2", "pc_b", "Bob", "a bard")
+    _wait_idle(pool, "g2")
+    assert bad.status == "failed" and "model fell over" in bad.error
+    assert good.status == "done"
@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+
+from src import config
+from src.game import codec
+from src.game.action_modifiers import compute_action_modifier
+from src.game.codec import CodecError, decode_section, decode_section_dicts, encode_section, from_epoch, to_epoch
+from src.game.game_state import GameState
+from src.game.models import NPC, Item
+from src.game.save_load import load_game, read_section, save_game
+from src.tests.test_IO import _sample_npc, _sample_pc, _sample_quest, _sample_world
+
+
+def test_round_trip_every_kind():
+    world = _sample_world()
+    assert decode_section(encode_section("world", world)) == world
+    for kind, obj in (("players", _sample_pc()), ("npcs", _sample_npc()), ("quests", _sample_quest())):
+        data = {"a": obj}
+        assert decode_section(encode_section(kind, data)) == data
+    item = Item(item_id="i1", item_name="Rope", item_properties=["50ft"])
+    assert decode_section(encode_section("items", {"i1": item})) == {"i1": item}
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_decoded_pcs_track_in_place_edits(lazy):
+    pc = decode_section(encode_section("players", {"a": _sample_pc()}), lazy=lazy)["a"]
+    assert pc.version is not None
+    before = compute_action_modifier(pc, "stealth_check", "")
+    pc.skills.append("Stealth")
+    assert compute_action_modifier(pc, "stealth_check", "") == before + 2
+    pc.stats["DEX"] = 18
+    assert compute_action_modifier(pc, "stealth_check", "") == before + 4
+
+
+def test_datetimes_are_exact_epoch_ints():
+    dt = datetime(2024, 2, 29, 13, 45, 7, 123456)
+    assert isinstance(to_epoch(dt), int)
+    assert from_epoch(to_epoch(dt)) == dt
+    npc = _sample_npc()
+    npc.last_updated = dt
+    assert decode_section_dicts(encode_section("npcs", {"n": npc}))["n"]["last_updated"] == to_epoch(dt)
+
+
+def test_files_from_other_field_lists_still_decode(monkeypatch):
+    npc = _sample_npc()
+    # written before "inventory" existed, and with a field this build does not know
+    old_fields = tuple(n for n in codec.field_names(NPC) if n != "inventory") + ("mood",)
+    monkeypatch.setattr(codec, "field_names", lambda cls: old_fields)
+    monkeypatch.setattr(codec, "_dumper", lambda cls: lambda o: [
+        codec.to_epoch(getattr(o, n)) if isinstance(getattr(o, n, None), datetime) else getattr(o, n, "grumpy")
+        for n in old_fields
+    ])
+    payload = encode_section("npcs", {"n": npc})
+    monkeypatch.undo()
+
+    loaded = decode_section(payload)["n"]
+    assert loaded.name == npc.name and loaded.inventory == []
+    assert not hasattr(loaded, "mood")
+
+
+def test_rejects_newer_versions_and_garbage():
+    payload = bytearray(encode_section("world", _sample_world()))
+    payload[3] = codec.CODEC_VERSION + 1
+    with pytest.raises(CodecError):
+        decode_section(bytes(payload))
+    with pytest.raises(CodecError):
+        decode_section(b'{"world_id": "x"}')
+
+
+@pytest.mark.skipif(codec.msgpack is None, reason="msgpack not installed")
+def test_msgpack_body():
+    data = {"n": _sample_npc()}
+    assert decode_section(encode_section("npcs", data, body="msgpack")) == data
+
+
+def _game():
+    return GameState(
+        world=_sample_world(),
+        player_characters={"pc1": _sample_pc()},
+        npcs={"npc1": _sample_npc()},
+        quests={"q1": _sample_quest()},
+    )
+
+
+def test_old_json_saves_still_load_and_are_replaced(tmp_path, monkeypatch):
+    game = _game()
+    monkeypatch.setattr(config, "save_format", "json")
+    base = save_game(game, "g1", root=tmp_path)
+    assert (base / "npcs.json").exists()
+    assert read_section(base, "npcs")["npc1"]["name"] == "Gorn"
+
+    monkeypatch.setattr(config, "save_format", "compact")
+    world, pcs, npcs, quests, _order, _idx = load_game("g1", root=tmp_path)
+    assert world == game.world and npcs == game.npcs and quests == game.quests
+
+    save_game(GameState(world=world, player_characters=pcs, npcs=npcs, quests=quests), "g1", root=tmp_path)
+    assert (base / "npcs.dms").exists() and not (base / "npcs.json").exists()
+    assert load_game("g1", root=tmp_path)[1] == pcs
+    assert read_section(base, "world")["title"] == "Test World"
@@ -0,0 +1,81 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import config
+from src.agent import item_gen
+from src.game import content_pool
+from src.game.content_pool import ContentPool
+from src.llm_client import use_llm
+from src.service.game_service import GameService
+from src.service.loadtest import FakeLLM
+from src.service.pool_filler import PoolFiller
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "persist_async", False)
+    pool = ContentPool(root=tmp_path)
+    monkeypatch.setattr(content_pool, "_POOL", pool)
+    return pool
+
+
+@pytest.fixture
+def llm():
+    llm = FakeLLM(prefill_tps=1e6, decode_tps=1e6, jitter=0.0, realtime=False)
+    use_llm(llm)
+    yield llm
+    use_llm(None)
+
+
+def _item(name):
+    return {"item_id": name, "item_name": name, "item_category": "gear"}
+
+
+def test_pool_caps_expires_and_survives_reload(pool, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "content_pool_max_items", 3)
+    pool.add("w1", "items", "Merchant Stock", [_item(f"i{n}") for n in range(5)])
+    assert pool.level("w1", "items", "merchant_stock") == 3
+
+    reloaded = ContentPool(root=tmp_path)
+    taken = reloaded.take("w1", "items", "merchant_stock", 2)
+    assert [d["item_name"] for d in taken] == ["i2", "i3"]
+
+    monkeypatch.setattr(config, "content_pool_ttl_s", 60)
+    later = time.time() + 120
+    monkeypatch.setattr(content_pool.time, "time", lambda: later)
+    assert reloaded.take("w1", "items", "merchant_stock", 5) == []
+    assert reloaded.levels("w1")["items"]["merchant_stock"] == 0
+
+
+def test_character_items_come_from_the_pool_first(pool, llm):
+    pool.add("w1", "items", "rogue", [_item("Lockpicks"), _item("Dagger")])
+    items = item_gen.generate_items_for_character("A misty realm", "rogue", count=2, world_id="w1")
+    assert [i.item_name for i in items] == ["Lockpicks", "Dagger"]
+    assert llm.calls == 0
+
+    # a short pool is topped up with one smaller generation
+    pool.add("w1", "items", "rogue", [_item("Cloak")])
+    items = item_gen.generate_items_for_character("A misty realm", "rogue", count=3, world_id="w1")
+    assert len(items) == 3 and items[0].item_name == "Cloak"
+    assert llm.calls == 1
+
+
+def test_filler_tops_up_the_emptiest_pool_only_when_idle(pool, llm, monkeypatch):
+    monkeypatch.setattr(config, "content_pool_target_items", 4)
+    world = SimpleNamespace(world_id="w1", world_summary="A misty realm")
+    rogue = SimpleNamespace(archetype="Rogue")
+    game = SimpleNamespace(world=world, player_characters={"pc1": rogue}, busy=False)
+    service = GameService(games={"g1": game}, model_slots=1)
+    filler = PoolFiller(service=service, pool=pool, interval=0)
+
+    pool.add("w1", "items", "rogue", [_item("Dagger")])
+    game.busy = True
+    assert filler.fill_once() is None and llm.calls == 0
+
+    game.busy = False
+    assert filler.fill_once() == ("w1", "merchant_stock", 4)
+    assert filler.fill_once() == ("w1", "rogue", 3)
+    assert filler.fill_once() is None            # every pool is at its target
+    assert llm.calls == 2
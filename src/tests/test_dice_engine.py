@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.game.dice import roll_dice
+from src.game.dice_engine import compile_expr, roll_batch, DiceTerm, ConstTerm
+
+
+def _seq_randint(values):
+    seq = iter(values)
+
+    def _randint(_a, _b):
+        return next(seq)
+
+    return _randint
+
+
+def test_compile_multi_term():
+    expr = compile_expr("2d6 + 1d4 - 2")
+    assert expr.terms == (
+        DiceTerm(sign=1, count=2, sides=6),
+        DiceTerm(sign=1, count=1, sides=4),
+        ConstTerm(sign=-1, value=2),
+    )
+    assert expr.modifier == -2
+
+
+def test_compile_is_cached():
+    assert compile_expr("4d6kh3") is compile_expr("4d6kh3")
+
+
+def test_keep_highest(monkeypatch):
+    monkeypatch.setattr(random, "randint", _seq_randint([2, 6, 1, 5]))
+    result = roll_dice("4d6kh3")
+    assert sorted(result.rolls) == [2, 5, 6]
+    assert result.dropped == [1]
+    assert result.total == 13
+
+
+def test_advantage_and_disadvantage(monkeypatch):
+    monkeypatch.setattr(random, "randint", _seq_randint([7, 15]))
+    assert roll_dice("d20adv+2").total == 17
+    monkeypatch.setattr(random, "randint", _seq_randint([7, 15]))
+    assert roll_dice("1d20 dis").total == 7
+
+
+def test_exploding(monkeypatch):
+    monkeypatch.setattr(random, "randint", _seq_randint([6, 6, 2, 3]))
+    result = roll_dice("2d6!")
+    assert result.rolls == [14, 3]
+    assert result.total == 17
+
+
+def test_injected_rng_is_deterministic():
+    a = roll_dice("3d8+1", rng=random.Random(42))
+    b = roll_dice("3d8+1", rng=random.Random(42))
+    assert a == b
+
+
+@pytest.mark.parametrize("expr", ["5", "2d0", "3d6kh4", "2d20adv", "1d1!", "d6 d6", "1d6+"])
+def test_rejects_bad_expressions(expr):
+    with pytest.raises(ValueError):
+        compile_expr(expr)
+
+
+def test_roll_batch_bounds_and_mean():
+    rng = np.random.default_rng(0)
+    totals = roll_batch("2d6+3", 200_000, rng=rng)
+    assert totals.shape == (200_000,)
+    assert totals.min() >= 5 and totals.max() <= 15
+    assert abs(totals.mean() - 10.0) < 0.05
+
+
+def test_roll_batch_keep_and_explode():
+    rng = np.random.default_rng(1)
+    adv = roll_batch("d20adv", 100_000, rng=rng)
+    assert abs(adv.mean() - 13.825) < 0.1
+    boom = roll_batch("1d6!", 100_000, rng=rng)
+    assert boom.min() >= 1 and boom.max() > 6
+    assert abs(boom.mean() - 4.2) < 0.05
@@ -19,3 +19,35 @@ def test_build_context_with_hits(monkeypatch):
     prefix = dm_dice._build_context_prefix("demo", [])
     assert "[CONTEXT 1 | pc:Alice]" in prefix
     assert dm_dice.CONTEXT_GUARD.strip() in prefix
+
+def test_clear_action_rolls_locally_with_one_model_call(monkeypatch):
+    from src.agent.types import Message
+
+    calls = []
+    monkeypatch.setattr(dm_dice, "_ensure_index", lambda game_id: None)
+    monkeypatch.setattr(dm_dice, "_build_context_prefix", lambda game_id, messages: "")
+    monkeypatch.setattr(dm_dice, "_validated_reply", lambda game_id, text, messages, index: (text, []))
+    monkeypatch.setattr(dm_dice, "chat_completion", lambda messages, **kw: calls.append(1) or "You slip by.")
+
+    messages = [Message(role="user", content="/action I sneak past the guard", speaker="Alice")]
+    out = dm_dice.dm_turn_with_dice("fast", messages, {})
+    assert len(calls) == 1
+    assert out[-2].content.startswith("[ROLL_RESULT:")
+    assert "action_type=stealth_check" in out[-2].content
+    assert out[-1].content == "You slip by."
+
+
+def test_local_roll_ignores_difficulty_words_from_the_player(monkeypatch):
+    from src.agent.types import Message
+
+    monkeypatch.setattr(dm_dice, "_ensure_index", lambda game_id: None)
+    monkeypatch.setattr(dm_dice, "_build_context_prefix", lambda game_id, messages: "")
+    monkeypatch.setattr(dm_dice, "_validated_reply", lambda game_id, text, messages, index: (text, []))
+    monkeypatch.setattr(dm_dice, "chat_completion", lambda messages, **kw: "Noted.")
+
+    def roll(text):
+        out = dm_dice.dm_turn_with_dice("fast", [Message(role="user", content=text, speaker="Alice")], {})
+        return out[-2].content
+
+    assert "dc=13" in roll("/action I sneak past the guard")
+    assert "dc=13" in roll("/action an easy sneak past the guard")
@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from src.game.entity_index import EntityIndex, Entity, normalize_name
+from src.game.models import World_State, NPC, Quest
+
+
+def _world():
+    return World_State(
+        world_id="w1",
+        title="Test",
+        setting_prompt="",
+        world_summary="",
+        lore="",
+        players=[],
+        created_on=datetime.utcnow(),
+        major_locations=[{"name": "Iron Gate", "description": ""}],
+        minor_locations=[{"name": "Iron Gate Market", "description": ""}, {"name": "Mossy Well", "description": ""}],
+    )
+
+
+def _npcs():
+    return {
+        "n1": NPC(npc_id="n1", world_id="w1", name="Gorn", role="merchant", location="Mossy Well", description=""),
+        "n2": NPC(npc_id="n2", world_id="w1", name="Old Mara", role="elder", location="Iron Gate", description=""),
+    }
+
+
+def test_normalize_name():
+    assert normalize_name("  Gorn's   Forge! ") == "gorn s forge"
+
+
+def test_find_mentions_single_pass():
+    index = EntityIndex().sync_world(_world()).sync_npcs(_npcs())
+    mentions = index.find_mentions("I ask old mara about the Iron Gate Market, then visit Gorn.")
+    names = {m.entity.name for m in mentions}
+    assert names == {"Old Mara", "Iron Gate", "Iron Gate Market", "Gorn"}
+
+
+def test_mentions_respect_word_boundaries():
+    index = EntityIndex().sync_npcs(_npcs())
+    assert index.find_mentions("the gorneth tribe") == []
+
+
+def test_resolve_matches_old_containment_rules():
+    index = EntityIndex().sync_world(_world())
+    assert index.resolve("iron gate").name == "Iron Gate"
+    assert index.resolve("near the Mossy Well ruins").name == "Mossy Well"
+    assert index.resolve("mossy").name == "Mossy Well"
+    assert index.resolve("nowhere at all") is None
+
+
+def test_incremental_sync_removes_and_renames():
+    index = EntityIndex()
+    npcs = _npcs()
+    index.sync_npcs(npcs)
+    assert index.lookup("gorn")
+
+    npcs["n1"].name = "Gorn the Bold"
+    del npcs["n2"]
+    index.sync_npcs(npcs)
+
+    assert not index.lookup("gorn")
+    assert not index.lookup("old mara")
+    assert [m.entity.key for m in index.find_mentions("Gorn the Bold waves")] == ["n1"]
+
+
+def test_quest_fragment_resolve():
+    quests = {"q1": Quest(quest_id="q1", world_id="w1", title="The Stolen Cargo", summary="")}
+    index = EntityIndex().sync_quests(quests)
+    assert index.resolve("stolen cargo", kinds=("quest",)).key == "q1"
+    assert index.resolve("cargo", kinds=("quest",)).key == "q1"
+
+
+def test_aliases_share_entity():
+    index = EntityIndex()
+    index.add(Entity("npc", "n9", "Captain Vex", aliases=("Vex",)))
+    mentions = index.find_mentions("vex draws steel")
+    assert [m.entity.key for m in mentions] == ["n9"]
@@ -0,0 +1,150 @@
+from src import config
+from src.agent.types import Message
+from src.game import entity_index
+from src.game.game_registry import GameRegistry, estimate_bytes
+from src.game.game_state import GameState
+from src.metrics.metrics import metrics
+from src.tests.test_IO import _sample_npc, _sample_pc, _sample_world
+
+
+def _game():
+    game = GameState(
+        world=_sample_world(),
+        player_characters={"pc1": _sample_pc()},
+        npcs={"npc1": _sample_npc()},
+    )
+    game.messages = [Message(role="system", content="DM prompt")]
+    game.messages += [Message(role="user", content=f"turn {i}", speaker="Alice") for i in range(5)]
+    game.active_encounter = "Ambush"
+    return game
+
+
+def test_idle_game_spills_and_rehydrates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    registry = GameRegistry()
+    original = _game()
+    registry["g1"] = original
+    registry["g2"] = GameState()
+    entity_index.get_entity_index("g1").sync_game(original)
+    entity_index.get_entity_index(original.world.world_id).sync_world(original.world)
+
+    assert registry.maintain(force=True, now=1e12) == ["g1"]
+    assert not registry.is_resident("g1") and "g1" in registry and len(registry) == 2
+    assert (tmp_path / "saves" / "games" / "g1" / "meta.json").exists()
+
+    assert "g1" not in entity_index._INDEXES and original.world.world_id not in entity_index._INDEXES
+
+    game = registry["g1"]
+    assert registry.is_resident("g1") and game is not original
+    assert game.world.world_id == original.world.world_id
+    assert game.npcs == original.npcs and game.active_encounter == "Ambush"
+    assert [m.content for m in game.messages[1:]] == [f"turn {i}" for i in range(5)]
+    assert metrics.snapshot()["Counters"]["games.rehydrations"] >= 1
+
+
+def test_lru_budget_and_worldless_games_drop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    monkeypatch.setattr(config, "games_max_resident", 2)
+    registry = GameRegistry()
+    registry["a"] = _game()
+    registry["b"] = GameState()
+    registry["a"]                   # touch: b is now least recently used
+    registry["c"] = _game()
+
+    assert registry.resident == ["a", "c"]
+    assert "b" not in registry      # nothing to save, so nothing to come back
+    gauges = metrics.snapshot()["Gauges"]
+    assert gauges["games.resident"] == 2 and gauges["games.resident_bytes"] > 0
+
+
+def test_busy_games_stay_resident(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = GameRegistry()
+    game = _game()
+    game.busy = True
+    registry["g1"] = game
+    registry["g2"] = GameState()
+    assert registry.maintain(force=True, now=1e12) == []
+    assert registry.is_resident("g1")
+
+
+def test_estimate_grows_with_content():
+    small, big = GameState(), GameState()
+    big.messages = [Message(role="user", content=f"{i} " + "x" * 1000) for i in range(50)]
+    assert estimate_bytes(big) > estimate_bytes(small) + 50_000
+
+
+def test_held_games_stay_resident_and_spill_saves_outside_the_lock(tmp_path, monkeypatch):
+    import threading
+
+    from src.game import game_registry
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    registry = GameRegistry()
+    original = _game()
+    registry["g1"] = original
+    registry["g2"] = GameState()
+
+    with registry.hold("g1"):
+        assert registry.maintain(force=True, now=1e12) == []
+    assert registry.is_resident("g1")
+
+    # another thread opening g1 while its save runs gets the live object back, not a reload
+    looked_up = []
+    real_repo = game_registry.get_repository()
+
+    class _Repo:
+        def save_game(self, game, game_id, rng=None):
+            reader = threading.Thread(target=lambda: looked_up.append(registry["g1"]))
+            reader.start()
+            reader.join(timeout=5)
+            return real_repo.save_game(game, game_id, rng=rng)
+
+    monkeypatch.setattr(game_registry, "get_repository", lambda: _Repo())
+    assert registry.maintain(force=True, now=1e12) == []
+    assert looked_up == [original]
+    assert registry.is_resident("g1") and registry["g1"] is original
+
+
+def test_rehydration_loads_once_outside_the_lock(tmp_path, monkeypatch):
+    import threading
+
+    from src.game import game_registry
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    registry = GameRegistry()
+    registry["g1"] = _game()
+    registry["g2"] = GameState()
+    assert registry.maintain(force=True, now=1e12) == ["g1"]
+    assert "games.bytes.g1" not in metrics.snapshot()["Gauges"]
+
+    real_repo = game_registry.get_repository()
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    class _Repo:
+        def load_game(self, game_id):
+            loads.append(game_id)
+            started.set()
+            release.wait(timeout=5)
+            return real_repo.load_game(game_id)
+
+        def __getattr__(self, name):
+            return getattr(real_repo, name)
+
+    monkeypatch.setattr(game_registry, "get_repository", lambda: _Repo())
+    found = []
+    readers = [threading.Thread(target=lambda: found.append(registry["g1"])) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    assert started.wait(timeout=5)
+    assert isinstance(registry["g2"], GameState)    # other games are not held up by the load
+    release.set()
+    for reader in readers:
+        reader.join(timeout=5)
+    assert loads == ["g1"]
+    assert len(found) == 3 and found[0] is found[1] is found[2] is registry["g1"]
@@ -0,0 +1,142 @@
+import json
+import socket
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from src import config
+from src.agent import dm_dice
+from src.game.game_state import GameState
+from src.service import game_service
+from src.service.game_service import GameService
+from src.tests.test_IO import _sample_pc, _sample_world
+
+
+def _fake_dm(monkeypatch, reply="The door creaks open."):
+    def fake_completion(messages, on_token=None, **kw):
+        if on_token is not None:
+            for word in reply.split(" "):
+                on_token(word + " ")
+        return reply
+
+    monkeypatch.setattr(dm_dice, "_ensure_index", lambda game_id: None)
+    monkeypatch.setattr(dm_dice, "_build_context_prefix", lambda game_id, messages: "")
+    monkeypatch.setattr(dm_dice, "_validated_reply", lambda game_id, text, messages, index: (text, []))
+    monkeypatch.setattr(dm_dice, "chat_completion", fake_completion)
+    monkeypatch.setattr(game_service, "refresh_corpus", lambda game_id: None)
+
+
+def _table(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    _fake_dm(monkeypatch)
+    first, second = _sample_pc(), _sample_pc()
+    second.pc_id, second.name, second.player_name = "pc2", "Brom", "Bob"
+    second.initiative = first.initiative - 1
+    game = GameState(world=_sample_world(), player_characters={first.pc_id: first, "pc2": second})
+    service = GameService(games={"t1": game})
+    return service, game, first, second
+
+
+def test_act_streams_tokens_and_returns_new_messages(tmp_path, monkeypatch):
+    service, game, first, _ = _table(tmp_path, monkeypatch)
+    tokens = []
+    result = service.act("t1", first.player_name, "I look around", on_token=tokens.append)
+    assert result.accepted
+    assert "".join(tokens).strip() == "The door creaks open."
+    assert [m.role for m in result.messages][:2] == ["user", "assistant"]
+    assert all(m.seq is not None for m in result.messages)
+    assert not game.busy
+
+
+def test_turn_order_is_enforced(tmp_path, monkeypatch):
+    service, game, first, second = _table(tmp_path, monkeypatch)
+    actor, _ = service.build_initiative("t1")
+    assert actor.pc_id == first.pc_id
+
+    blocked = service.act("t1", second.player_name, "I attack")
+    assert not blocked.accepted and blocked.reason == "not_your_turn"
+
+    actor, _ = service.next_turn("t1")
+    assert actor.pc_id == "pc2"
+    assert service.act("t1", second.player_name, "I attack").accepted
+
+    state = service.snapshot("t1")
+    assert state["current_actor"]["pc_id"] == "pc2"
+    assert state["messages"][-1]["role"] == "assistant"
+    json.dumps(state)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_http_and_websocket(tmp_path, monkeypatch):
+    uvicorn = pytest.importorskip("uvicorn")
+    ws_client = pytest.importorskip("websockets.sync.client")
+    from src.service.server import create_app
+
+    service, _game, first, _ = _table(tmp_path, monkeypatch)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(service), host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        for _ in range(100):
+            if server.started:
+                break
+            time.sleep(0.05)
+        base = f"http://127.0.0.1:{port}/games/t1"
+
+        request = urllib.request.Request(
+            f"{base}/actions",
+            data=json.dumps({"speaker": first.player_name, "text": "I wave"}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as resp:
+            assert json.load(resp)["accepted"] is True
+        with urllib.request.urlopen(base) as resp:
+            assert json.load(resp)["world"]["title"]
+
+        with ws_client.connect(f"ws://127.0.0.1:{port}/games/t1/ws") as ws:
+            ws.send(json.dumps({"type": "action", "speaker": first.player_name, "text": "I listen"}))
+            events = []
+            while not events or events[-1]["type"] != "result":
+                events.append(json.loads(ws.recv(timeout=10)))
+        kinds = [e["type"] for e in events]
+        assert "token" in kinds and kinds[-1] == "result"
+        streamed = "".join(e["text"] for e in events if e["type"] == "token")
+        assert streamed.strip() == "The door creaks open."
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+def test_world_creation_publishes_stages_and_batches_items(tmp_path, monkeypatch):
+    from src.game import npc_store
+    from src.service.loadtest import FakeLLM, fake_backend
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    monkeypatch.setattr(npc_store, "NPC_SAVE_DIR", tmp_path / "npcs")
+    game = GameState()
+    seen = []
+
+    def on_progress(stage, message):
+        seen.append((stage, game.world is not None, len(game.npcs)))
+
+    llm = FakeLLM(prefill_tps=1e6, decode_tps=1e5)
+    with fake_backend(llm):
+        world = game_service.create_world(game, "w1", "A frontier of ash", ["Alice"], on_progress=on_progress)
+
+    assert [s for s, _, _ in seen] == ["world", "npcs", "quests", "items", "done"]
+    assert seen[1][1] is True            # world published before the roster is generated
+    merchant = next(n for n in game.npcs.values() if "merchant" in n.role)
+    assert merchant.inventory
+    assert all(q.reward_items for q in game.quests.values())
+    assert llm.calls == 4                # world, roster, quests, one item batch
+    assert world.title and not game.busy
@@ -0,0 +1,85 @@
+from src import config
+from src.game.game_state import GameState
+from src.game.lazy_map import LazyEntityMap
+from src.game.models import NPC
+from src.game.save_load import load_game, save_game
+from src.tests.test_IO import _sample_npc, _sample_pc, _sample_quest, _sample_world
+
+
+def _npcs(n=5):
+    npcs = {}
+    for i in range(n):
+        npc = _sample_npc()
+        npc.npc_id, npc.name = f"npc{i}", f"Npc {i}"
+        npcs[npc.npc_id] = npc
+    return npcs
+
+
+def _save(tmp_path, npcs):
+    game = GameState(
+        world=_sample_world(),
+        player_characters={"pc1": _sample_pc()},
+        npcs=npcs,
+        quests={"q1": _sample_quest()},
+    )
+    save_game(game, "g1", root=tmp_path)
+    return game
+
+
+def test_builds_on_first_access_only():
+    built = []
+
+    def build(raw):
+        built.append(raw["npc_id"])
+        return NPC.from_dict(raw)
+
+    lazy = LazyEntityMap({k: v.to_dict() for k, v in _npcs(3).items()}, build)
+    assert list(lazy) == ["npc0", "npc1", "npc2"] and "npc1" in lazy and len(lazy) == 3
+    assert built == []
+
+    assert lazy["npc1"].name == "Npc 1"
+    assert lazy["npc1"] is lazy["npc1"]
+    assert built == ["npc1"] and lazy.loaded_count == 1
+
+    names = [npc.name for npc in lazy.values()]
+    assert names == ["Npc 0", "Npc 1", "Npc 2"] and sorted(built) == ["npc0", "npc1", "npc2"]
+
+
+def test_mutation_copy_and_equality():
+    npcs = _npcs(3)
+    lazy = LazyEntityMap({k: v.to_dict() for k, v in npcs.items()}, NPC.from_dict)
+    twin = lazy.copy()
+    del lazy["npc0"]
+    lazy["new"] = _sample_npc()
+    assert list(lazy) == ["npc1", "npc2", "new"] and lazy.is_loaded("new")
+    assert "npc0" in twin and not twin.is_loaded("npc0")
+    assert twin == npcs
+
+
+def test_load_game_is_lazy_and_resave_keeps_unread_rows(tmp_path):
+    npcs = _npcs(5)
+    _save(tmp_path, npcs)
+    _world, pcs, loaded, quests, _order, _idx = load_game("g1", root=tmp_path)
+    assert isinstance(loaded, LazyEntityMap) and isinstance(quests, LazyEntityMap)
+    assert isinstance(pcs, dict)
+    assert loaded.loaded_count == 0
+
+    loaded["npc2"].location = "Harbor"
+    save_game(
+        GameState(world=_world, player_characters=pcs, npcs=loaded, quests=quests), "g1", root=tmp_path
+    )
+    assert loaded.loaded_count == 1
+
+    again = load_game("g1", root=tmp_path, lazy=False)[2]
+    assert isinstance(again, dict)
+    assert again["npc2"].location == "Harbor"
+    assert again["npc4"] == npcs["npc4"]
+
+
+def test_legacy_json_saves_load_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "save_format", "json")
+    npcs = _npcs(2)
+    _save(tmp_path, npcs)
+    loaded = load_game("g1", root=tmp_path)[2]
+    assert isinstance(loaded, LazyEntityMap) and loaded.loaded_count == 0
+    assert loaded == npcs
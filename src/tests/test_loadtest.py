@@ -0,0 +1,46 @@
+import threading
+
+from src import config
+from src.game import npc_store
+from src.service import loadtest
+from src.service.game_service import ModelSlots
+
+
+def test_fake_load_run_reports_latency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "persist_async", False)
+    monkeypatch.setattr(npc_store, "NPC_SAVE_DIR", tmp_path / "saves" / "npcs")
+    llm = loadtest.FakeLLM(prefill_tps=1e6, decode_tps=1e5)
+    report = loadtest.run_load(tables=2, players=2, turns=2, llm=llm, sample_s=0.05)
+
+    assert report["errors"] == []
+    assert report["turns"] == 8 and report["rejected_turns"] == 0
+    assert report["turn_latency_s"]["n"] == 8
+    assert set(report["queue_wait_s"]) >= {"p50", "p95", "p99"}
+    assert report["character_gen_s"]["n"] == 4
+    assert report["rss_mb"] and llm.calls > 0
+
+
+def test_model_slots_are_first_come_first_served():
+    slots = ModelSlots(1)
+    slots.acquire()
+    order = []
+
+    def worker(name):
+        with slots:
+            order.append(name)
+
+    threads = []
+    for name in ("a", "b"):
+        t = threading.Thread(target=worker, args=(name,))
+        t.start()
+        threads.append(t)
+        while len(slots._waiters) < len(threads):
+            pass
+    slots.release()
+    slots.acquire()          # queued behind a and b, cannot jump ahead
+    order.append("main")
+    slots.release()
+    for t in threads:
+        t.join()
+    assert order == ["a", "b", "main"]
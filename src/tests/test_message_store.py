@@ -0,0 +1,141 @@
+from src import config
+from src.agent.types import Message
+from src.game.game_state import GameState
+from src.game.message_store import (
+    MessageJournal,
+    get_message_journal,
+    restore_context,
+    sync_messages,
+    trim_context,
+)
+
+
+def _chat(n, start=0):
+    return [
+        Message(role="user" if i % 2 == 0 else "assistant", content=f"line {i}", speaker="Alice" if i % 2 == 0 else None)
+        for i in range(start, start + n)
+    ]
+
+
+def test_hot_window_and_paging_from_disk(tmp_path):
+    journal = MessageJournal("g1", root=tmp_path, hot_window=10)
+    for msg in _chat(35):
+        journal.append(msg)
+    journal.flush()
+    assert len(journal) == 35 and len(journal.recent()) == 10
+    assert journal.first_hot_seq == 26
+
+    older = journal.page(journal.first_hot_seq, limit=5)
+    assert [m.seq for m in older] == [21, 22, 23, 24, 25]
+    assert older[0].content == "line 20" and older[0].speaker == "Alice"
+    assert [m.seq for m in journal.page(limit=3)] == [33, 34, 35]
+    assert [m.seq for m in journal.page(4, limit=50)] == [1, 2, 3]
+
+
+def test_reopen_continues_seq(tmp_path):
+    journal = MessageJournal("g1", root=tmp_path, hot_window=4)
+    for msg in _chat(6):
+        journal.append(msg)
+    journal.flush()
+
+    again = MessageJournal("g1", root=tmp_path, hot_window=4)
+    assert len(again) == 6 and [m.content for m in again.recent()] == ["line 2", "line 3", "line 4", "line 5"]
+    assert again.append(Message(role="user", content="more")).seq == 7
+    again.flush()
+    assert [m.seq for m in again.iter_all()] == list(range(1, 8))
+
+
+def test_append_after_torn_line_reopens(tmp_path):
+    journal = MessageJournal("g1", root=tmp_path)
+    journal.append(Message(role="user", content="first", speaker="Alice"))
+    journal.flush()
+    with journal.path.open("ab") as fh:
+        fh.write(b'{"seq":2,"role":"assistant","con')   # crash mid-write
+
+    again = MessageJournal("g1", root=tmp_path)
+    assert len(again) == 1
+    again.append(Message(role="assistant", content="second"))
+    again.flush()
+
+    reopened = MessageJournal("g1", root=tmp_path)
+    assert [(m.seq, m.content) for m in reopened.recent()] == [(1, "first"), (2, "second")]
+    assert [m.content for m in reopened.iter_all()] == ["first", "second"]
+
+
+def test_unreadable_line_keeps_its_seq(tmp_path):
+    journal = MessageJournal("g1", root=tmp_path)
+    for n in range(4):
+        journal.append(Message(role="user", content=f"m{n + 1}", speaker="Alice"))
+    journal.flush()
+    lines = journal.path.read_bytes().splitlines(keepends=True)
+    lines[1] = b'{"seq":2,"role":"user","content":"m2"\n'     # corrupt but complete
+    journal.path.write_bytes(b"".join(lines))
+
+    for hot_window in (10, 2):
+        reopened = MessageJournal("g1", root=tmp_path, hot_window=hot_window)
+        assert [m.seq for m in reopened.page(limit=10)] == [1, 2, 3, 4]
+        assert [m.content for m in reopened.visible(limit=2)] == ["m3", "m4"]
+        assert reopened.page(before_seq=4, limit=1)[0].content == "m3"
+        assert reopened.page(before_seq=3, limit=1)[0].content == "[unreadable message]"
+    assert [m.seq for m in reopened.iter_all()] == [1, 2, 3, 4]
+
+
+def test_trim_context_keeps_prompt_and_pinned():
+    messages = [Message(role="system", content="DM prompt")] + _chat(5)
+    messages.append(Message(role="system", content="PARTY SUMMARY\n- Alice"))
+    messages += _chat(20, start=5)
+    trimmed = trim_context(messages, cap=8)
+    assert len(trimmed) == 8
+    assert trimmed[0].content == "DM prompt"
+    assert any("PARTY SUMMARY" in m.content for m in trimmed)
+    assert trimmed[-1].content == "line 24"
+
+
+def test_sync_messages_journals_once_and_caps(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "persist_async", False)
+    monkeypatch.setattr(config, "message_context_cap", 6)
+    game = GameState(messages=[Message(role="system", content="DM prompt")] + _chat(10))
+    journal = sync_messages(game, "g1", root=tmp_path)
+    assert len(journal) == 11 and len(game.messages) == 6
+    assert all(m.seq is not None for m in game.messages)
+
+    game.messages.append(Message(role="user", content="new", speaker="Bob"))
+    sync_messages(game, "g1", root=tmp_path)
+    assert len(journal) == 12
+    assert journal.path.read_text(encoding="utf-8").count("\n") == 12
+
+
+def test_restore_context_and_rotate(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "persist_async", False)
+    game = GameState(messages=[Message(role="system", content="DM prompt")] + _chat(30))
+    sync_messages(game, "g2", root=tmp_path)
+
+    restored = restore_context("g2", n=4, root=tmp_path)
+    assert [m.content for m in restored] == ["line 26", "line 27", "line 28", "line 29"]
+
+    journal = get_message_journal("g2", root=tmp_path)
+    journal.rotate()
+    assert len(journal) == 0 and journal.recent() == []
+    assert list(journal.path.parent.glob("messages.*.jsonl"))
+    assert restore_context("g2", root=tmp_path) == []
+
+
+def test_visible_index_skips_system_lines(tmp_path):
+    journal = MessageJournal("g3", root=tmp_path, hot_window=5)
+    for i, msg in enumerate(_chat(20)):
+        journal.append(msg)
+        if i % 3 == 0:
+            journal.append(Message(role="system", content=f"[TURN] {i}"))
+    journal.flush()
+    assert journal.visible_count == 20
+
+    newest = journal.visible(3)
+    assert [m.content for m in newest] == ["line 17", "line 18", "line 19"]
+    older = journal.visible(4, before_seq=newest[0].seq)
+    assert [m.content for m in older] == ["line 13", "line 14", "line 15", "line 16"]
+    assert all(m.role != "system" for m in journal.visible(100))
+
+    # the index is rebuilt from disk without parsing every line
+    again = MessageJournal("g3", root=tmp_path, hot_window=5)
+    assert again.visible_count == 20
+    assert [m.content for m in again.visible(2, before_seq=newest[0].seq)] == ["line 15", "line 16"]
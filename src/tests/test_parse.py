@@ -39,4 +39,29 @@ def test_register_action_synonym_allows_new_trigger():
     cmd = parse_command("/zap the golem")
     assert cmd is not None
     assert cmd.action_type == "damage_light"
-    assert cmd.needs_dice is True
\ No newline at end of file
+    assert cmd.needs_dice is True
+
+def test_action_classifier_scans_whole_text():
+    cmd = parse_command("/action I try to sneak past")
+    assert cmd.action_type == "stealth_check"
+    assert cmd.confidence == 1.0
+
+
+def test_action_classifier_prefers_phrases_and_fixes_typos():
+    assert parse_command("/action I pick the lock").action_type == "lockpick"
+    assert parse_command("/action power attack the ogre").action_type == "damage_heavy"
+    typo = parse_command("/action snaek past the guard")
+    assert typo.action_type == "stealth_check"
+    assert 0 < typo.confidence < 1.0
+
+
+def test_action_classifier_unknown_text():
+    cmd = parse_command("/action dance a jig")
+    assert cmd.action_type is None
+    assert cmd.confidence == 0.0
+
+
+def test_registered_phrase_is_classified():
+    register_action_synonym("shadow step", "acrobatics")
+    cmd = parse_command("/action I shadow step behind him")
+    assert cmd.action_type == "acrobatics"
@@ -0,0 +1,82 @@
+import threading
+
+from src import config
+from src.game.persistence import PersistenceWorker, persist
+from src.metrics.metrics import metrics
+
+
+def _gated():
+    # a job that blocks the worker until released, so later submits pile up behind it
+    started, release = threading.Event(), threading.Event()
+
+    def job(out, value):
+        started.set()
+        release.wait(5)
+        out.append(value)
+
+    return job, started, release
+
+
+def test_repeated_saves_of_one_key_are_coalesced():
+    worker = PersistenceWorker()
+    writes = []
+    job, started, release = _gated()
+    worker.submit("quests", job, writes, 0)
+    assert started.wait(5)
+    for value in range(1, 5):
+        worker.submit("quests", writes.append, value)
+    release.set()
+    assert worker.flush(timeout=5)
+    assert writes == [0, 4]
+    worker.stop(timeout=5)
+
+
+def test_keys_are_written_in_submit_order():
+    worker = PersistenceWorker()
+    writes = []
+    for key in ("a", "b", "c"):
+        worker.submit(key, writes.append, key)
+    assert worker.flush(timeout=5)
+    assert writes == ["a", "b", "c"]
+    worker.stop(timeout=5)
+
+
+def test_full_queue_writes_inline_and_flush_times_out():
+    worker = PersistenceWorker(maxsize=1)
+    writes = []
+    job, started, release = _gated()
+    worker.submit("a", job, writes, "a")
+    assert started.wait(5)
+    assert worker.submit("b", writes.append, "b")
+    assert worker.submit("c", writes.append, "c") is False
+    assert writes == ["c"]
+    assert worker.flush(timeout=0.05) is False
+    release.set()
+    assert worker.flush(timeout=5)
+    assert writes == ["c", "a", "b"]
+    worker.stop(timeout=5)
+
+
+def test_errors_are_counted_and_worker_keeps_going():
+    worker = PersistenceWorker()
+    writes = []
+    before = metrics.counters.get("persist.errors", 0)
+
+    def boom():
+        raise OSError("disk full")
+
+    worker.submit("bad", boom)
+    worker.submit("good", writes.append, 1)
+    assert worker.flush(timeout=5)
+    assert writes == [1]
+    assert isinstance(worker.last_error, OSError)
+    assert metrics.counters["persist.errors"] == before + 1
+    assert "persist.lag_s" in metrics.gauges
+    worker.stop(timeout=5)
+
+
+def test_sync_mode_writes_on_caller(monkeypatch):
+    monkeypatch.setattr(config, "persist_async", False)
+    writes = []
+    persist("x", writes.append, 1)
+    assert writes == [1]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.game.dice_engine import roll_batch
+from src.game.models import PlayerCharacter
+from src.game.probability import distribution, success_probability, success_table
+
+
+def _pc(**stats):
+    base = {"STR": 10, "DEX": 10, "CON": 10, "INT": 10, "WIS": 10, "CHA": 10}
+    base.update(stats)
+    return PlayerCharacter(
+        pc_id="pc1", name="Aria", player_name="Alice", concept="scout", gender="f",
+        ancestry="elf", archetype="rogue", level=1, max_hp=10, current_hp=10,
+        stats=base, skills=["Stealth"], inventory=[], notes=[],
+    )
+
+
+def test_plain_sum_is_exact():
+    dist = distribution("2d6+3")
+    assert (dist.min, dist.max) == (5, 15)
+    assert dist.probs.sum() == pytest.approx(1.0)
+    assert dist.p_at_least(15) == pytest.approx(1 / 36)
+    assert dist.mean() == pytest.approx(10.0)
+
+
+def test_advantage_matches_closed_form():
+    dist = distribution("d20adv")
+    # P(max of two d20 >= t) = 1 - ((t-1)/20)^2
+    for t in (2, 10, 15, 20):
+        assert dist.p_at_least(t) == pytest.approx(1 - ((t - 1) / 20) ** 2)
+    assert distribution("d20dis").mean() == pytest.approx(21 - 13.825)
+
+
+@pytest.mark.parametrize("expr", ["4d6kh3", "3d6kl2", "2d6!", "1d8-1d4+2"])
+def test_distribution_agrees_with_sampling(expr):
+    dist = distribution(expr)
+    totals = roll_batch(expr, 200_000, rng=np.random.default_rng(3))
+    assert abs(totals.mean() - dist.mean()) < 0.05
+    assert totals.min() >= dist.min
+
+
+def test_success_probability_uses_modifier_and_dc():
+    pc = _pc(DEX=16)  # +3 DEX, +2 stealth proficiency
+    # normal DC 13 -> need 8+ on a d20
+    assert success_probability(pc, "stealth_check") == pytest.approx(13 / 20)
+    assert success_probability(None, "attack", "hard") == pytest.approx(4 / 20)  # no PC: no modifier, DC 17
+    assert success_probability(pc, "damage_light") is None
+
+
+def test_success_table_covers_actions_and_tiers():
+    table = success_table(_pc())
+    assert set(table["attack"]) == {"easy", "normal", "hard", "very_hard"}
+    assert table["damage_heavy"]["normal"].expected == pytest.approx(5.5)
+    easy, hard = table["lockpick"]["easy"], table["lockpick"]["hard"]
+    assert easy.p_success > hard.p_success
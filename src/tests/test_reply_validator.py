@@ -0,0 +1,63 @@
+from src.agent.reply_validator import (
+    extract_name_candidates,
+    validate_reply,
+    capitalized_terms,
+    check_dm_reply,
+)
+from src.agent import reply_validator
+from src.agent.types import Message
+from src.game.entity_index import EntityIndex, Entity
+from src.metrics.metrics import metrics
+
+
+def _index():
+    index = EntityIndex()
+    index.add(Entity("npc", "n1", "Gorn"))
+    index.add(Entity("loc", "Iron Gate", "Iron Gate"))
+    index.add(Entity("item", "rope", "Silk Rope"))
+    return index
+
+
+def test_extract_skips_tags_and_sentence_starts():
+    text = "Rain falls. The guard Gorn nods at Iron Gate. [ROLL_REQUEST: 1d20 | Attack: x] Result: SUCCESS"
+    assert extract_name_candidates(text) == ["Gorn", "Iron Gate"]
+
+
+def test_known_names_pass():
+    report = validate_reply("You hand Gorn the Silk Rope near the Iron Gate.", _index(), set())
+    assert report.ok
+    assert report.text.startswith("You hand Gorn")
+
+
+def test_near_miss_is_repaired():
+    report = validate_reply("You spot Gorm waving from the Iron Gade.", _index(), set())
+    assert report.repaired == {"Gorm": "Gorn", "Iron Gade": "Iron Gate"}
+    assert "Gorn" in report.text and "Iron Gate" in report.text
+    assert report.ok
+
+
+def test_repair_inserts_names_literally():
+    index = EntityIndex()
+    index.add(Entity("loc", "gate", r"Iron\Gate"))
+    report = validate_reply("You reach the Iron Gade.", index, set())
+    assert report.text == r"You reach the Iron\Gate."
+
+
+def test_unknown_name_is_flagged():
+    report = validate_reply("Behind you stands Lord Zathrax with the Moonblade.", _index(), set())
+    assert report.unknown == ["Zathrax", "Moonblade"]
+
+
+def test_corpus_terms_count_as_known():
+    known = capitalized_terms(["The Zathrax cult rules the marsh."])
+    report = validate_reply("You hear whispers of Zathrax.", _index(), known)
+    assert report.ok
+
+
+def test_check_dm_reply_counts_violations(monkeypatch):
+    monkeypatch.setattr(reply_validator, "snippet_map", lambda game_id: {})
+    before = metrics.counters.get("validator.violations.g-val", 0)
+    messages = [Message(role="user", content="I greet Pip.", speaker="Alice")]
+    report = check_dm_reply("g-val", "Pip nods, and Queen Ossa arrives.", messages, _index())
+    assert report.unknown == ["Queen Ossa"]
+    assert metrics.counters["validator.violations.g-val"] == before + 1
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+
+from src.game.dice import roll_dice
+from src.game.game_state import GameState
+from src.game.models import World_State
+from src.game.rng import GameRNG, get_game_rng, replay_draw, set_game_rng
+from src.game.save_load import load_game_rng, save_game
+from src.game.turn_store import TurnLog, begin_turn, record_draws
+
+
+def test_streams_are_deterministic_and_independent():
+    a, b = GameRNG(seed=123), GameRNG(seed=123)
+    rolls_a = [roll_dice("1d20", rng=a.stream("dice")).total for _ in range(10)]
+    rolls_b = [roll_dice("1d20", rng=b.stream("dice")).total for _ in range(10)]
+    assert rolls_a == rolls_b
+
+    # drawing from another stream does not shift the dice stream
+    c = GameRNG(seed=123)
+    c.stream("npc").choice(["a", "b", "c"])
+    assert [roll_dice("1d20", rng=c.stream("dice")).total for _ in range(10)] == rolls_a
+
+
+def test_resume_from_counters_and_replay():
+    rng = GameRNG(seed=9)
+    first = [rng.stream("dice").randint(1, 6) for _ in range(5)]
+    resumed = GameRNG.from_dict(json.loads(json.dumps(rng.to_dict())))
+    fresh = GameRNG(seed=9)
+    [fresh.stream("dice").randint(1, 6) for _ in range(5)]
+    assert resumed.stream("dice").randint(1, 100) == fresh.stream("dice").randint(1, 100)
+
+    draws = rng.drain_draws()
+    assert [d.result for d in draws] == first
+    assert all(replay_draw(9, d.__dict__) == d.result for d in draws)
+    assert rng.drain_draws() == []
+
+
+def test_turn_log_records_draws():
+    rng = GameRNG(seed=5)
+    log = TurnLog(world_id="g")
+    rng.stream("worldgen").getrandbits(32)
+    record_draws(log, rng.drain_draws())
+    begin_turn(log, None)
+    roll_dice("2d6", rng=rng.stream("dice"))
+    record_draws(log, rng.drain_draws())
+
+    restored = TurnLog.from_dict(json.loads(json.dumps(log.to_dict())))
+    assert restored.setup_rolls[0]["stream"] == "worldgen"
+    assert [r["op"] for r in restored.entries[-1].rolls] == ["randint 1 6", "randint 1 6"]
+
+
+def test_seed_round_trips_through_meta(tmp_path):
+    game = GameState()
+    game.world = World_State(
+        world_id="w", title="T", setting_prompt="p", world_summary="s", lore="l",
+        players=[], created_on=datetime.utcnow(),
+    )
+    rng = set_game_rng("seeded", GameRNG(seed=77))
+    rng.stream("dice").randint(1, 20)
+    save_game(game, "seeded", root=tmp_path)
+
+    loaded = load_game_rng("seeded", root=tmp_path)
+    assert loaded.seed == 77 and loaded.counters() == {"dice": 1}
+    assert get_game_rng("seeded") is rng
+
+
+def test_short_npc_roster_is_topped_up_from_the_game_streams(monkeypatch, tmp_path):
+    from src.agent import npc_gen
+
+    monkeypatch.chdir(tmp_path)
+    reply = {"choices": [{"text": "NPC 1:\nName: Mara\nRole: Innkeeper\nLocation: Dock\nDescription: Tired."}]}
+    monkeypatch.setattr(npc_gen, "get_llm", lambda: lambda prompt, **kw: reply)
+    world = World_State(
+        world_id="w", title="T", setting_prompt="p", world_summary="s", lore="l",
+        players=[], created_on=datetime.utcnow(),
+        major_locations=[{"name": "Dock"}, {"name": "Keep"}, {"name": "Mill"}],
+    )
+
+    def roster(seed):
+        npcs = npc_gen.generate_npcs_for_world(world, rng=GameRNG(seed=seed), with_items=False, min_npcs=4)
+        return [(npc_id, npc.location) for npc_id, npc in npcs.items()]
+
+    first = roster(11)
+    assert len(first) == 4
+    assert roster(11) == first
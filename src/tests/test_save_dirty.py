@@ -0,0 +1,107 @@
+import time
+
+from src import config
+from src.game import autosave
+from src.game.game_state import GameState
+from src.game.save_load import load_game, write_game
+from src.game.sqlite_store import SqliteRepository
+from src.tests.test_IO import _sample_npc, _sample_pc, _sample_quest, _sample_world
+
+
+def _game():
+    return GameState(
+        world=_sample_world(),
+        player_characters={"pc1": _sample_pc()},
+        npcs={"npc1": _sample_npc()},
+        quests={"q1": _sample_quest()},
+        initiative_order=["pc1"],
+    )
+
+
+def test_second_save_writes_nothing(tmp_path):
+    game = _game()
+    first = write_game(game, "g1", root=tmp_path)
+    assert set(first.written) == {
+        "world.dms", "players.dms", "npcs.dms", "quests.dms", "initiative.json", "meta.json",
+    }
+    for name, size in first.written.items():
+        assert (first.path / name).stat().st_size == size
+
+    second = write_game(game, "g1", root=tmp_path)
+    assert second.written == {} and second.bytes_written == 0
+    assert "quests.dms" in second.skipped
+
+
+def test_only_changed_section_is_rewritten(tmp_path):
+    game = _game()
+    write_game(game, "g1", root=tmp_path)
+    game.quests["q1"].status = "completed"
+
+    report = write_game(game, "g1", root=tmp_path)
+    assert set(report.written) == {"quests.dms", "meta.json"}
+    assert not list(report.path.glob("*.tmp"))
+    _world, _pcs, _npcs, quests, _order, _idx = load_game("g1", root=tmp_path)
+    assert quests["q1"].status == "completed"
+
+
+def test_fresh_game_state_compares_against_disk(tmp_path):
+    game = _game()
+    write_game(game, "g1", root=tmp_path)
+    # a new process has no hashes yet; identical content on disk still counts as clean
+    world, pcs, npcs, quests, order, idx = load_game("g1", root=tmp_path)
+    fresh = GameState(world=world, player_characters=pcs, npcs=npcs, quests=quests, initiative_order=order)
+    report = write_game(fresh, "g1", root=tmp_path)
+    assert report.written == {}
+
+
+def test_sqlite_save_skips_unchanged_rows(tmp_path):
+    repo = SqliteRepository(tmp_path / "game.db")
+    game = _game()
+    assert "npcs" in repo.save_game(game, "g1").written
+    assert repo.save_game(game, "g1").written == {}
+
+    game.npcs["npc1"].location = "Harbor"
+    report = repo.save_game(game, "g1")
+    assert set(report.written) == {"npcs", "meta"}
+    assert repo.load_npcs("g1", location="Harbor")
+
+
+def test_autosave_coalesces_requests(tmp_path, monkeypatch):
+    saves = []
+    monkeypatch.setattr(config, "autosave_enabled", True)
+    monkeypatch.setattr(autosave, "get_repository", lambda: _Recorder(saves))
+    game = _game()
+    for _ in range(5):
+        assert autosave.request_autosave(game, "g1", delay=0.05)
+    time.sleep(0.3)
+    assert saves == ["g1"]
+
+    assert not autosave.request_autosave(GameState(), "g2")
+
+
+def test_flush_runs_pending_save(monkeypatch):
+    saves = []
+    monkeypatch.setattr(config, "autosave_enabled", True)
+    monkeypatch.setattr(autosave, "get_repository", lambda: _Recorder(saves))
+    autosave.request_autosave(_game(), "g1", delay=60)
+    autosave.flush_autosave("g1")
+    assert saves == ["g1"]
+
+
+def test_autosave_goes_through_persistence_worker(monkeypatch):
+    saves = []
+    monkeypatch.setattr(config, "autosave_enabled", True)
+    monkeypatch.setattr(autosave, "get_repository", lambda: _Recorder(saves))
+    assert autosave.request_autosave(_game(), "g1")
+    assert autosave.flush_autosave("g1", timeout=5)
+    assert saves == ["g1"]
+
+    assert not autosave.request_autosave(GameState(), "g2")
+
+
+class _Recorder:
+    def __init__(self, saves):
+        self.saves = saves
+
+    def save_game(self, game, game_id, rng=None):
+        self.saves.append(game_id)
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from src.game.models import PlayerCharacter, World_State
+from src.game.game_state import GameState
+from src.game.save_load import save_game
+from src.game.simulator import EnemySpec, main, simulate, simulate_game
+
+
+def _pc(pc_id, name, **stats):
+    base = {"STR": 10, "DEX": 10, "CON": 10, "INT": 10, "WIS": 10, "CHA": 10}
+    base.update(stats)
+    return PlayerCharacter(
+        pc_id=pc_id, player_name=name, name=name, gender="f", ancestry="human",
+        archetype="fighter", level=1, concept="test", stats=base, max_hp=12,
+        current_hp=12, skills=["Weapon training"],
+    )
+
+
+def test_simulate_reports_consistent_rates():
+    party = [_pc("p1", "Aria", STR=16), _pc("p2", "Bran", DEX=16)]
+    report = simulate(party, n=10_000, seed=7)
+    assert report.encounters == 10_000
+    assert abs(report.win_rate + report.loss_rate + report.timeout_rate - 1.0) < 1e-9
+    assert sum(report.rounds_hist.values()) == 10_000
+    aria, bran = report.pcs
+    assert aria.damage_action == "damage_heavy" and bran.damage_action == "damage_light"
+    assert 0.0 < aria.hit_rate < 1.0
+    assert set(aria.check_success) >= {"stealth_check", "persuasion"}
+
+
+def test_harder_enemy_lowers_win_rate():
+    party = [_pc("p1", "Aria", STR=14)]
+    easy = simulate(party, n=5_000, enemy=EnemySpec(hp=10, damage="1d4"), seed=1)
+    hard = simulate(party, n=5_000, enemy=EnemySpec(hp=60, damage="2d8+4", difficulty="hard"), seed=1)
+    assert easy.win_rate > hard.win_rate
+    assert easy.party_damage_mean < hard.party_damage_mean
+
+
+def test_simulate_game_and_cli(tmp_path, capsys):
+    game = GameState()
+    game.world = World_State(
+        world_id="w1", title="T", setting_prompt="p", world_summary="s", lore="l",
+        players=["Aria"], created_on=datetime.utcnow(),
+    )
+    game.player_characters = {"p1": _pc("p1", "Aria", STR=15)}
+    save_game(game, "sim", root=tmp_path)
+
+    report = simulate_game("sim", root=tmp_path, n=1_000, seed=3)
+    assert report.pcs[0].pc_id == "p1"
+
+    main(["sim", "--root", str(tmp_path), "-n", "500", "--seed", "3"])
+    assert "500 encounters" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+import json
+
+from src.game import snapshot_store
+from src.game.snapshot_store import CHUNK_TURNS, SnapshotStore, main
+from src.game.turn_store import TurnLog, add_turn_action, add_turn_note, begin_turn, export_turn_log_snapshot
+
+
+def _play(log, turns):
+    for i in range(turns):
+        begin_turn(log, None)
+        add_turn_note(log, f"note {log.turn_count}")
+        add_turn_action(log, player_name="Alice", actor=None, content=f"/action step {log.turn_count}")
+    return log
+
+
+def test_snapshots_share_unchanged_chunks(tmp_path):
+    store = SnapshotStore(tmp_path)
+    log = _play(TurnLog(world_id="w1"), CHUNK_TURNS * 2 + 10)
+    first, _ = store.save(log, snapshot_id="a")
+    assert [c.entries for c in first.chunks] == [CHUNK_TURNS, CHUNK_TURNS, 10]
+    objects = len(list(store.objects.glob("*/*")))
+
+    _play(log, 5)
+    second, _ = store.save(log, snapshot_id="b")
+    assert [c.hash for c in second.chunks[:2]] == [c.hash for c in first.chunks[:2]]
+    assert second.chunks[2].hash != first.chunks[2].hash
+    # only the open range and the header are new
+    assert len(list(store.objects.glob("*/*"))) == objects + 2
+
+
+def test_restore_and_list(tmp_path):
+    store = SnapshotStore(tmp_path, compression="lzma")
+    log = _play(TurnLog(world_id="w1"), 7)
+    store.save(log, snapshot_id="a")
+    snapshot = log.to_dict()
+    _play(log, 3)
+    store.save(log, snapshot_id="b")
+    store.save(_play(TurnLog(world_id="w2"), 1), snapshot_id="c")
+
+    assert store.restore("w1", "a").to_dict() == snapshot
+    assert store.restore("w1", "b").to_dict() == log.to_dict()
+    assert [m.snapshot_id for m in store.list_snapshots("w1")] == ["a", "b"]
+    assert {m.world_id for m in store.list_snapshots()} == {"w1", "w2"}
+    assert list(store.objects.glob("*/*.xz"))
+
+
+def test_gc_keeps_referenced_chunks(tmp_path):
+    store = SnapshotStore(tmp_path)
+    log = _play(TurnLog(world_id="w1"), 3)
+    _, path_a = store.save(log, snapshot_id="a")
+    _play(log, 1)
+    store.save(log, snapshot_id="b")
+    path_a.unlink()
+    assert store.gc() == 2      # a's header and its only chunk
+    assert store.restore("w1", "b").turn_count == 4
+
+
+def test_export_and_cli_restore(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(snapshot_store, "SNAPSHOT_ROOT", tmp_path)
+    log = _play(TurnLog(world_id="w1"), 2)
+    manifest_path, summary_path = export_turn_log_snapshot(log, "recap")
+    assert summary_path.read_text() == "recap"
+    snapshot_id = manifest_path.name[len("w1_turns_"):-len(".manifest.json")]
+
+    out = tmp_path / "restored.json"
+    main(["--root", str(tmp_path), "restore", "w1", snapshot_id, "-o", str(out)])
+    assert TurnLog.from_dict(json.loads(out.read_text())).to_dict() == log.to_dict()
+    main(["--root", str(tmp_path), "list"])
+    assert snapshot_id in capsys.readouterr().out
@@ -0,0 +1,116 @@
+import json
+
+from src import config
+from src.game.game_state import GameState
+from src.game.npc_store import load_npcs, save_npcs
+from src.game.repository import get_repository
+from src.game.save_load import save_game
+from src.game.sqlite_store import SqliteRepository, migrate_json_saves
+from src.game.turn_store import TurnLog, add_turn_action, add_turn_note, begin_turn, record_draws, save_turn_log
+from src.tests.test_IO import _sample_npc, _sample_pc, _sample_quest, _sample_world
+
+
+def _game():
+    return GameState(
+        world=_sample_world(),
+        player_characters={"pc1": _sample_pc()},
+        npcs={"npc1": _sample_npc()},
+        quests={"q1": _sample_quest()},
+        initiative_order=["pc1"],
+    )
+
+
+def test_wal_mode_and_game_round_trip(tmp_path):
+    repo = SqliteRepository(tmp_path / "game.db")
+    assert repo._conn().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    repo.save_game(_game(), "g1", rng={"seed": 5, "counters": {}})
+    world, pcs, npcs, quests, order, active = repo.load_game("g1")
+    assert world.title == "Test World"
+    assert pcs["pc1"].name == "Aria" and npcs["npc1"].name == "Gorn"
+    assert quests["q1"].title == "Find the Gem"
+    assert order == ["pc1"] and active == 0
+    assert repo.load_rng_state("g1")["seed"] == 5
+
+
+def test_row_upserts_and_indexed_filters(tmp_path):
+    repo = SqliteRepository(tmp_path / "game.db")
+    repo.save_game(_game(), "g1")
+
+    npc = _sample_npc()
+    npc.npc_id, npc.name, npc.location = "npc2", "Vel", "docks"
+    repo.upsert_npcs("g1", {"npc2": npc})
+    assert set(repo.load_npcs("g1")) == {"npc1", "npc2"}
+    assert list(repo.load_npcs("g1", location="docks")) == ["npc2"]
+
+    quest = _sample_quest()
+    quest.status = "completed"
+    repo.upsert_quests("g1", {"q1": quest})
+    assert repo.load_quests("g1", status="available") == {}
+    assert list(repo.load_quests("g1", status="completed")) == ["q1"]
+
+    plan = repo._conn().execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM npcs WHERE game_id = ? AND location = ?", ["g1", "docks"]
+    ).fetchall()
+    assert any("npcs_by_location" in row[-1] for row in plan)
+
+
+def test_backend_switch_routes_stores_and_turn_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "storage_backend", "sqlite")
+    monkeypatch.setattr(config, "sqlite_path", tmp_path / "game.db")
+    save_npcs("world-1", {"npc1": _sample_npc()})
+    assert load_npcs("world-1")["npc1"].name == "Gorn"
+
+    log = TurnLog(world_id="g-turns")
+    begin_turn(log, None)
+    add_turn_note(log, "opened the door")
+    save_turn_log(log, root=tmp_path / "games")
+    events = get_repository().load_turn_events("g-turns")
+    assert [e["type"] for e in events] == ["begin_turn", "note"]
+    assert get_repository().load_turn_log("g-turns").entries[0].description == "Turn started | opened the door"
+
+
+def test_migrate_json_layout(tmp_path):
+    saves = tmp_path / "saves"
+    save_game(_game(), "g1", root=saves / "games")
+    log = TurnLog(world_id="g1")
+    begin_turn(log, None)
+    save_turn_log(log, root=saves / "games")
+    (saves / "npcs").mkdir()
+    (saves / "npcs" / "world-1_npcs.json").write_text(json.dumps({"npc1": _sample_npc().to_dict()}))
+    (saves / "world-1_quests.json").write_text(json.dumps({"q1": _sample_quest().to_dict()}))
+    (saves / "world-1.json").write_text(json.dumps(_sample_world().to_dict()))
+
+    repo = SqliteRepository(tmp_path / "game.db")
+    counts = migrate_json_saves(saves, repo)
+    assert counts == {"games": 1, "worlds": 1, "pcs": 0, "npcs": 1, "quests": 1, "turn_events": 1}
+    assert repo.load_game("g1")[1]["pc1"].name == "Aria"
+    assert repo.load_world("world-1").title == "Test World"
+    assert migrate_json_saves(saves, repo) == counts   # re-runnable
+
+
+def _actions(turn_log):
+    return [a.content for entry in turn_log.entries for a in entry.actions]
+
+
+def test_migration_rerun_after_live_play(tmp_path, monkeypatch):
+    saves = tmp_path / "saves"
+    log = TurnLog(world_id="g1")
+    begin_turn(log, None)
+    record_draws(log, [{"die": 20, "value": 12}])
+    record_draws(log, [{"die": 6, "value": 3}])      # rebuilt as one "rolls" event
+    add_turn_action(log, player_name="Alice", actor=None, content="hit")
+    add_turn_action(log, player_name="Alice", actor=None, content="hit again")
+    save_turn_log(log, root=saves / "games")
+    repo = SqliteRepository(tmp_path / "game.db")
+    migrate_json_saves(saves, repo)
+
+    # live play mirrors new events with the journal's own seqs
+    monkeypatch.setattr(config, "storage_backend", "sqlite")
+    monkeypatch.setattr(config, "sqlite_path", tmp_path / "game.db")
+    add_turn_action(log, player_name="Alice", actor=None, content="third")
+    save_turn_log(log, root=saves / "games")
+    assert _actions(repo.load_turn_log("g1")) == ["hit", "hit again", "third"]
+
+    migrate_json_saves(saves, repo)
+    assert _actions(repo.load_turn_log("g1")) == ["hit", "hit again", "third"]
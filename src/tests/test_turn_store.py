@@ -0,0 +1,76 @@
+import json
+
+from src.game import turn_store
+from src.game.turn_store import (
+    TurnLog,
+    add_turn_action,
+    add_turn_note,
+    begin_turn,
+    iter_turn_texts,
+    load_turn_log,
+    save_turn_log,
+)
+
+
+def _play(log, turns, root):
+    for i in range(turns):
+        begin_turn(log, None)
+        add_turn_note(log, f"note {i}")
+        add_turn_action(log, player_name="Alice", actor=None, content=f"/action step {i}")
+        save_turn_log(log, root=root)
+
+
+def test_events_append_and_replay(tmp_path):
+    log = TurnLog(world_id="g1")
+    _play(log, 3, tmp_path)
+
+    journal = tmp_path / "g1" / "turns.jsonl"
+    assert len(journal.read_text().splitlines()) == 9
+    assert not (tmp_path / "g1" / "turns.json").exists()
+
+    loaded = load_turn_log("g1", root=tmp_path)
+    assert loaded.to_dict() == log.to_dict()
+    assert loaded.seq == 9
+
+
+def test_checkpoint_compacts_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(turn_store, "CHECKPOINT_EVERY", 5)
+    log = TurnLog(world_id="g2")
+    _play(log, 3, tmp_path)   # checkpoint after 6 events, then 3 more in the journal
+
+    checkpoint = json.loads((tmp_path / "g2" / "turns.json").read_text())
+    assert checkpoint["journal_seq"] == 6
+    assert len((tmp_path / "g2" / "turns.jsonl").read_text().splitlines()) == 3
+
+    loaded = load_turn_log("g2", root=tmp_path)
+    assert loaded.to_dict() == log.to_dict()
+    assert [t for t in iter_turn_texts("g2", root=tmp_path)] == [
+        "Turn started | note 0",
+        "Turn started | note 1",
+        "Turn started | note 2",
+    ]
+
+
+def test_torn_line_and_legacy_checkpoint(tmp_path):
+    base = tmp_path / "g3"
+    base.mkdir()
+    legacy = TurnLog(world_id="g3")
+    begin_turn(legacy, None)
+    (base / "turns.json").write_text(json.dumps(legacy.to_dict()))
+
+    log = load_turn_log("g3", root=tmp_path)
+    add_turn_note(log, "after legacy")
+    save_turn_log(log, root=tmp_path)
+    with (base / "turns.jsonl").open("a") as fh:
+        fh.write('{"seq": 99, "type": "no')   # crash mid-write
+
+    loaded = load_turn_log("g3", root=tmp_path)
+    assert loaded.entries[0].description == "Turn started | after legacy"
+    assert list(iter_turn_texts("g3", root=tmp_path)) == ["Turn started | after legacy"]
+
+    # the next save must not glue its event onto the torn line
+    add_turn_note(loaded, "second")
+    save_turn_log(loaded, root=tmp_path)
+    expected = "Turn started | after legacy | second"
+    assert load_turn_log("g3", root=tmp_path).entries[0].description == expected
+    assert list(iter_turn_texts("g3", root=tmp_path)) == [expected]